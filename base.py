@@ -8,6 +8,7 @@
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from constants import BotConstants
+import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -41,9 +42,23 @@ def mention(self) -> str:
 
 class BaseHandler(ABC):
     """Base class for all handlers"""
-    
+
+    # ``kind`` label of this handler's latency in /metrics
+    handler_kind = "handler"
+
     def __init__(self):
         self.logger = logging.getLogger(self.__class__.__name__)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Time every concrete ``handle`` implementation, whichever subclass defines it
+        if "handle" in cls.__dict__:
+            cls.handle = metrics.timed_handle(cls.__dict__["handle"])
+
+    @property
+    def handler_name(self) -> str:
+        """``handler`` label of this handler's latency in /metrics"""
+        return self.__class__.__name__
     
     @abstractmethod
     async def handle(self, update, context) -> None:
@@ -68,7 +83,7 @@ def _track_user_interaction(self, user_info: UserInfo, command: str = None) -> N
     def _get_user_info(self, update) -> Optional[UserInfo]:
         """Extract user info from update"""
         try:
-            user = update.effective_user or update.message.from_user if update.message else None
+            user = update.effective_user or (update.message.from_user if update.message else None)
             if not user:
                 return None
             
@@ -84,7 +99,13 @@ def _get_user_info(self, update) -> Optional[UserInfo]:
 
 class BaseCommandHandler(BaseHandler):
     """Base class for command handlers"""
-    
+
+    handler_kind = "command"
+
+    @property
+    def handler_name(self) -> str:
+        return self.command_name
+
     async def handle(self, update, context) -> None:
         """Handle command with common logic"""
         try:
@@ -123,7 +144,13 @@ def command_name(self) -> str:
 
 class BaseCallbackHandler(BaseHandler):
     """Base class for callback handlers"""
-    
+
+    handler_kind = "callback"
+
+    @property
+    def handler_name(self) -> str:
+        return self.callback_data
+
     async def handle(self, update, context) -> None:
         """Handle callback with common logic"""
         try:
@@ -133,7 +160,7 @@ async def handle(self, update, context) -> None:
             # Get user info
             user_info = self._get_user_info(update)
             if user_info:
-                self._track_user_interaction(user_info, f"{self.callback_data}_callback")
+                self._track_callback(user_info)
             
             # Execute specific callback logic
             await self.execute_callback(query, context, user_info)
@@ -142,6 +169,10 @@ async def handle(self, update, context) -> None:
             self.logger.error(f"Error in {self.__class__.__name__}: {e}")
             await self.handle_error(update, context, e)
     
+    def _track_callback(self, user_info: UserInfo) -> None:
+        """Track the interaction and a ``<callback_data>_callback`` command"""
+        self._track_user_interaction(user_info, f"{self.callback_data}_callback")
+
     @abstractmethod
     async def execute_callback(self, query, context, user_info: Optional[UserInfo]) -> None:
         """Execute the specific callback logic"""
@@ -152,9 +183,7 @@ async def handle_error(self, update, context, error: Exception) -> None:
         try:
             query = update.callback_query
             error_text = "😅 Sorry, something went wrong. Please try again!"
-            from constants import KeyboardLayouts
-            reply_markup = KeyboardLayouts.get_error_keyboard()
-            await query.edit_message_text(error_text, reply_markup=reply_markup)
+            await query.edit_message_text(error_text)
         except Exception as e:
             self.logger.error(f"Error handling callback error: {e}")
     
@@ -166,7 +195,9 @@ def callback_data(self) -> str:
 
 class BaseMessageHandler(BaseHandler):
     """Base class for message handlers"""
-    
+
+    handler_kind = "message"
+
     async def handle(self, update, context) -> None:
         """Handle message with common logic"""
         try:
@@ -0,0 +1,3 @@
+"""
+Offline benchmarks and load-test tools for Telegram Bot
+"""
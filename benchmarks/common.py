@@ -0,0 +1,66 @@
+"""
+Shared helpers for benchmarks: offline environment and latency reports
+"""
+import json
+import math
+import os
+import tempfile
+from typing import Any, Dict, List, Optional
+
+
+def prepare_environment(jokes_api_url: str = "http://127.0.0.1:9", **overrides: str) -> str:
+    """Set the environment the bot modules need so they import without real credentials.
+
+    Must be called before importing ``config``, ``utils``, ``stats`` or ``handlers``.
+    Returns the temporary statistics directory that was configured.
+    """
+    data_dir = tempfile.mkdtemp(prefix="bot-bench-")
+    os.environ.setdefault("BOT_TOKEN", "123456:BENCHMARK")
+    os.environ["JOKES_API_URL"] = jokes_api_url
+    os.environ.setdefault("STATS_DATA_DIR", data_dir)
+    os.environ.setdefault("DOCKER", "true")
+    for key, value in overrides.items():
+        os.environ[key] = str(value)
+    return os.environ["STATS_DATA_DIR"]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def latency_summary(latencies: List[float], elapsed: float, **extra: Any) -> Dict[str, Any]:
+    """Summarize latencies (seconds) into throughput and percentiles (milliseconds)"""
+    values = sorted(latencies)
+    count = len(values)
+    summary = {
+        "count": count,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_per_s": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(values) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if count else 0.0,
+    }
+    summary.update(extra)
+    return summary
+
+
+def print_report(title: str, summary: Dict[str, Any]) -> None:
+    """Print a summary as aligned ``key: value`` lines"""
+    print(f"== {title} ==")
+    width = max(len(key) for key in summary)
+    for key, value in summary.items():
+        print(f"  {key.ljust(width)}  {value}")
+
+
+def write_json(path: Optional[str], payload: Dict[str, Any]) -> None:
+    """Write machine-readable results if a path was given"""
+    if not path:
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Local fake of the Telegram Bot API plus a synthetic update sender.
+
+The bot talks to it through ``TELEGRAM_BASE_URL=http://127.0.0.1:<port>/bot``.
+Updates pushed with ``push_update`` are served to ``getUpdates`` long polling;
+every outgoing Bot API call is recorded in ``calls``. With ``enforce_limits`` it also
+answers like Telegram does when the bot sends faster than the flood limits allow.
+"""
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional
+from urllib.parse import parse_qsl
+
+from http_server import HTTPServer, Request, Response
+
+BOT_USER = {"id": 100000001, "is_bot": True, "first_name": "Bench", "username": "bench_bot",
+            "can_join_groups": True, "can_read_all_group_messages": False, "supports_inline_queries": False}
+
+# Methods that are not counted against the flood limits
+UNLIMITED_METHODS = frozenset({"getUpdates", "getMe", "setWebhook", "deleteWebhook",
+                               "answerCallbackQuery", "sendChatAction"})
+
+
+@dataclass
+class RecordedCall:
+    """One Bot API call the bot made"""
+    method: str
+    params: Dict[str, Any]
+    received_at: float
+
+
+def _decode_params(request: Request) -> Dict[str, Any]:
+    """Bot API parameters arrive as form fields with JSON-encoded complex values, or as JSON"""
+    content_type = request.headers.get("content-type", "")
+    if "application/json" in content_type:
+        return request.json() or {}
+    if "multipart/form-data" in content_type:
+        return {}
+    params = {}
+    for key, value in parse_qsl(request.body.decode("utf-8"), keep_blank_values=True):
+        try:
+            params[key] = json.loads(value)
+        except ValueError:
+            params[key] = value
+    return params
+
+
+class FakeBotAPI:
+    """Answers the Bot API methods the bot uses with plausible results"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 enforce_limits: bool = False, global_per_second: int = 30, chat_per_second: int = 1,
+                 chat_burst: int = 3, group_per_minute: int = 20, retry_after: int = 1):
+        self.server = HTTPServer(host, port)
+        self.server.add_route("POST", "/bot", self._handle, prefix=True)
+        self.latency = latency
+        self.enforce_limits = enforce_limits
+        self.global_per_second = global_per_second
+        self.chat_per_second = chat_per_second
+        self.chat_burst = chat_burst
+        self.group_per_minute = group_per_minute
+        self.retry_after = retry_after
+        self.rejected: Counter = Counter()
+        self._global_window: Deque[float] = deque()
+        self._chat_windows: Dict[Any, Deque[float]] = defaultdict(deque)
+        self.calls: List[RecordedCall] = []
+        self.counters: Counter = Counter()
+        self.on_call: Optional[Callable[[RecordedCall], None]] = None
+        self._updates: List[Dict[str, Any]] = []
+        self._updates_available = asyncio.Event()
+        self._message_ids = itertools.count(1000)
+        self.webhook: Dict[str, Any] = {}
+
+    @property
+    def base_url(self) -> str:
+        """Value for ``TELEGRAM_BASE_URL``"""
+        return f"http://{self.server.host}:{self.server.port}/bot"
+
+    async def start(self) -> "FakeBotAPI":
+        await self.server.start()
+        return self
+
+    async def stop(self) -> None:
+        await self.server.stop()
+
+    async def __aenter__(self) -> "FakeBotAPI":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    def push_update(self, update: Dict[str, Any]) -> None:
+        """Make an update available to getUpdates"""
+        self._updates.append(update)
+        self._updates_available.set()
+
+    async def _handle(self, request: Request) -> Response:
+        method = request.path.rsplit("/", 1)[-1]
+        params = _decode_params(request)
+        call = RecordedCall(method, params, time.perf_counter())
+        self.calls.append(call)
+        self.counters[method] += 1
+        if self.on_call:
+            self.on_call(call)
+
+        if method == "getUpdates":
+            return self._ok(await self._get_updates(params))
+        if self.enforce_limits and method not in UNLIMITED_METHODS and not self._admit(params.get("chat_id")):
+            self.rejected[method] += 1
+            return self._too_many_requests()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._ok(self._result_for(method, params))
+
+    @staticmethod
+    def _within(window: Deque[float], now: float, period: float, limit: int) -> bool:
+        while window and window[0] <= now - period:
+            window.popleft()
+        return len(window) < limit
+
+    def _admit(self, chat_id: Any) -> bool:
+        """Sliding-window flood control: overall, per private chat (with burst) and per group"""
+        now = time.monotonic()
+        if not self._within(self._global_window, now, 1.0, self.global_per_second):
+            return False
+        if chat_id is not None:
+            window = self._chat_windows[chat_id]
+            is_group = isinstance(chat_id, str) or int(chat_id) < 0
+            if is_group:
+                allowed = self._within(window, now, 60.0, self.group_per_minute)
+            else:
+                # ``chat_per_second`` sustained over a minute, short bursts of ``chat_burst`` extra
+                burst = self.chat_burst + self.chat_per_second
+                allowed = (self._within(window, now, 60.0, self.chat_burst + 60 * self.chat_per_second)
+                           and sum(1 for sent in window if sent > now - 1.0) < burst)
+            if not allowed:
+                return False
+            window.append(now)
+        self._global_window.append(now)
+        return True
+
+    def _too_many_requests(self) -> Response:
+        return Response.json({
+            "ok": False,
+            "error_code": 429,
+            "description": f"Too Many Requests: retry after {self.retry_after}",
+            "parameters": {"retry_after": self.retry_after},
+        }, status=429)
+
+    async def _get_updates(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        offset = int(params.get("offset") or 0)
+        limit = int(params.get("limit") or 100)
+        timeout = float(params.get("timeout") or 0)
+        self._updates = [u for u in self._updates if u["update_id"] >= offset]
+        if not self._updates and timeout > 0:
+            self._updates_available.clear()
+            try:
+                await asyncio.wait_for(self._updates_available.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self._updates[:limit]
+
+    def _message(self, params: Dict[str, Any], message_id: Optional[int] = None) -> Dict[str, Any]:
+        chat_id = params.get("chat_id", 1)
+        return {
+            "message_id": message_id or next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": int(chat_id), "type": "private" if int(chat_id) > 0 else "group"},
+            "from": BOT_USER,
+            "text": params.get("text", ""),
+        }
+
+    def _result_for(self, method: str, params: Dict[str, Any]) -> Any:
+        if method == "getMe":
+            return BOT_USER
+        if method == "setWebhook":
+            self.webhook = params
+            return True
+        if method in ("sendMessage", "sendDocument"):
+            return self._message(params)
+        if method in ("editMessageText", "editMessageReplyMarkup"):
+            return self._message(params, int(params.get("message_id") or 0) or None)
+        return True
+
+    @staticmethod
+    def _ok(result: Any) -> Response:
+        return Response.json({"ok": True, "result": result})
+
+
+class UpdateFactory:
+    """Builds synthetic Telegram updates"""
+
+    def __init__(self, first_update_id: int = 1):
+        self._update_ids = itertools.count(first_update_id)
+        self._message_ids = itertools.count(1)
+
+    @staticmethod
+    def _user(user_id: int) -> Dict[str, Any]:
+        return {"id": user_id, "is_bot": False, "first_name": f"User{user_id}", "username": f"user{user_id}",
+                "language_code": "en"}
+
+    def message(self, user_id: int, text: str) -> Dict[str, Any]:
+        """A private text message; commands get a bot_command entity"""
+        message = {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": self._user(user_id),
+            "text": text,
+        }
+        if text.startswith("/"):
+            message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+        return {"update_id": next(self._update_ids), "message": message}
+
+    def callback(self, user_id: int, data: str, message_id: int = 1) -> Dict[str, Any]:
+        """An inline keyboard tap on one of the bot's messages"""
+        return {
+            "update_id": next(self._update_ids),
+            "callback_query": {
+                "id": str(next(self._message_ids)),
+                "from": self._user(user_id),
+                "chat_instance": str(user_id),
+                "data": data,
+                "message": {
+                    "message_id": message_id,
+                    "date": int(time.time()),
+                    "chat": {"id": user_id, "type": "private"},
+                    "from": BOT_USER,
+                    "text": "menu",
+                },
+            },
+        }
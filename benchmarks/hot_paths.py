@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks of the bot's hot paths, with a stored baseline to catch regressions.
+
+``StatsManager`` is filled with synthetic users (1k and 100k by default, ``--users``
+takes any list, e.g. ``1000,100000,1000000``) whose last visits are spread over two
+days, and every operation a handler triggers is timed against it: ``track_user`` and
+``track_command`` (both include writing the statistics files), ``get_stats_summary``,
+``get_users_list`` and ``_get_recent_users_count``. ``translate``, ``format_joke`` and
+``escape_markdown`` do not depend on the number of users and are timed once.
+
+Each operation is repeated until ``--min-time`` seconds have passed (at least
+``--min-reps`` times) and reported as median/mean/min microseconds per call. With
+``--baseline`` the medians are compared to a previous ``--json`` output; anything
+slower than the baseline by more than ``--tolerance`` is flagged and the exit status
+is 1. Runs fully offline, no bot token needed.
+
+    python -m benchmarks.hot_paths --json hot_paths.json
+    python -m benchmarks.hot_paths --baseline benchmarks/baselines/hot_paths.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+
+from benchmarks.common import prepare_environment, write_json
+
+COMMANDS = ["/start", "/help", "/joke", "/stats", "/menu", "/language", "message"]
+
+
+def _measure(operation: Callable[[], Any], min_time: float, min_reps: int, max_reps: int = 100_000) -> Dict[str, Any]:
+    """Per-call timings of ``operation`` in microseconds"""
+    timings: List[float] = []
+    deadline = time.perf_counter() + min_time
+    while len(timings) < max_reps and (len(timings) < min_reps or time.perf_counter() < deadline):
+        started = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - started)
+    return {
+        "median_us": round(statistics.median(timings) * 1e6, 3),
+        "mean_us": round(statistics.fmean(timings) * 1e6, 3),
+        "min_us": round(min(timings) * 1e6, 3),
+        "reps": len(timings),
+    }
+
+
+def _measure_batch(operation: Callable[[Any], Any], inputs: List[Any], min_time: float, min_reps: int) -> Dict[str, Any]:
+    """Like ``_measure`` for operations too fast to time one by one: one rep calls it for every input"""
+    result = _measure(lambda: [operation(value) for value in inputs], min_time, min_reps)
+    for key in ("median_us", "mean_us", "min_us"):
+        result[key] = round(result[key] / len(inputs), 4)
+    result["calls_per_rep"] = len(inputs)
+    return result
+
+
+def populate(manager, users: int) -> None:
+    """Fill ``manager`` with ``users`` synthetic users, half of them seen in the last 24 hours"""
+    from stats import BotStats, UserStats
+
+    now = datetime.now(timezone.utc)
+    span = timedelta(hours=48).total_seconds()
+    manager.users.clear()
+    for user_id in range(1, users + 1):
+        seen = (now - timedelta(seconds=(user_id * 7919) % span)).isoformat()
+        manager.users[user_id] = UserStats(
+            user_id=user_id,
+            username=f"user{user_id}" if user_id % 3 else None,
+            first_name=f"Name{user_id}",
+            last_name="Surname" if user_id % 2 else None,
+            language=("uk", "en", "pl")[user_id % 3],
+            first_seen=seen,
+            last_seen=seen,
+            message_count=user_id % 50,
+            commands_used={COMMANDS[user_id % len(COMMANDS)]: 1},
+        )
+    manager.bot_stats = BotStats(
+        start_time=(now - timedelta(days=3)).isoformat(),
+        last_restart=now.isoformat(),
+        total_users=users,
+        total_messages=users * 10,
+        total_commands=users * 5,
+        commands_breakdown={command: users for command in COMMANDS},
+    )
+
+
+def run_stats(users: int, min_time: float, min_reps: int) -> Dict[str, Dict[str, Any]]:
+    from base import UserInfo
+    from stats import StatsManager
+
+    results = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        manager = StatsManager(data_dir)
+        populate(manager, users)
+        counter = iter(range(10**12))
+
+        def track_user() -> None:
+            user_id = next(counter) % users + 1
+            manager.track_user(UserInfo(user_id, f"user{user_id}", f"Name{user_id}"))
+
+        operations = {
+            "track_user": track_user,
+            "track_command": lambda: manager.track_command(next(counter) % users + 1, "/joke"),
+            "get_stats_summary": lambda: manager.get_stats_summary("en"),
+            "get_users_list": lambda: manager.get_users_list("en", limit=20),
+            "_get_recent_users_count": manager._get_recent_users_count,
+        }
+        for name, operation in operations.items():
+            results[f"stats.{name}[users={users}]"] = _measure(operation, min_time, min_reps)
+    return results
+
+
+def run_scalar(min_time: float, min_reps: int) -> Dict[str, Dict[str, Any]]:
+    import localization
+    from constants import BotConstants
+    from utils import escape_markdown, format_joke
+
+    localization.load_translations()
+    keys = sorted({key for catalog in localization.catalogs.values() for key in catalog})
+    pairs = [(key, lang) for lang in BotConstants.SUPPORTED_LANGUAGES for key in keys]
+    jokes = [{"response": f"Why did user {i} cross the road? To get to the *other* side_{i}!"} for i in range(100)]
+    texts = [f"user_{i} [link](http://example.com/{i}) *bold* 1.{i}-2!" for i in range(100)]
+    return {
+        "translate": _measure_batch(lambda pair: localization.translate(*pair), pairs, min_time, min_reps),
+        "format_joke": _measure_batch(lambda joke: format_joke(joke, "en"), jokes, min_time, min_reps),
+        "escape_markdown": _measure_batch(escape_markdown, texts, min_time, min_reps),
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+    """Print current vs baseline medians; returns the names that regressed"""
+    regressions = []
+    width = max(len(name) for name in results)
+    print(f"== compared to baseline (tolerance {tolerance:.0%}) ==")
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"  {name.ljust(width)}  {current['median_us']:>12.3f} us  (not in baseline)")
+            continue
+        ratio = current["median_us"] / before["median_us"] if before["median_us"] else float("inf")
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"  {name.ljust(width)}  {current['median_us']:>12.3f} us  vs {before['median_us']:>12.3f} us  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", default="1000,100000", help="comma-separated StatsManager sizes")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds to spend on each operation")
+    parser.add_argument("--min-reps", type=int, default=3, help="minimum repetitions per operation")
+    parser.add_argument("--json", dest="json_path", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON written by an earlier --json run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    prepare_environment(LOG_LEVEL="CRITICAL", LOG_ASYNC="false", TRACE_ENABLED="false")
+    results: Dict[str, Dict[str, Any]] = {}
+    for users in (int(value) for value in args.users.split(",") if value.strip()):
+        results.update(run_stats(users, args.min_time, args.min_reps))
+    results.update(run_scalar(args.min_time, args.min_reps))
+
+    width = max(len(name) for name in results)
+    print("== hot paths (microseconds per call) ==")
+    for name, result in results.items():
+        print(f"  {name.ljust(width)}  median {result['median_us']:>12.3f}  mean {result['mean_us']:>12.3f}  "
+              f"min {result['min_us']:>12.3f}  reps {result['reps']}")
+
+    write_json(args.json_path, {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "results": results,
+    })
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
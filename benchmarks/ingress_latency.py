@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Update-to-handler latency for long polling vs webhook ingress.
+
+A fake Telegram sender injects ``/start`` updates from many users, either through the fake
+Bot API's ``getUpdates`` (polling) or by POSTing them to the bot's webhook route. A
+group -1 ``TypeHandler`` records when each update reaches the handlers of the real
+``Application`` from ``main.build_application``.
+
+    python -m benchmarks.ingress_latency --mode both --updates 500 --rate 200
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import Dict, List
+
+from benchmarks.common import latency_summary, prepare_environment, print_report, write_json
+from benchmarks.fake_bot_api import FakeBotAPI, UpdateFactory
+
+SECRET = "bench-secret"
+
+
+async def _send_updates(push, updates: List[dict], rate: float, sent_at: Dict[int, float]) -> None:
+    """Emit updates at ``rate`` per second (0 = as fast as possible)"""
+    interval = 1.0 / rate if rate else 0.0
+    started = time.perf_counter()
+    for i, update in enumerate(updates):
+        if interval:
+            delay = started + i * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        sent_at[update["update_id"]] = time.perf_counter()
+        await push(update)
+
+
+async def run_mode(mode: str, updates: int, users: int, rate: float) -> dict:
+    """Run one ingress mode against a fresh fake Bot API and application"""
+    from telegram import Update
+    from telegram.ext import TypeHandler
+
+    from config import Config
+    from http_server import HTTPServer
+    from main import build_application
+    from webhook import WebhookIngress
+
+    async with FakeBotAPI() as fake_api:
+        Config.TELEGRAM_BASE_URL = fake_api.base_url
+        application = build_application()
+
+        sent_at: Dict[int, float] = {}
+        handled_at: Dict[int, float] = {}
+        all_handled = asyncio.Event()
+
+        async def record(update: Update, context) -> None:
+            handled_at[update.update_id] = time.perf_counter()
+            if len(handled_at) == updates:
+                all_handled.set()
+
+        application.add_handler(TypeHandler(Update, record), group=-1)
+
+        factory = UpdateFactory()
+        batch = [factory.message(10_000 + i % users, "/start") for i in range(updates)]
+
+        async with application:
+            await application.start()
+            if mode == "polling":
+                await application.updater.start_polling(poll_interval=0.0, timeout=10)
+
+                async def push(update: dict) -> None:
+                    fake_api.push_update(update)
+
+                server = None
+                client = None
+            else:
+                import httpx
+
+                server = HTTPServer("127.0.0.1", 0)
+                ingress = WebhookIngress.for_application(application, SECRET)
+                server.add_route("POST", Config.WEBHOOK_PATH, ingress.handle)
+                await server.start()
+                client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{server.port}")
+                headers = {"X-Telegram-Bot-Api-Secret-Token": SECRET}
+
+                async def push(update: dict) -> None:
+                    response = await client.post(Config.WEBHOOK_PATH, json=update, headers=headers)
+                    response.raise_for_status()
+
+            started = time.perf_counter()
+            await _send_updates(push, batch, rate, sent_at)
+            await asyncio.wait_for(all_handled.wait(), timeout=120)
+            elapsed = time.perf_counter() - started
+
+            if application.updater.running:
+                await application.updater.stop()
+            if client is not None:
+                await client.aclose()
+            if server is not None:
+                await server.stop()
+            await application.stop()
+
+    latencies = [handled_at[uid] - sent_at[uid] for uid in sent_at]
+    return latency_summary(latencies, elapsed, mode=mode, users=users, send_rate_per_s=rate or "max",
+                           bot_api_calls=sum(fake_api.counters.values()) - fake_api.counters["getUpdates"])
+
+
+async def _main(args: argparse.Namespace) -> dict:
+    modes = ["polling", "webhook"] if args.mode == "both" else [args.mode]
+    return {mode: await run_mode(mode, args.updates, args.users, args.rate) for mode in modes}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["polling", "webhook", "both"], default="both")
+    parser.add_argument("--updates", type=int, default=300, help="updates to send per mode")
+    parser.add_argument("--users", type=int, default=50, help="distinct synthetic users")
+    parser.add_argument("--rate", type=float, default=100.0, help="updates per second (0 = burst)")
+    parser.add_argument("--json", dest="json_path", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    prepare_environment(LOG_LEVEL="CRITICAL")
+    logging.basicConfig(level=logging.CRITICAL)
+
+    results = asyncio.run(_main(args))
+    for mode, summary in results.items():
+        print_report(f"update-to-handler latency ({mode})", summary)
+    write_json(args.json_path, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Local stub of the jokes API (``POST /api/getJoke``) with configurable misbehaviour.
+
+Run standalone:
+
+    python -m benchmarks.joke_api_stub --port 8080 --latency lognormal --latency-ms 120 \
+        --error-rate 0.05 --error-status 500 --error-status 503
+
+and point the bot at it with ``JOKES_API_URL=http://127.0.0.1:8080``.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+REASONS = {
+    200: "OK", 400: "Bad Request", 401: "Unauthorized", 403: "Forbidden", 404: "Not Found",
+    405: "Method Not Allowed", 429: "Too Many Requests", 500: "Internal Server Error",
+    502: "Bad Gateway", 503: "Service Unavailable", 504: "Gateway Timeout",
+}
+
+
+@dataclass
+class StubProfile:
+    """How the stub behaves for each request"""
+    endpoint: str = "/api/getJoke"
+    latency: str = "fixed"
+    latency_ms: float = 50.0
+    # uniform: +/- spread, normal: standard deviation, lognormal: spread / median is sigma
+    latency_spread_ms: float = 0.0
+    error_rate: float = 0.0
+    error_statuses: List[int] = field(default_factory=lambda: [500])
+    slow_body_rate: float = 0.0
+    slow_body_chunk_delay_ms: float = 200.0
+    partial_body_rate: float = 0.0
+    seed: Optional[int] = None
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Draw one response latency in seconds"""
+        mean = self.latency_ms
+        spread = self.latency_spread_ms
+        if self.latency == "uniform":
+            value = rng.uniform(mean - spread, mean + spread)
+        elif self.latency == "normal":
+            value = rng.gauss(mean, spread)
+        elif self.latency == "lognormal":
+            # latency_ms is the median, spread relative to it is the log-space sigma
+            sigma = spread / mean if mean > 0 else 0.0
+            value = mean * rng.lognormvariate(0.0, sigma) if sigma > 0 else mean
+        elif self.latency == "exponential":
+            value = rng.expovariate(1.0 / mean) if mean > 0 else 0.0
+        else:
+            value = mean
+        return max(0.0, value) / 1000.0
+
+
+class JokeApiStub:
+    """Minimal asyncio HTTP/1.1 server speaking the jokes API schema"""
+
+    def __init__(self, profile: Optional[StubProfile] = None, host: str = "127.0.0.1", port: int = 0):
+        self.profile = profile or StubProfile()
+        self.host = host
+        self.port = port
+        self.rng = random.Random(self.profile.seed)
+        self.counters: Counter = Counter()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._served = 0
+
+    @property
+    def url(self) -> str:
+        """Base URL to use as ``JOKES_API_URL``"""
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> "JokeApiStub":
+        """Start listening; port 0 picks a free port"""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Joke API stub listening on {self.url}{self.profile.endpoint}")
+        return self
+
+    async def stop(self) -> None:
+        """Stop listening and close open connections"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "JokeApiStub":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        """Read one request; returns None when the client closed the connection"""
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        method, path, _ = request_line.decode("latin-1").split(" ", 2)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", "0") or 0)
+        body = await reader.readexactly(length) if length else b""
+        return method, path.split("?", 1)[0], headers, body
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                keep_alive = await self._respond(writer, *request)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, method: str, path: str,
+                       headers: Dict[str, str], body: bytes) -> bool:
+        """Answer one request; returns whether the connection can be reused"""
+        self.counters["requests"] += 1
+        profile = self.profile
+
+        if path != profile.endpoint:
+            return await self._send(writer, 404, {"error": "not found"})
+        if method != "POST":
+            return await self._send(writer, 405, {"error": "method not allowed"})
+        try:
+            payload = json.loads(body or b"{}")
+            user_input = payload["input"]
+        except (ValueError, KeyError, TypeError):
+            return await self._send(writer, 400, {"error": "field 'input' is required"})
+
+        await asyncio.sleep(profile.sample_latency(self.rng))
+
+        if self.rng.random() < profile.error_rate:
+            status = self.rng.choice(profile.error_statuses)
+            return await self._send(writer, status, {"error": "stub failure"})
+
+        self._served += 1
+        joke = {"response": f"Stub joke #{self._served} ({payload.get('language', 'Ukrainian')}): {str(user_input)[:60]}"}
+
+        if self.rng.random() < profile.partial_body_rate:
+            return await self._send(writer, 200, joke, partial=True)
+        if self.rng.random() < profile.slow_body_rate:
+            return await self._send(writer, 200, joke, slow=True)
+        return await self._send(writer, 200, joke)
+
+    async def _send(self, writer: asyncio.StreamWriter, status: int, payload: dict,
+                    partial: bool = False, slow: bool = False) -> bool:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        declared = len(body) * 2 if partial else len(body)
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, 'Status')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {declared}\r\n"
+            f"Connection: {'close' if partial else 'keep-alive'}\r\n\r\n"
+        ).encode("latin-1")
+        self.counters[f"status_{status}"] += 1
+
+        writer.write(head)
+        if partial:
+            # Promise more bytes than we send, then hang up mid-body
+            self.counters["partial_bodies"] += 1
+            writer.write(body[: len(body) // 2])
+            await writer.drain()
+            return False
+        if slow:
+            self.counters["slow_bodies"] += 1
+            chunk = max(1, len(body) // 4)
+            for offset in range(0, len(body), chunk):
+                writer.write(body[offset:offset + chunk])
+                await writer.drain()
+                await asyncio.sleep(self.profile.slow_body_chunk_delay_ms / 1000.0)
+            return True
+        writer.write(body)
+        await writer.drain()
+        return True
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register the stub behaviour options on a CLI parser"""
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="fixed", help="latency distribution")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="mean (median for lognormal) latency")
+    parser.add_argument("--latency-spread-ms", type=float, default=0.0, help="spread / stddev / sigma")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, action="append", dest="error_statuses",
+                        help="status codes to fail with (repeatable, default 500)")
+    parser.add_argument("--slow-body-rate", type=float, default=0.0, help="fraction of bodies sent in slow chunks")
+    parser.add_argument("--slow-body-delay-ms", type=float, default=200.0, help="delay between slow body chunks")
+    parser.add_argument("--partial-body-rate", type=float, default=0.0, help="fraction of bodies cut off mid-way")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible runs")
+
+
+def profile_from_args(args: argparse.Namespace) -> StubProfile:
+    """Build a StubProfile from parsed CLI options"""
+    return StubProfile(
+        latency=args.latency,
+        latency_ms=args.latency_ms,
+        latency_spread_ms=args.latency_spread_ms,
+        error_rate=args.error_rate,
+        error_statuses=args.error_statuses or [500],
+        slow_body_rate=args.slow_body_rate,
+        slow_body_chunk_delay_ms=args.slow_body_delay_ms,
+        partial_body_rate=args.partial_body_rate,
+        seed=args.seed,
+    )
+
+
+async def _serve_forever(stub: JokeApiStub) -> None:
+    async with stub:
+        print(f"Joke API stub listening on {stub.url}{stub.profile.endpoint} (Ctrl+C to stop)")
+        await asyncio.Event().wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    try:
+        asyncio.run(_serve_forever(JokeApiStub(profile_from_args(args), args.host, args.port)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Load generator for the jokes API client (``utils.get_random_joke``).
+
+By default it starts a local ``JokeApiStub`` so the run is fully offline:
+
+    python -m benchmarks.joke_load --concurrency 50 --requests 2000 --latency-ms 80 \
+        --latency normal --latency-spread-ms 20 --error-rate 0.02 --seed 1
+
+Use ``--url`` to drive an already running API instead of the built-in stub.
+"""
+import argparse
+import asyncio
+import logging
+import time
+from collections import Counter
+from typing import List
+
+from benchmarks.common import latency_summary, prepare_environment, print_report, write_json
+from benchmarks.joke_api_stub import JokeApiStub, add_profile_arguments, profile_from_args
+
+
+async def run_load(concurrency: int, total_requests: int, duration: float, lang: str) -> dict:
+    """Drive get_random_joke from ``concurrency`` workers and collect latencies"""
+    # Imported late: the bot modules read the environment prepared by the caller
+    from utils import close_jokes_client, format_joke, get_random_joke
+
+    failure_text = format_joke(None, lang)
+    latencies: List[float] = []
+    outcomes: Counter = Counter()
+    issued = 0
+    stop_at = time.perf_counter() + duration if duration else None
+
+    async def worker(worker_id: int) -> None:
+        nonlocal issued
+        while True:
+            if stop_at is not None:
+                if time.perf_counter() >= stop_at:
+                    return
+            elif issued >= total_requests:
+                return
+            issued += 1
+            started = time.perf_counter()
+            text = await get_random_joke(f"load test #{issued} from worker {worker_id}", lang)
+            latencies.append(time.perf_counter() - started)
+            outcomes["ok" if text != failure_text else "failed"] += 1
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    finally:
+        await close_jokes_client()
+    elapsed = time.perf_counter() - started
+
+    return latency_summary(latencies, elapsed, concurrency=concurrency, **dict(outcomes))
+
+
+async def _main(args: argparse.Namespace) -> dict:
+    if args.url:
+        prepare_environment(args.url, JOKES_API_TIMEOUT=args.timeout)
+        return await run_load(args.concurrency, args.requests, args.duration, args.lang)
+
+    async with JokeApiStub(profile_from_args(args)) as stub:
+        prepare_environment(stub.url, JOKES_API_TIMEOUT=args.timeout)
+        result = await run_load(args.concurrency, args.requests, args.duration, args.lang)
+        result["stub_counters"] = dict(stub.counters)
+        return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="use an existing jokes API instead of the built-in stub")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent callers")
+    parser.add_argument("--requests", type=int, default=500, help="total requests (ignored with --duration)")
+    parser.add_argument("--duration", type=float, default=0.0, help="run for N seconds instead of a fixed count")
+    parser.add_argument("--timeout", type=int, default=10, help="JOKES_API_TIMEOUT for the client")
+    parser.add_argument("--lang", default="en", choices=["uk", "en", "pl"])
+    parser.add_argument("--json", dest="json_path", help="write results as JSON to this file")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    # The client logs every request at INFO; keep the benchmark output readable
+    logging.basicConfig(level=logging.CRITICAL)
+
+    result = asyncio.run(_main(args))
+    print_report("get_random_joke load test", result)
+    write_json(args.json_path, result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Per-update logging overhead on the event-loop thread: synchronous handlers vs the queue pipeline.
+
+Each simulated update emits the log lines a joke request used to produce (interaction and
+command tracking plus three lines per ``fetch_joke`` with the request body and headers)
+through ``logging.basicConfig`` handlers, and then the lines the bot emits now through
+``logging_pipeline`` (lazy %-formatting, call-site rate limit, listener thread). Both write
+to a console stream and a log file in a temporary directory. ``--io-latency-ms`` adds a
+delay to every write, standing in for a slow disk or a blocked stdout pipe.
+
+    python -m benchmarks.logging_bench --updates 5000 --io-latency-ms 0.2
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+from typing import Callable, List
+
+from benchmarks.common import latency_summary, prepare_environment, print_report, write_json
+
+
+class SlowStreamHandler(logging.StreamHandler):
+    """StreamHandler whose every write takes ``delay`` seconds longer"""
+
+    def __init__(self, stream, delay: float):
+        super().__init__(stream)
+        self.delay = delay
+
+    def emit(self, record: logging.LogRecord) -> None:
+        super().emit(record)
+        if self.delay:
+            time.sleep(self.delay)
+
+
+def _handlers(directory: str, name: str, delay: float) -> List[logging.Handler]:
+    console = open(os.path.join(directory, f"{name}-console.log"), "w", encoding="utf-8")
+    return [SlowStreamHandler(console, delay), logging.FileHandler(os.path.join(directory, f"{name}-bot.log"), encoding="utf-8")]
+
+
+def legacy_update_logs(logger: logging.Logger, user_id: int, headers: dict) -> None:
+    """Lines logged per joke request before the pipeline (eager f-strings)"""
+    logger.info(f"User interaction tracked: {user_id} (@user{user_id})")
+    logger.info(f"Command usage tracked: joke by user {user_id}")
+    logger.info(f"Fetching joke with user input: Tell me a joke about {user_id} and language: en")
+    logger.info("Making request to: http://jokes.local/api/getJoke")
+    logger.info(f"Request data: {dict(input=f'Tell me a joke about {user_id}', language='English')}")
+    logger.info(f"Headers: {headers}")
+    logger.info("Successfully fetched joke from custom API")
+
+
+def current_update_logs(logger: logging.Logger, user_id: int, headers: dict) -> None:
+    """Lines logged per joke request now (lazy formatting, one request line)"""
+    logger.info("User interaction tracked: %s (@%s)", user_id, f"user{user_id}")
+    logger.info("Command usage tracked: %s by user %s", "joke", user_id)
+    logger.info("Fetching joke (language: %s, input: %d chars)", "English", 24)
+    logger.info("Successfully fetched joke from custom API")
+
+
+def _measure(emit: Callable[[int], None], updates: int) -> List[float]:
+    latencies = []
+    for user_id in range(updates):
+        started = time.perf_counter()
+        emit(user_id)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def run(updates: int, io_delay: float, rate_limit: float) -> dict:
+    import logging_pipeline
+    from config import Config
+
+    headers = dict(Config.JOKES_API_HEADERS, Authorization="Bearer bench-secret")
+    logger = logging.getLogger("utils")
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        logging.basicConfig(format=Config.LOG_FORMAT, level=logging.INFO, handlers=_handlers(tmp, "sync", io_delay), force=True)
+        started = time.perf_counter()
+        latencies = _measure(lambda user_id: legacy_update_logs(logger, user_id, headers), updates)
+        results["sync_handlers"] = latency_summary(latencies, time.perf_counter() - started)
+
+        for name, limit in (("queue_pipeline", 0.0), ("queue_pipeline_rate_limited", rate_limit)):
+            handlers = _handlers(tmp, name, io_delay)
+            formatter = logging.Formatter(Config.LOG_FORMAT)
+            for handler in handlers:
+                handler.setFormatter(formatter)
+            pipeline = logging_pipeline.install(handlers, logging.INFO, secrets=("bench-secret",), rate_limit=limit)
+            started = time.perf_counter()
+            latencies = _measure(lambda user_id: current_update_logs(logger, user_id, headers), updates)
+            elapsed = time.perf_counter() - started
+            backlog = pipeline.queue.qsize()
+            pipeline.stop()
+            results[name] = latency_summary(latencies, elapsed, queue_backlog_at_end=backlog,
+                                            drained_after_s=round(time.perf_counter() - started, 4),
+                                            **pipeline.sampler.get_metrics())
+        logging.getLogger().handlers.clear()
+
+    for summary in results.values():
+        summary["per_update_us"] = round(summary.pop("mean_ms") * 1000, 2)
+        summary.pop("throughput_per_s")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--io-latency-ms", type=float, default=0.0, help="extra time per console write")
+    parser.add_argument("--rate-limit", type=float, default=20.0, help="LOG_RATE_LIMIT for the last variant")
+    parser.add_argument("--json", dest="json_path", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    prepare_environment(LOG_LEVEL="CRITICAL")
+    results = run(args.updates, args.io_latency_ms / 1000.0, args.rate_limit)
+    for name, summary in results.items():
+        print_report(f"logging per update ({name})", summary)
+    write_json(args.json_path, results)
+
+
+if __name__ == "__main__":
+    main()
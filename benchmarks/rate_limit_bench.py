@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Outbound rate limiting against a fake Bot API that enforces Telegram's flood limits.
+
+A bulk broadcast (one message to each of many users, ``Priority.BULK``) runs while
+interactive replies to a few active users keep arriving. The same load is sent with
+and without ``PriorityRateLimiter``; the report shows 429 responses, failed sends,
+throughput and how long interactive replies waited behind the broadcast.
+
+    python -m benchmarks.rate_limit_bench --broadcast 300 --interactive 60 --interactive-rate 10
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import List
+
+from benchmarks.common import latency_summary, prepare_environment, print_report, write_json
+from benchmarks.fake_bot_api import FakeBotAPI
+
+
+async def run_case(limited: bool, args: argparse.Namespace) -> dict:
+    """Send the broadcast and the interactive replies once"""
+    from telegram.error import RetryAfter
+    from telegram.ext import ExtBot
+
+    from rate_limiter import Priority, PriorityRateLimiter
+
+    async with FakeBotAPI(latency=args.api_latency_ms / 1000.0, enforce_limits=True,
+                          global_per_second=args.global_limit) as fake_api:
+        limiter = PriorityRateLimiter(global_rate=args.global_limit, max_retries=args.max_retries) if limited else None
+        bot = ExtBot("123:bench", base_url=fake_api.base_url, rate_limiter=limiter)
+        failures = {"bulk": 0, "interactive": 0}
+        interactive_latencies: List[float] = []
+        bulk_latencies: List[float] = []
+
+        async def send(chat_id: int, kind: str, latencies: List[float]) -> None:
+            extra = {"rate_limit_args": Priority.BULK if kind == "bulk" else Priority.INTERACTIVE} if limited else {}
+            started = time.perf_counter()
+            try:
+                await bot.send_message(chat_id, f"{kind} message", **extra)
+                latencies.append(time.perf_counter() - started)
+            except RetryAfter:
+                failures[kind] += 1
+
+        async def interactive() -> None:
+            tasks = []
+            for i in range(args.interactive):
+                chat_id = 50_000 + i % args.active_users
+                tasks.append(asyncio.create_task(send(chat_id, "interactive", interactive_latencies)))
+                await asyncio.sleep(1.0 / args.interactive_rate)
+            await asyncio.gather(*tasks)
+
+        async with bot:
+            started = time.perf_counter()
+            broadcast = [send(60_000 + i, "bulk", bulk_latencies) for i in range(args.broadcast)]
+            await asyncio.gather(interactive(), *broadcast)
+            elapsed = time.perf_counter() - started
+
+    summary = latency_summary(interactive_latencies, elapsed, rate_limiter=limited,
+                              delivered=len(interactive_latencies) + len(bulk_latencies),
+                              delivered_per_s=round((len(interactive_latencies) + len(bulk_latencies)) / elapsed, 2),
+                              failed_bulk=failures["bulk"], failed_interactive=failures["interactive"],
+                              responses_429=sum(fake_api.rejected.values()))
+    summary["bulk_p50_ms"] = latency_summary(bulk_latencies, elapsed)["p50_ms"] if bulk_latencies else None
+    if limiter is not None:
+        summary["limiter"] = limiter.get_metrics()
+    return summary
+
+
+async def _main(args: argparse.Namespace) -> dict:
+    return {
+        "without_limiter": await run_case(False, args),
+        "with_limiter": await run_case(True, args),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--broadcast", type=int, default=300, help="bulk messages, one per user")
+    parser.add_argument("--interactive", type=int, default=60, help="interactive replies during the broadcast")
+    parser.add_argument("--interactive-rate", type=float, default=10.0, help="interactive replies per second")
+    parser.add_argument("--active-users", type=int, default=20, help="users receiving interactive replies")
+    parser.add_argument("--global-limit", type=int, default=30, help="messages per second overall")
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--api-latency-ms", type=float, default=10.0, help="fake Bot API round-trip time")
+    parser.add_argument("--json", dest="json_path", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    prepare_environment(LOG_LEVEL="CRITICAL")
+    logging.basicConfig(level=logging.CRITICAL)
+
+    results = asyncio.run(_main(args))
+    for case, summary in results.items():
+        print_report(f"outbound sends ({case}), latency = interactive replies", summary)
+    write_json(args.json_path, results)
+
+
+if __name__ == "__main__":
+    main()
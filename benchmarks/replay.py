@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+End-to-end capacity: replay a stream of Telegram updates through the real bot, offline.
+
+The ``Application`` from ``main.build_application`` long-polls the fake Bot API
+(``getUpdates``, ``sendMessage``, ``editMessageText``, ``answerCallbackQuery``,
+``deleteMessage``, ...) and fetches jokes from the local jokes API stub, so every
+layer runs: ingress, update processor, handlers, statistics, rate limiter and HTTP
+transports. Latency is measured per update from the moment it is offered to
+``getUpdates`` until its last handler returned; joke deliveries that continue in the
+background are waited for and reported separately.
+
+The stream is either recorded (``--input``: JSON lines or a JSON array of Bot API
+``Update`` objects; update IDs are renumbered in file order) or synthetic: users
+sending a seeded mix of commands, inline keyboard taps and free text. ``--output``
+saves the stream that was replayed so a run can be repeated exactly.
+
+    python -m benchmarks.replay --users 200 --per-user 10 --rate 0 --api-latency-ms 20
+    python -m benchmarks.replay --input updates.jsonl --rate 500 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from benchmarks.common import latency_summary, prepare_environment, print_report, write_json
+from benchmarks.fake_bot_api import FakeBotAPI, UpdateFactory
+from benchmarks.joke_api_stub import JokeApiStub, add_profile_arguments, profile_from_args
+
+COMMANDS = ["/start", "/help", "/menu", "/stats", "/info", "/language", "/joke cats"]
+CALLBACKS = ["menu", "stats", "settings", "help", "info", "contact", "change_language", "lang_en",
+             "echo_again", "another_joke"]
+TEXTS = ["hello there", "what can you do?", "tell me something funny", "👍"]
+
+
+def synthetic_stream(users: int, per_user: int, mix: Dict[str, float], seed: Optional[int]) -> List[dict]:
+    """``per_user`` updates from each of ``users`` users, interleaved round by round"""
+    rng = random.Random(seed)
+    factory = UpdateFactory()
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    updates = []
+    for _ in range(per_user):
+        for user in range(users):
+            user_id = 30_000 + user
+            kind = rng.choices(kinds, weights)[0]
+            if kind == "command":
+                updates.append(factory.message(user_id, rng.choice(COMMANDS)))
+            elif kind == "callback":
+                updates.append(factory.callback(user_id, rng.choice(CALLBACKS)))
+            else:
+                updates.append(factory.message(user_id, rng.choice(TEXTS)))
+    return updates
+
+
+def load_stream(path: str) -> List[dict]:
+    """Recorded updates (JSON lines or one JSON array), renumbered 1..N in file order"""
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read().strip()
+    if content.startswith("["):
+        updates = json.loads(content)
+    else:
+        updates = [json.loads(line) for line in content.splitlines() if line.strip()]
+    for update_id, update in enumerate(updates, 1):
+        update["update_id"] = update_id
+    return updates
+
+
+def save_stream(path: str, updates: List[dict]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(update, ensure_ascii=False) + "\n" for update in updates)
+
+
+def describe(update: dict) -> str:
+    if "callback_query" in update:
+        return "callback"
+    text = (update.get("message") or {}).get("text") or ""
+    return "command" if text.startswith("/") else "text"
+
+
+async def replay(updates: List[dict], rate: float, api_latency: float, concurrency: int, timeout: float) -> dict:
+    from telegram import Update
+    from telegram.ext import TypeHandler
+
+    from config import Config
+    from main import build_application
+    from user_states import state_manager
+
+    async with FakeBotAPI(latency=api_latency) as fake_api:
+        Config.TELEGRAM_BASE_URL = fake_api.base_url
+        Config.MAX_CONCURRENT_UPDATES = concurrency
+        application = build_application()
+
+        offered_at: Dict[int, float] = {}
+        handled_at: Dict[int, float] = {}
+        all_handled = asyncio.Event()
+
+        async def record(update: Update, context) -> None:
+            handled_at[update.update_id] = time.perf_counter()
+            if len(handled_at) == len(updates):
+                all_handled.set()
+
+        application.add_handler(TypeHandler(Update, record), group=99)
+
+        async with application:
+            if application.post_init:
+                await application.post_init(application)
+            await application.start()
+            await application.updater.start_polling(poll_interval=0.0, timeout=10)
+
+            interval = 1.0 / rate if rate else 0.0
+            started = time.perf_counter()
+            for i, update in enumerate(updates):
+                if interval:
+                    delay = started + i * interval - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                offered_at[update["update_id"]] = time.perf_counter()
+                fake_api.push_update(update)
+
+            try:
+                await asyncio.wait_for(all_handled.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            elapsed = time.perf_counter() - started
+            # Jokes are delivered by background tasks after their update was handled
+            joke_tasks = [task for task in state_manager.joke_tasks.values() if not task.done()]
+            if joke_tasks:
+                await asyncio.wait(joke_tasks, timeout=timeout)
+            drained = time.perf_counter() - started
+
+            await application.updater.stop()
+            await application.stop()
+            if application.post_stop:
+                await application.post_stop(application)
+        if application.post_shutdown:
+            await application.post_shutdown(application)
+
+    latencies = [handled_at[update_id] - offered_at[update_id] for update_id in handled_at]
+    calls = Counter(fake_api.counters)
+    calls.pop("getUpdates", None)
+    calls.pop("getMe", None)
+    return latency_summary(
+        latencies, elapsed,
+        offered=len(updates),
+        unhandled=len(updates) - len(handled_at),
+        mix=dict(Counter(describe(update) for update in updates)),
+        max_concurrent_updates=concurrency,
+        offer_rate_per_s=rate or "max",
+        drained_with_jokes_s=round(drained, 4),
+        bot_api_calls=dict(calls.most_common()),
+    )
+
+
+async def _main(args: argparse.Namespace) -> dict:
+    async with JokeApiStub(profile_from_args(args)) as stub:
+        prepare_environment(stub.url, LOG_LEVEL="CRITICAL", METRICS_ENABLED="false",
+                            JOKE_PLACEHOLDER_DELAY=str(args.placeholder_delay),
+                            RATE_LIMIT_ENABLED="false" if args.no_rate_limit else "true")
+        if args.input:
+            updates = load_stream(args.input)
+        else:
+            mix = {"command": args.commands, "callback": args.callbacks, "text": args.texts}
+            updates = synthetic_stream(args.users, args.per_user, mix, args.seed)
+        if args.output:
+            save_stream(args.output, updates)
+        result = await replay(updates, args.rate, args.api_latency_ms / 1000.0, args.concurrency, args.timeout)
+        result["jokes_api_requests"] = stub.counters["requests"]
+        return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", help="recorded updates to replay (JSON lines or JSON array)")
+    parser.add_argument("--output", help="save the replayed stream as JSON lines")
+    parser.add_argument("--users", type=int, default=100, help="synthetic users")
+    parser.add_argument("--per-user", type=int, default=10, help="synthetic updates per user")
+    parser.add_argument("--commands", type=float, default=0.3, help="share of commands in the synthetic mix")
+    parser.add_argument("--callbacks", type=float, default=0.5, help="share of inline keyboard taps")
+    parser.add_argument("--texts", type=float, default=0.2, help="share of free text messages")
+    parser.add_argument("--rate", type=float, default=0.0, help="updates offered per second (0 = all at once)")
+    parser.add_argument("--concurrency", type=int, default=32, help="MAX_CONCURRENT_UPDATES")
+    parser.add_argument("--api-latency-ms", type=float, default=20.0, help="fake Bot API round-trip time")
+    parser.add_argument("--placeholder-delay", type=float, default=1.0, help="JOKE_PLACEHOLDER_DELAY")
+    parser.add_argument("--no-rate-limit", action="store_true",
+                        help="disable the outbound Bot API rate limiter (measure the bot, not Telegram's limits)")
+    parser.add_argument("--timeout", type=float, default=600.0, help="give up waiting after N seconds")
+    parser.add_argument("--json", dest="json_path", help="write results as JSON to this file")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    result = asyncio.run(_main(args))
+    print_report("update replay (end to end)", result)
+    write_json(args.json_path, result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Encode and decode benchmark of the statistics files and jokes API payloads.
+
+``StatsManager`` is filled with synthetic users (100k by default, ``--users``) and
+each available ``serialization`` backend (``orjson`` if installed, ``json``) is timed
+in both file formats: ``encode`` is ``serializer.dumps`` of the users dictionary as
+``_save_data`` writes it, ``decode`` is ``serializer.loads`` of the result and ``load``
+also rebuilds the ``UserStats`` objects as ``_load_data`` does. ``legacy`` is the
+previous implementation (``asdict`` + ``json.dump(indent=2)``, ``json.load``) for
+comparison. A jokes API response is decoded the same way, per call.
+
+    python -m benchmarks.serialization_bench
+    python -m benchmarks.serialization_bench --users 1000000 --json serialization.json
+"""
+import argparse
+import json
+import platform
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.common import prepare_environment, write_json
+from benchmarks.hot_paths import _measure, _measure_batch, populate
+
+JOKE_RESPONSE = {
+    "joke": "Чому програмісти плутають Хелловін і Різдво? Бо Oct 31 == Dec 25.",
+    "category": "programming",
+    "language": "uk",
+    "id": "a1b2c3d4",
+    "tags": ["programming", "math"],
+    "rating": 4.7,
+}
+
+
+def _backends() -> List[Tuple[str, Any]]:
+    from serialization import JsonSerializer, OrjsonSerializer, orjson
+
+    backends = [("json", JsonSerializer())]
+    if orjson is not None:
+        backends.insert(0, ("orjson", OrjsonSerializer()))
+    return backends
+
+
+def run(users: int, min_time: float, min_reps: int) -> Dict[str, Dict[str, Any]]:
+    from stats import StatsManager, UserStats
+
+    manager = StatsManager()  # Empty temporary STATS_DATA_DIR (prepare_environment)
+    populate(manager, users)
+
+    def rebuild(data: Dict[str, Any]) -> Dict[int, UserStats]:
+        return {int(user_id): UserStats(**user) for user_id, user in data.items()}
+
+    cases: Dict[str, Tuple[Callable[[], bytes], Callable[[bytes], Any]]] = {
+        "legacy[pretty]": (
+            lambda: json.dumps({str(user_id): asdict(user) for user_id, user in manager.users.items()},
+                               indent=2, ensure_ascii=False).encode("utf-8"),
+            lambda data: json.loads(data.decode("utf-8")),
+        ),
+    }
+    for name, serializer in _backends():
+        for format_name, pretty in (("compact", False), ("pretty", True)):
+            cases[f"{name}[{format_name}]"] = (
+                lambda serializer=serializer, pretty=pretty: serializer.dumps(manager.users, pretty=pretty),
+                serializer.loads,
+            )
+
+    results = {}
+    for name, (encode, decode) in cases.items():
+        encoded = encode()
+        results[f"stats.encode.{name}[users={users}]"] = {**_measure(encode, min_time, min_reps), "bytes": len(encoded)}
+        results[f"stats.decode.{name}[users={users}]"] = _measure(lambda: decode(encoded), min_time, min_reps)
+        results[f"stats.load.{name}[users={users}]"] = _measure(lambda: rebuild(decode(encoded)), min_time, min_reps)
+
+    response = json.dumps(JOKE_RESPONSE, ensure_ascii=False).encode("utf-8")
+    results["joke.decode.legacy"] = _measure_batch(lambda data: json.loads(data.decode("utf-8")), [response] * 1000,
+                                                   min_time, min_reps)
+    for name, serializer in _backends():
+        results[f"joke.decode.{name}"] = _measure_batch(serializer.loads, [response] * 1000, min_time, min_reps)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000, help="synthetic users in the statistics")
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds to spend on each operation")
+    parser.add_argument("--min-reps", type=int, default=3, help="minimum repetitions per operation")
+    parser.add_argument("--json", dest="json_path", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    prepare_environment(LOG_LEVEL="CRITICAL", LOG_ASYNC="false", TRACE_ENABLED="false")
+    results = run(args.users, args.min_time, args.min_reps)
+
+    width = max(len(name) for name in results)
+    print("== serialization (milliseconds per call) ==")
+    for name, result in results.items():
+        size = f"  {result['bytes'] / 1e6:.1f} MB" if "bytes" in result else ""
+        print(f"  {name.ljust(width)}  median {result['median_us'] / 1000:>10.3f}  "
+              f"min {result['min_us'] / 1000:>10.3f}  reps {result['reps']}{size}")
+
+    write_json(args.json_path, {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "results": results,
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Single process vs user-sharded worker processes.
+
+The same synthetic load (``/start`` commands and Statistics taps from many users) is sent
+to the real handlers once in a single process and once through ``ShardSupervisor`` with
+N workers sharing one stats process. ``--cpu-ms`` adds busy CPU work per update, standing
+in for heavy rendering; that is where extra cores pay off. Replies go to a fake Bot API.
+
+    python -m benchmarks.sharding_throughput --users 200 --per-user 5 --cpu-ms 5 --workers 4
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+from typing import List
+
+from benchmarks.common import prepare_environment, print_report, write_json
+from benchmarks.fake_bot_api import FakeBotAPI, UpdateFactory
+
+# Reply calls that end the handling of one benchmark update
+TERMINAL_METHODS = ("sendMessage", "editMessageText")
+
+
+def build_bench_application():
+    """``main.build_application`` plus a handler burning ``BENCH_CPU_MS`` of CPU per update"""
+    from telegram import Update
+    from telegram.ext import TypeHandler
+
+    from main import build_application
+
+    application = build_application()
+    cpu_seconds = float(os.environ.get("BENCH_CPU_MS", "0")) / 1000.0
+
+    async def burn(update: Update, context) -> None:
+        deadline = time.perf_counter() + cpu_seconds
+        while time.perf_counter() < deadline:
+            pass
+
+    if cpu_seconds:
+        application.add_handler(TypeHandler(Update, burn), group=-1)
+    return application
+
+
+def synthetic_load(users: int, per_user: int, first_user: int = 30_000) -> List[dict]:
+    """Alternating /start and Statistics taps, interleaved across users"""
+    factory = UpdateFactory()
+    updates = []
+    for step in range(per_user):
+        for user in range(users):
+            user_id = first_user + user
+            if step % 2 == 0:
+                updates.append(factory.message(user_id, "/start"))
+            else:
+                updates.append(factory.callback(user_id, "stats"))
+    return updates
+
+
+async def _wait_for_replies(fake_api: FakeBotAPI, expected: int, timeout: float = 600) -> None:
+    deadline = time.monotonic() + timeout
+    while sum(fake_api.counters[method] for method in TERMINAL_METHODS) < expected:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"only {sum(fake_api.counters[m] for m in TERMINAL_METHODS)}/{expected} replies")
+        await asyncio.sleep(0.01)
+
+
+async def run_single(updates: List[dict], api_latency: float) -> dict:
+    """All updates through one in-process Application"""
+    from telegram import Update
+
+    from config import Config
+
+    async with FakeBotAPI(latency=api_latency) as fake_api:
+        Config.TELEGRAM_BASE_URL = fake_api.base_url
+        application = build_bench_application()
+        async with application:
+            await application.start()
+            started = time.perf_counter()
+            for data in updates:
+                application.update_queue.put_nowait(Update.de_json(data, application.bot))
+            await _wait_for_replies(fake_api, len(updates))
+            elapsed = time.perf_counter() - started
+            await application.stop()
+    return {"mode": "single", "updates": len(updates), "elapsed_s": round(elapsed, 4),
+            "updates_per_s": round(len(updates) / elapsed, 2)}
+
+
+async def run_sharded(updates: List[dict], api_latency: float, workers: int) -> dict:
+    """All updates through the ingress supervisor and ``workers`` processes"""
+    from sharding import ShardSupervisor
+
+    async with FakeBotAPI(latency=api_latency) as fake_api:
+        # Spawned workers read their configuration from the environment
+        os.environ["TELEGRAM_BASE_URL"] = fake_api.base_url
+        supervisor = ShardSupervisor(workers, factory_path="benchmarks.sharding_throughput:build_bench_application")
+        await supervisor.start()
+        try:
+            # Warm up: one update per shard, so process start-up is not measured
+            factory = UpdateFactory(first_update_id=10_000_000)
+            for worker in range(workers):
+                supervisor.dispatch(factory.message(90_000 * workers + worker, "/start"))
+            await _wait_for_replies(fake_api, workers)
+
+            baseline = sum(fake_api.counters[method] for method in TERMINAL_METHODS)
+            started = time.perf_counter()
+            for data in updates:
+                supervisor.dispatch(data)
+            await _wait_for_replies(fake_api, baseline + len(updates))
+            elapsed = time.perf_counter() - started
+        finally:
+            await supervisor.stop()
+    return {"mode": "sharded", "workers": workers, "updates": len(updates), "elapsed_s": round(elapsed, 4),
+            "updates_per_s": round(len(updates) / elapsed, 2), "dispatched_per_worker": supervisor.dispatched,
+            "restarts": supervisor.restarts}
+
+
+async def _main(args: argparse.Namespace) -> dict:
+    updates = synthetic_load(args.users, args.per_user)
+    latency = args.api_latency_ms / 1000.0
+    results = {"single": await run_single(updates, latency)}
+    for workers in args.workers or [2, 4]:
+        results[f"workers={workers}"] = await run_sharded(updates, latency, workers)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--per-user", type=int, default=4, help="updates per user")
+    parser.add_argument("--cpu-ms", type=float, default=5.0, help="CPU work per update in milliseconds")
+    parser.add_argument("--api-latency-ms", type=float, default=10.0, help="fake Bot API round-trip time")
+    parser.add_argument("--workers", type=int, action="append", help="worker counts to compare")
+    parser.add_argument("--no-rate-limit", action="store_true",
+                        help="disable the outbound rate limiter (its global limit is shared by all workers)")
+    parser.add_argument("--json", dest="json_path", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    prepare_environment(LOG_LEVEL="CRITICAL", BENCH_CPU_MS=args.cpu_ms,
+                        RATE_LIMIT_ENABLED="false" if args.no_rate_limit else "true")
+    logging.basicConfig(level=logging.CRITICAL)
+
+    results = asyncio.run(_main(args))
+    for name, summary in results.items():
+        print_report(f"update throughput ({name})", summary)
+    write_json(args.json_path, results)
+
+
+if __name__ == "__main__":
+    main()
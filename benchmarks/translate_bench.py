@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of ``localization.translate``: linear ``POFile.find`` vs compiled catalogs.
+
+The "before" path is the previous implementation (``find`` in the user's language, then in
+the default language). Lookups cycle through every msgid of the catalog plus a share of
+unknown strings, for each supported language. Catalog load time from ``.po`` and from a
+compiled ``.mo`` is measured too.
+
+    python -m benchmarks.translate_bench --lookups 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.common import prepare_environment, print_report, write_json
+
+
+def _legacy_translate(po_files: Dict) -> Callable[[str, str], str]:
+    from constants import BotConstants
+
+    def translate(text: str, lang: str) -> str:
+        if lang in po_files:
+            entry = po_files[lang].find(text)
+            if entry and entry.msgstr:
+                return entry.msgstr
+        if BotConstants.DEFAULT_LANG in po_files:
+            entry = po_files[BotConstants.DEFAULT_LANG].find(text)
+            if entry and entry.msgstr:
+                return entry.msgstr
+        return text
+    return translate
+
+
+def _time_lookups(translate: Callable[[str, str], str], keys: List[str], langs: List[str], lookups: int) -> float:
+    """Nanoseconds per call"""
+    pairs = [(key, lang) for lang in langs for key in keys]
+    rounds = max(1, lookups // len(pairs))
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for key, lang in pairs:
+            translate(key, lang)
+    return (time.perf_counter() - started) / (rounds * len(pairs)) * 1e9
+
+
+def _time_load(load: Callable[[], object], repeat: int = 5) -> float:
+    """Best of ``repeat`` in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        load()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def run(lookups: int, missing_ratio: float) -> dict:
+    import polib
+
+    import localization
+    from constants import BotConstants
+
+    langs = list(BotConstants.SUPPORTED_LANGUAGES)
+    po_paths = {lang: localization._catalog_paths(lang)[0] for lang in langs}
+    po_files = {lang: polib.pofile(path) for lang, path in po_paths.items() if os.path.exists(path)}
+
+    keys = sorted({entry.msgid for po in po_files.values() for entry in po})
+    missing = int(len(keys) * missing_ratio)
+    keys += [f"untranslated text {i}" for i in range(missing)]
+
+    legacy = _legacy_translate(po_files)
+    mismatches = sum(1 for lang in langs + ["xx"] for key in keys if legacy(key, lang) != localization.translate(key, lang))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mo_paths = {}
+        for lang, po in po_files.items():
+            mo_paths[lang] = os.path.join(tmp, f"{lang}.mo")
+            po.save_as_mofile(mo_paths[lang])
+        load_po_ms = _time_load(lambda: [polib.pofile(path) for path in po_paths.values()])
+        load_mo_ms = _time_load(lambda: [polib.mofile(path) for path in mo_paths.values()])
+
+    before = _time_lookups(legacy, keys, langs, lookups)
+    after = _time_lookups(localization.translate, keys, langs, lookups)
+    return {
+        "languages": len(langs),
+        "keys": len(keys),
+        "unknown_keys": missing,
+        "results_differ": mismatches,
+        "polib_find_ns_per_call": round(before, 1),
+        "compiled_ns_per_call": round(after, 1),
+        "speedup": round(before / after, 1) if after else None,
+        "load_po_ms": round(load_po_ms, 3),
+        "load_mo_ms": round(load_mo_ms, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lookups", type=int, default=200_000, help="translate calls per variant")
+    parser.add_argument("--missing-ratio", type=float, default=0.1, help="share of lookups for unknown strings")
+    parser.add_argument("--json", dest="json_path", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    prepare_environment(LOG_LEVEL="CRITICAL")
+    results = run(args.lookups, args.missing_ratio)
+    print_report("translate", results)
+    write_json(args.json_path, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Reply latency under concurrent users for different Telegram connection pool sizes.
+
+Many users get a reply at the same moment (``sendMessage`` through ``ExtBot`` on the
+outbound transport from ``telegram_transport``) while the fake Bot API answers after a
+fixed latency. With a small pool replies queue for a connection; the report shows the
+resulting reply latency next to the transport's own pool wait metrics.
+
+    python -m benchmarks.transport_pools --users 200 --api-latency-ms 50 --pool-size 8 --pool-size 64
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import List
+
+from benchmarks.common import latency_summary, prepare_environment, print_report, write_json
+from benchmarks.fake_bot_api import FakeBotAPI
+
+
+async def run_pool(pool_size: int, args: argparse.Namespace) -> dict:
+    """Send one reply per user, all at once, ``rounds`` times"""
+    from telegram.ext import ExtBot
+
+    from config import Config
+    from telegram_transport import build_transports
+
+    async with FakeBotAPI(latency=args.api_latency_ms / 1000.0) as fake_api:
+        Config.TELEGRAM_POOL_SIZE = pool_size
+        Config.TELEGRAM_KEEPALIVE_CONNECTIONS = pool_size
+        Config.TELEGRAM_POOL_TIMEOUT = args.pool_timeout
+        request, get_updates_request = build_transports()
+        bot = ExtBot("123:bench", base_url=fake_api.base_url, request=request, get_updates_request=get_updates_request)
+        latencies: List[float] = []
+        failures = 0
+
+        async def reply(chat_id: int) -> None:
+            nonlocal failures
+            started = time.perf_counter()
+            try:
+                await bot.send_message(chat_id, "reply")
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                failures += 1
+
+        async with bot:
+            started = time.perf_counter()
+            for _ in range(args.rounds):
+                await asyncio.gather(*(reply(40_000 + user) for user in range(args.users)))
+            elapsed = time.perf_counter() - started
+            metrics = request.get_metrics()
+
+    return latency_summary(latencies, elapsed, pool_size=pool_size, failed=failures,
+                           pool_wait_mean_ms=round(metrics["pool_wait_seconds_mean"] * 1000, 3),
+                           pool_wait_max_ms=round(metrics["pool_wait_seconds_max"] * 1000, 3),
+                           requests_that_waited=metrics["waited"], pool_timeouts=metrics["pool_timeouts"])
+
+
+async def _main(args: argparse.Namespace) -> dict:
+    return {str(size): await run_pool(size, args) for size in args.pool_size or [1, 8, 64, 256]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200, help="concurrent replies per round")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--api-latency-ms", type=float, default=50.0, help="fake Bot API round-trip time")
+    parser.add_argument("--pool-size", type=int, action="append", help="TELEGRAM_POOL_SIZE values to compare")
+    parser.add_argument("--pool-timeout", type=float, default=30.0, help="seconds a call may wait for a connection")
+    parser.add_argument("--json", dest="json_path", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    prepare_environment(LOG_LEVEL="CRITICAL")
+    logging.basicConfig(level=logging.CRITICAL)
+
+    results = asyncio.run(_main(args))
+    for size, summary in results.items():
+        print_report(f"reply latency (TELEGRAM_POOL_SIZE={size})", summary)
+    write_json(args.json_path, results)
+
+
+if __name__ == "__main__":
+    main()
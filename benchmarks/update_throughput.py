@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Update processing throughput under a synthetic multi-user load.
+
+Every synthetic user sends a burst of updates (``/start``, menu taps, free text) into the
+real ``Application`` from ``main.build_application``. Replies go to a fake Bot API with
+a configurable round-trip latency, which is what keeps sequential processing slow.
+Each concurrency level is checked for strict per-user ordering.
+
+    python -m benchmarks.update_throughput --users 100 --per-user 5 --api-latency-ms 30 \
+        --concurrency 1 --concurrency 8 --concurrency 32
+"""
+import argparse
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from benchmarks.common import latency_summary, prepare_environment, print_report, write_json
+from benchmarks.fake_bot_api import FakeBotAPI, UpdateFactory
+
+SCRIPT = ["/start", "menu", "stats", "hello there", "info", "menu"]
+
+
+def synthetic_load(users: int, per_user: int) -> List[dict]:
+    """Interleaved updates from ``users`` users, ``per_user`` each"""
+    factory = UpdateFactory()
+    updates = []
+    for step in range(per_user):
+        action = SCRIPT[step % len(SCRIPT)]
+        for user in range(users):
+            user_id = 20_000 + user
+            if action.startswith("/") or " " in action:
+                updates.append(factory.message(user_id, action))
+            else:
+                updates.append(factory.callback(user_id, action))
+    return updates
+
+
+async def run_level(concurrency: int, updates: List[dict], api_latency: float) -> dict:
+    """Process the whole load at one MAX_CONCURRENT_UPDATES setting"""
+    from telegram import Update
+    from telegram.ext import TypeHandler
+
+    from config import Config
+    from main import build_application
+
+    async with FakeBotAPI(latency=api_latency) as fake_api:
+        Config.TELEGRAM_BASE_URL = fake_api.base_url
+        Config.MAX_CONCURRENT_UPDATES = concurrency
+        application = build_application()
+
+        started_at: Dict[int, float] = {}
+        finished_at: Dict[int, float] = {}
+        order: Dict[int, List[int]] = defaultdict(list)
+        all_done = asyncio.Event()
+
+        async def on_start(update: Update, context) -> None:
+            started_at[update.update_id] = time.perf_counter()
+            order[update.effective_user.id].append(update.update_id)
+
+        async def on_finish(update: Update, context) -> None:
+            finished_at[update.update_id] = time.perf_counter()
+            if len(finished_at) == len(updates):
+                all_done.set()
+
+        application.add_handler(TypeHandler(Update, on_start), group=-1)
+        application.add_handler(TypeHandler(Update, on_finish), group=99)
+
+        async with application:
+            await application.start()
+            enqueued_at = {}
+            started = time.perf_counter()
+            for data in updates:
+                enqueued_at[data["update_id"]] = time.perf_counter()
+                application.update_queue.put_nowait(Update.de_json(data, application.bot))
+            await asyncio.wait_for(all_done.wait(), timeout=600)
+            elapsed = time.perf_counter() - started
+            await application.stop()
+
+    in_order = all(ids == sorted(ids) for ids in order.values())
+    latencies = [finished_at[uid] - enqueued_at[uid] for uid in finished_at]
+    return latency_summary(latencies, elapsed, max_concurrent_updates=concurrency,
+                           per_user_order_preserved=in_order,
+                           bot_api_calls=sum(fake_api.counters.values()))
+
+
+async def _main(args: argparse.Namespace) -> dict:
+    updates = synthetic_load(args.users, args.per_user)
+    levels = args.concurrency or [1, 8, 32]
+    return {str(level): await run_level(level, updates, args.api_latency_ms / 1000.0) for level in levels}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--per-user", type=int, default=4, help="updates per user")
+    parser.add_argument("--api-latency-ms", type=float, default=20.0, help="fake Bot API round-trip time")
+    parser.add_argument("--concurrency", type=int, action="append", help="MAX_CONCURRENT_UPDATES levels to compare")
+    parser.add_argument("--json", dest="json_path", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    prepare_environment(LOG_LEVEL="CRITICAL")
+    logging.basicConfig(level=logging.CRITICAL)
+
+    results = asyncio.run(_main(args))
+    for level, summary in results.items():
+        print_report(f"update throughput (MAX_CONCURRENT_UPDATES={level})", summary)
+    write_json(args.json_path, results)
+
+
+if __name__ == "__main__":
+    main()
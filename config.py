@@ -2,11 +2,13 @@
 Configuration module for Telegram Bot
 """
 import os
+import re
 from typing import List, Dict, Any
 from dotenv import load_dotenv
 
 from base import BaseConfig
-from constants import BotConstants, APIConstants
+from constants import BotConstants, APIConstants, ServerConstants
+from logging_pipeline import parse_sample_rates
 
 # Load environment variables from config.env file (only if file exists)
 if os.path.exists('config.env'):
@@ -28,6 +30,23 @@ class Config(BaseConfig):
     # Logging configuration
     LOG_LEVEL = os.getenv('LOG_LEVEL', BotConstants.DEFAULT_LOG_LEVEL)
     LOG_FORMAT = os.getenv('LOG_FORMAT', BotConstants.DEFAULT_LOG_FORMAT)
+    LOG_ASYNC = os.getenv('LOG_ASYNC', 'true').lower() == 'true'  # write logs from a background thread
+    LOG_RATE_LIMIT = float(os.getenv('LOG_RATE_LIMIT', str(BotConstants.DEFAULT_LOG_RATE_LIMIT)))
+    LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', '')  # e.g. "utils=0.1,httpx=0.01"
+
+    # Per-update tracing
+    TRACE_ENABLED = os.getenv('TRACE_ENABLED', 'true').lower() == 'true'
+    TRACE_SLOW_THRESHOLD = float(os.getenv('TRACE_SLOW_THRESHOLD', str(BotConstants.DEFAULT_TRACE_SLOW_THRESHOLD)))
+    TRACE_BUFFER_SIZE = int(os.getenv('TRACE_BUFFER_SIZE', str(BotConstants.DEFAULT_TRACE_BUFFER_SIZE)))
+
+    # Admin /profile command
+    PROFILE_MAX_SECONDS = float(os.getenv('PROFILE_MAX_SECONDS', str(BotConstants.DEFAULT_PROFILE_MAX_SECONDS)))
+    PROFILE_SAMPLE_INTERVAL = float(os.getenv('PROFILE_SAMPLE_INTERVAL', str(BotConstants.DEFAULT_PROFILE_SAMPLE_INTERVAL)))
+
+    # Event-loop stall detection
+    STALL_DETECTION_ENABLED = os.getenv('STALL_DETECTION_ENABLED', 'true').lower() == 'true'
+    STALL_THRESHOLD = float(os.getenv('STALL_THRESHOLD', str(BotConstants.DEFAULT_STALL_THRESHOLD)))
+    STALL_BUFFER_SIZE = int(os.getenv('STALL_BUFFER_SIZE', str(BotConstants.DEFAULT_STALL_BUFFER_SIZE)))
     
     # Docker-specific settings
     IS_DOCKER = os.getenv('DOCKER', 'false').lower() == 'true'
@@ -42,6 +61,12 @@ class Config(BaseConfig):
     JOKES_API_TIMEOUT = int(os.getenv('JOKES_API_TIMEOUT', str(APIConstants.DEFAULT_TIMEOUT)))
     JOKES_API_ENDPOINT = os.getenv('JOKES_API_ENDPOINT', '/api/getJoke')
     JOKES_API_HEADERS = APIConstants.DEFAULT_HEADERS.copy()
+    # Failures in a row after which /readyz reports the jokes API circuit as open
+    JOKES_API_FAILURE_THRESHOLD = int(os.getenv('JOKES_API_FAILURE_THRESHOLD', str(APIConstants.DEFAULT_FAILURE_THRESHOLD)))
+
+    # Joke delivery: "typing..." first, placeholder only for slow jokes (0 = placeholder at once)
+    JOKE_PLACEHOLDER_DELAY = float(os.getenv('JOKE_PLACEHOLDER_DELAY', str(APIConstants.DEFAULT_JOKE_PLACEHOLDER_DELAY)))
+    JOKE_TYPING_ACTION = os.getenv('JOKE_TYPING_ACTION', 'true').lower() == 'true'
     
     # Add API key to headers if provided
     if JOKES_API_KEY:
@@ -58,6 +83,76 @@ class Config(BaseConfig):
     
     # Statistics configuration
     STATS_DATA_DIR = os.getenv('STATS_DATA_DIR', BotConstants.DEFAULT_STATS_DATA_DIR)
+    STATS_FILE_FORMAT = os.getenv('STATS_FILE_FORMAT', BotConstants.DEFAULT_STATS_FILE_FORMAT).lower()
+    JSON_BACKEND = os.getenv('JSON_BACKEND', BotConstants.DEFAULT_JSON_BACKEND).lower()
+
+    # Redundant edit suppression
+    EDIT_CACHE_SIZE = int(os.getenv('EDIT_CACHE_SIZE', str(BotConstants.DEFAULT_EDIT_CACHE_SIZE)))
+
+    # Conversation state store: TTLs in seconds (0 = never expire) and size cap per store
+    USER_STATE_TTL = float(os.getenv('USER_STATE_TTL', str(BotConstants.DEFAULT_USER_STATE_TTL)))
+    LAST_JOKE_INPUT_TTL = float(os.getenv('LAST_JOKE_INPUT_TTL', str(BotConstants.DEFAULT_LAST_JOKE_INPUT_TTL)))
+    USER_STATE_MAX_ENTRIES = int(os.getenv('USER_STATE_MAX_ENTRIES', str(BotConstants.DEFAULT_USER_STATE_MAX_ENTRIES)))
+
+    # Conversation state persistence across restarts (path without extension)
+    STATE_BACKEND = os.getenv('STATE_BACKEND', BotConstants.DEFAULT_STATE_BACKEND).lower()
+    STATE_PATH = os.getenv('STATE_PATH', os.path.join(STATS_DATA_DIR, 'user_states'))
+    STATE_FLUSH_INTERVAL = float(os.getenv('STATE_FLUSH_INTERVAL', str(BotConstants.DEFAULT_STATE_FLUSH_INTERVAL)))
+
+    # Translation hot reload: poll locales/ for edits (0 = only via /reload_locales)
+    LOCALE_RELOAD_INTERVAL = float(os.getenv('LOCALE_RELOAD_INTERVAL', str(BotConstants.DEFAULT_LOCALE_RELOAD_INTERVAL)))
+
+    # Update ingress: long polling (development) or webhook
+    BOT_MODE = os.getenv('BOT_MODE', ServerConstants.BOT_MODE_POLLING).lower()
+    TELEGRAM_BASE_URL = os.getenv('TELEGRAM_BASE_URL')  # e.g. a local Bot API server
+
+    # Update processing: >1 handles different users concurrently, each user in order
+    MAX_CONCURRENT_UPDATES = int(os.getenv('MAX_CONCURRENT_UPDATES', str(ServerConstants.DEFAULT_MAX_CONCURRENT_UPDATES)))
+    MAX_PENDING_UPDATES = int(os.getenv('MAX_PENDING_UPDATES', str(ServerConstants.DEFAULT_MAX_PENDING_UPDATES)))
+
+    # Worker processes behind one ingress, each owning a shard of users (1 = single process)
+    WORKER_PROCESSES = int(os.getenv('WORKER_PROCESSES', str(ServerConstants.DEFAULT_WORKER_PROCESSES)))
+    WORKER_STOP_TIMEOUT = float(os.getenv('WORKER_STOP_TIMEOUT', str(ServerConstants.DEFAULT_WORKER_STOP_TIMEOUT)))
+
+    # Outbound Telegram rate limiting (interactive replies are served before bulk sends)
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_GLOBAL_PER_SECOND = float(os.getenv('RATE_LIMIT_GLOBAL_PER_SECOND', str(ServerConstants.DEFAULT_RATE_LIMIT_GLOBAL_PER_SECOND)))
+    RATE_LIMIT_CHAT_PER_SECOND = float(os.getenv('RATE_LIMIT_CHAT_PER_SECOND', str(ServerConstants.DEFAULT_RATE_LIMIT_CHAT_PER_SECOND)))
+    RATE_LIMIT_CHAT_BURST = int(os.getenv('RATE_LIMIT_CHAT_BURST', str(ServerConstants.DEFAULT_RATE_LIMIT_CHAT_BURST)))
+    RATE_LIMIT_GROUP_PER_MINUTE = float(os.getenv('RATE_LIMIT_GROUP_PER_MINUTE', str(ServerConstants.DEFAULT_RATE_LIMIT_GROUP_PER_MINUTE)))
+    RATE_LIMIT_MAX_RETRIES = int(os.getenv('RATE_LIMIT_MAX_RETRIES', str(ServerConstants.DEFAULT_RATE_LIMIT_MAX_RETRIES)))
+
+    # Telegram HTTP transports (separate pools for outbound calls and getUpdates)
+    TELEGRAM_POOL_SIZE = int(os.getenv('TELEGRAM_POOL_SIZE', str(ServerConstants.DEFAULT_TELEGRAM_POOL_SIZE)))
+    TELEGRAM_KEEPALIVE_CONNECTIONS = int(os.getenv('TELEGRAM_KEEPALIVE_CONNECTIONS', str(ServerConstants.DEFAULT_TELEGRAM_KEEPALIVE_CONNECTIONS)))
+    TELEGRAM_KEEPALIVE_EXPIRY = float(os.getenv('TELEGRAM_KEEPALIVE_EXPIRY', str(ServerConstants.DEFAULT_TELEGRAM_KEEPALIVE_EXPIRY)))
+    TELEGRAM_CONNECT_TIMEOUT = float(os.getenv('TELEGRAM_CONNECT_TIMEOUT', str(ServerConstants.DEFAULT_TELEGRAM_CONNECT_TIMEOUT)))
+    TELEGRAM_READ_TIMEOUT = float(os.getenv('TELEGRAM_READ_TIMEOUT', str(ServerConstants.DEFAULT_TELEGRAM_READ_TIMEOUT)))
+    TELEGRAM_WRITE_TIMEOUT = float(os.getenv('TELEGRAM_WRITE_TIMEOUT', str(ServerConstants.DEFAULT_TELEGRAM_WRITE_TIMEOUT)))
+    TELEGRAM_POOL_TIMEOUT = float(os.getenv('TELEGRAM_POOL_TIMEOUT', str(ServerConstants.DEFAULT_TELEGRAM_POOL_TIMEOUT)))
+    TELEGRAM_UPDATES_POOL_SIZE = int(os.getenv('TELEGRAM_UPDATES_POOL_SIZE', str(ServerConstants.DEFAULT_TELEGRAM_UPDATES_POOL_SIZE)))
+    TELEGRAM_UPDATES_READ_TIMEOUT = float(os.getenv('TELEGRAM_UPDATES_READ_TIMEOUT', str(ServerConstants.DEFAULT_TELEGRAM_UPDATES_READ_TIMEOUT)))
+
+    # Built-in HTTP server (webhook ingress)
+    HTTP_LISTEN = os.getenv('HTTP_LISTEN', ServerConstants.DEFAULT_HTTP_LISTEN)
+    HTTP_PORT = int(os.getenv('HTTP_PORT', str(ServerConstants.DEFAULT_HTTP_PORT)))
+
+    # Prometheus metrics (served by the webhook server, or on METRICS_PORT otherwise)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_PORT = int(os.getenv('METRICS_PORT', str(HTTP_PORT)))
+    METRICS_PATH = os.getenv('METRICS_PATH', ServerConstants.DEFAULT_METRICS_PATH)
+
+    # Liveness/readiness endpoints (/healthz, /readyz), served next to the metrics
+    HEALTH_ENABLED = os.getenv('HEALTH_ENABLED', 'true').lower() == 'true'
+    READY_MAX_LOOP_LAG = float(os.getenv('READY_MAX_LOOP_LAG', str(ServerConstants.DEFAULT_READY_MAX_LOOP_LAG)))
+    READY_MAX_PENDING_UPDATES = int(os.getenv('READY_MAX_PENDING_UPDATES', str(ServerConstants.DEFAULT_READY_MAX_PENDING_UPDATES)))
+    HEALTH_POLL_MAX_AGE = float(os.getenv('HEALTH_POLL_MAX_AGE', str(ServerConstants.DEFAULT_HEALTH_POLL_MAX_AGE)))
+
+    # Webhook configuration
+    WEBHOOK_URL = os.getenv('WEBHOOK_URL')  # Public base URL Telegram can reach
+    WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', ServerConstants.DEFAULT_WEBHOOK_PATH)
+    WEBHOOK_SECRET_TOKEN = os.getenv('WEBHOOK_SECRET_TOKEN')
+    WEBHOOK_MAX_CONNECTIONS = int(os.getenv('WEBHOOK_MAX_CONNECTIONS', str(ServerConstants.DEFAULT_WEBHOOK_MAX_CONNECTIONS)))
     
     # Full API URL with endpoint
     @classmethod
@@ -66,6 +161,13 @@ def get_jokes_api_url(cls):
         if not cls.JOKES_API_URL:
             return None
         return f"{cls.JOKES_API_URL.rstrip('/')}{cls.JOKES_API_ENDPOINT}"
+
+    @classmethod
+    def get_webhook_url(cls):
+        """Get full public webhook URL"""
+        if not cls.WEBHOOK_URL:
+            return None
+        return f"{cls.WEBHOOK_URL.rstrip('/')}{cls.WEBHOOK_PATH}"
     
     @classmethod
     def validate(cls) -> bool:
@@ -78,6 +180,62 @@ def validate(cls) -> bool:
             raise ValueError(
                 "JOKES_API_URL is required for joke functionality. Set it as environment variable."
             )
+        if cls.BOT_MODE not in ServerConstants.BOT_MODES:
+            raise ValueError(
+                f"BOT_MODE must be one of {', '.join(ServerConstants.BOT_MODES)}, got '{cls.BOT_MODE}'."
+            )
+        if cls.BOT_MODE == ServerConstants.BOT_MODE_WEBHOOK and not cls.WEBHOOK_URL:
+            raise ValueError(
+                "WEBHOOK_URL is required when BOT_MODE=webhook. Set it to the bot's public HTTPS URL."
+            )
+        if cls.WEBHOOK_SECRET_TOKEN and not re.fullmatch(r'[A-Za-z0-9_-]{1,256}', cls.WEBHOOK_SECRET_TOKEN):
+            raise ValueError(
+                "WEBHOOK_SECRET_TOKEN must be 1-256 characters of A-Z, a-z, 0-9, '_' and '-'."
+            )
+        if cls.JOKE_PLACEHOLDER_DELAY < 0:
+            raise ValueError("JOKE_PLACEHOLDER_DELAY must not be negative.")
+        if cls.JOKES_API_FAILURE_THRESHOLD < 1:
+            raise ValueError("JOKES_API_FAILURE_THRESHOLD must be a positive integer.")
+        if cls.LOG_RATE_LIMIT < 0:
+            raise ValueError("LOG_RATE_LIMIT must not be negative.")
+        try:
+            parse_sample_rates(cls.LOG_SAMPLE_RATES)
+        except ValueError:
+            raise ValueError("LOG_SAMPLE_RATES must look like 'logger=0.1,other.logger=0.5'.")
+        if cls.TRACE_SLOW_THRESHOLD < 0 or cls.TRACE_BUFFER_SIZE < 1:
+            raise ValueError("TRACE_SLOW_THRESHOLD must not be negative and TRACE_BUFFER_SIZE must be positive.")
+        if cls.PROFILE_MAX_SECONDS < 1 or cls.PROFILE_SAMPLE_INTERVAL <= 0:
+            raise ValueError("PROFILE_MAX_SECONDS must be at least 1 and PROFILE_SAMPLE_INTERVAL positive.")
+        if cls.STALL_THRESHOLD <= 0 or cls.STALL_BUFFER_SIZE < 1:
+            raise ValueError("STALL_THRESHOLD and STALL_BUFFER_SIZE must be positive.")
+        if cls.USER_STATE_TTL < 0 or cls.LAST_JOKE_INPUT_TTL < 0 or cls.USER_STATE_MAX_ENTRIES < 0:
+            raise ValueError("USER_STATE_TTL, LAST_JOKE_INPUT_TTL and USER_STATE_MAX_ENTRIES must not be negative.")
+        if cls.STATE_BACKEND not in BotConstants.STATE_BACKENDS:
+            raise ValueError(f"STATE_BACKEND must be one of: {', '.join(BotConstants.STATE_BACKENDS)}.")
+        if cls.STATS_FILE_FORMAT not in BotConstants.STATS_FILE_FORMATS:
+            raise ValueError(f"STATS_FILE_FORMAT must be one of: {', '.join(BotConstants.STATS_FILE_FORMATS)}.")
+        if cls.JSON_BACKEND not in BotConstants.JSON_BACKENDS:
+            raise ValueError(f"JSON_BACKEND must be one of: {', '.join(BotConstants.JSON_BACKENDS)}.")
+        if cls.STATE_FLUSH_INTERVAL <= 0:
+            raise ValueError("STATE_FLUSH_INTERVAL must be positive.")
+        if cls.LOCALE_RELOAD_INTERVAL < 0:
+            raise ValueError("LOCALE_RELOAD_INTERVAL must not be negative.")
+        if not cls.METRICS_PATH.startswith('/') or cls.METRICS_PATH in (
+                cls.WEBHOOK_PATH, ServerConstants.HEALTH_PATH, ServerConstants.READY_PATH):
+            raise ValueError("METRICS_PATH must start with '/' and differ from WEBHOOK_PATH, /healthz and /readyz.")
+        if cls.READY_MAX_LOOP_LAG <= 0 or cls.READY_MAX_PENDING_UPDATES < 0 or cls.HEALTH_POLL_MAX_AGE <= 0:
+            raise ValueError("READY_MAX_LOOP_LAG and HEALTH_POLL_MAX_AGE must be positive, READY_MAX_PENDING_UPDATES not negative.")
+        if cls.MAX_CONCURRENT_UPDATES < 1:
+            raise ValueError("MAX_CONCURRENT_UPDATES must be a positive integer.")
+        if cls.TELEGRAM_POOL_SIZE < 1 or cls.TELEGRAM_UPDATES_POOL_SIZE < 1:
+            raise ValueError("TELEGRAM_POOL_SIZE and TELEGRAM_UPDATES_POOL_SIZE must be positive integers.")
+        if cls.WORKER_PROCESSES < 1:
+            raise ValueError("WORKER_PROCESSES must be a positive integer.")
+        if not 1 <= cls.WEBHOOK_MAX_CONNECTIONS <= 100:
+            raise ValueError("WEBHOOK_MAX_CONNECTIONS must be between 1 and 100.")
+        if cls.RATE_LIMIT_ENABLED and min(cls.RATE_LIMIT_GLOBAL_PER_SECOND, cls.RATE_LIMIT_CHAT_PER_SECOND,
+                                          cls.RATE_LIMIT_CHAT_BURST, cls.RATE_LIMIT_GROUP_PER_MINUTE) <= 0:
+            raise ValueError("RATE_LIMIT_* rates and burst must be positive.")
         return True
     
     @classmethod
@@ -96,8 +254,63 @@ def get_optional_vars(cls) -> Dict[str, Any]:
             'BOT_GITHUB': BotConstants.DEFAULT_BOT_GITHUB,
             'LOG_LEVEL': BotConstants.DEFAULT_LOG_LEVEL,
             'LOG_FORMAT': BotConstants.DEFAULT_LOG_FORMAT,
+            'LOG_ASYNC': True,
+            'LOG_RATE_LIMIT': BotConstants.DEFAULT_LOG_RATE_LIMIT,
+            'LOG_SAMPLE_RATES': '',
+            'TRACE_ENABLED': True,
+            'TRACE_SLOW_THRESHOLD': BotConstants.DEFAULT_TRACE_SLOW_THRESHOLD,
+            'TRACE_BUFFER_SIZE': BotConstants.DEFAULT_TRACE_BUFFER_SIZE,
+            'PROFILE_MAX_SECONDS': BotConstants.DEFAULT_PROFILE_MAX_SECONDS,
+            'PROFILE_SAMPLE_INTERVAL': BotConstants.DEFAULT_PROFILE_SAMPLE_INTERVAL,
+            'STALL_DETECTION_ENABLED': True,
+            'STALL_THRESHOLD': BotConstants.DEFAULT_STALL_THRESHOLD,
+            'STALL_BUFFER_SIZE': BotConstants.DEFAULT_STALL_BUFFER_SIZE,
             'JOKES_API_TIMEOUT': APIConstants.DEFAULT_TIMEOUT,
-            'STATS_DATA_DIR': BotConstants.DEFAULT_STATS_DATA_DIR
+            'JOKE_PLACEHOLDER_DELAY': APIConstants.DEFAULT_JOKE_PLACEHOLDER_DELAY,
+            'JOKES_API_FAILURE_THRESHOLD': APIConstants.DEFAULT_FAILURE_THRESHOLD,
+            'JOKE_TYPING_ACTION': True,
+            'STATS_DATA_DIR': BotConstants.DEFAULT_STATS_DATA_DIR,
+            'STATS_FILE_FORMAT': BotConstants.DEFAULT_STATS_FILE_FORMAT,
+            'JSON_BACKEND': BotConstants.DEFAULT_JSON_BACKEND,
+            'EDIT_CACHE_SIZE': BotConstants.DEFAULT_EDIT_CACHE_SIZE,
+            'USER_STATE_TTL': BotConstants.DEFAULT_USER_STATE_TTL,
+            'LAST_JOKE_INPUT_TTL': BotConstants.DEFAULT_LAST_JOKE_INPUT_TTL,
+            'USER_STATE_MAX_ENTRIES': BotConstants.DEFAULT_USER_STATE_MAX_ENTRIES,
+            'STATE_BACKEND': BotConstants.DEFAULT_STATE_BACKEND,
+            'STATE_PATH': os.path.join(BotConstants.DEFAULT_STATS_DATA_DIR, 'user_states'),
+            'STATE_FLUSH_INTERVAL': BotConstants.DEFAULT_STATE_FLUSH_INTERVAL,
+            'LOCALE_RELOAD_INTERVAL': BotConstants.DEFAULT_LOCALE_RELOAD_INTERVAL,
+            'BOT_MODE': ServerConstants.BOT_MODE_POLLING,
+            'HTTP_LISTEN': ServerConstants.DEFAULT_HTTP_LISTEN,
+            'HTTP_PORT': ServerConstants.DEFAULT_HTTP_PORT,
+            'METRICS_ENABLED': True,
+            'METRICS_PORT': ServerConstants.DEFAULT_HTTP_PORT,
+            'METRICS_PATH': ServerConstants.DEFAULT_METRICS_PATH,
+            'HEALTH_ENABLED': True,
+            'READY_MAX_LOOP_LAG': ServerConstants.DEFAULT_READY_MAX_LOOP_LAG,
+            'READY_MAX_PENDING_UPDATES': ServerConstants.DEFAULT_READY_MAX_PENDING_UPDATES,
+            'HEALTH_POLL_MAX_AGE': ServerConstants.DEFAULT_HEALTH_POLL_MAX_AGE,
+            'WEBHOOK_PATH': ServerConstants.DEFAULT_WEBHOOK_PATH,
+            'WEBHOOK_MAX_CONNECTIONS': ServerConstants.DEFAULT_WEBHOOK_MAX_CONNECTIONS,
+            'MAX_CONCURRENT_UPDATES': ServerConstants.DEFAULT_MAX_CONCURRENT_UPDATES,
+            'MAX_PENDING_UPDATES': ServerConstants.DEFAULT_MAX_PENDING_UPDATES,
+            'WORKER_PROCESSES': ServerConstants.DEFAULT_WORKER_PROCESSES,
+            'WORKER_STOP_TIMEOUT': ServerConstants.DEFAULT_WORKER_STOP_TIMEOUT,
+            'RATE_LIMIT_ENABLED': True,
+            'RATE_LIMIT_GLOBAL_PER_SECOND': ServerConstants.DEFAULT_RATE_LIMIT_GLOBAL_PER_SECOND,
+            'RATE_LIMIT_CHAT_PER_SECOND': ServerConstants.DEFAULT_RATE_LIMIT_CHAT_PER_SECOND,
+            'RATE_LIMIT_CHAT_BURST': ServerConstants.DEFAULT_RATE_LIMIT_CHAT_BURST,
+            'RATE_LIMIT_GROUP_PER_MINUTE': ServerConstants.DEFAULT_RATE_LIMIT_GROUP_PER_MINUTE,
+            'RATE_LIMIT_MAX_RETRIES': ServerConstants.DEFAULT_RATE_LIMIT_MAX_RETRIES,
+            'TELEGRAM_POOL_SIZE': ServerConstants.DEFAULT_TELEGRAM_POOL_SIZE,
+            'TELEGRAM_KEEPALIVE_CONNECTIONS': ServerConstants.DEFAULT_TELEGRAM_KEEPALIVE_CONNECTIONS,
+            'TELEGRAM_KEEPALIVE_EXPIRY': ServerConstants.DEFAULT_TELEGRAM_KEEPALIVE_EXPIRY,
+            'TELEGRAM_CONNECT_TIMEOUT': ServerConstants.DEFAULT_TELEGRAM_CONNECT_TIMEOUT,
+            'TELEGRAM_READ_TIMEOUT': ServerConstants.DEFAULT_TELEGRAM_READ_TIMEOUT,
+            'TELEGRAM_WRITE_TIMEOUT': ServerConstants.DEFAULT_TELEGRAM_WRITE_TIMEOUT,
+            'TELEGRAM_POOL_TIMEOUT': ServerConstants.DEFAULT_TELEGRAM_POOL_TIMEOUT,
+            'TELEGRAM_UPDATES_POOL_SIZE': ServerConstants.DEFAULT_TELEGRAM_UPDATES_POOL_SIZE,
+            'TELEGRAM_UPDATES_READ_TIMEOUT': ServerConstants.DEFAULT_TELEGRAM_UPDATES_READ_TIMEOUT
         }
     
     @classmethod
@@ -107,8 +320,7 @@ def get_bot_info(cls):
             'name': cls.BOT_NAME,
             'version': cls.BOT_VERSION,
             'developer': cls.BOT_DEVELOPER,
-            'docker': cls.IS_DOCKER
+            'docker': cls.IS_DOCKER,
+            'mode': cls.BOT_MODE,
+            'workers': cls.WORKER_PROCESSES
         }
-
-# Validate configuration on import
-Config.validate()
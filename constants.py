@@ -34,13 +34,50 @@ class BotConstants:
     # Logging defaults
     DEFAULT_LOG_LEVEL = LogLevel.INFO.value
     DEFAULT_LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    # INFO/DEBUG records per second allowed from one log call site (0 = unlimited)
+    DEFAULT_LOG_RATE_LIMIT = 20.0
+
+    # Per-update tracing: traces at least this slow (seconds) are kept for /traces
+    DEFAULT_TRACE_SLOW_THRESHOLD = 2.0
+    DEFAULT_TRACE_BUFFER_SIZE = 50
+
+    # Admin /profile sessions: longest allowed run and the stack sampling period (seconds)
+    DEFAULT_PROFILE_SECONDS = 30.0
+    DEFAULT_PROFILE_MAX_SECONDS = 120.0
+    DEFAULT_PROFILE_SAMPLE_INTERVAL = 0.005
+
+    # Event-loop stall detection: blocks longer than this (seconds) are captured for /stalls
+    DEFAULT_STALL_THRESHOLD = 0.1
+    DEFAULT_STALL_BUFFER_SIZE = 20
     
     # Statistics defaults
     DEFAULT_STATS_DATA_DIR = "data"
+    STATS_FILE_FORMATS = ["compact", "pretty"]
+    DEFAULT_STATS_FILE_FORMAT = "compact"
     DEFAULT_USERS_LIMIT = 20
     DEFAULT_LANG = "uk"
     SUPPORTED_LANGUAGES = ["uk", "en", "pl"]
 
+    # Messages whose last rendered content is remembered to skip identical edits
+    DEFAULT_EDIT_CACHE_SIZE = 10000
+
+    # Conversation state: a waiting prompt and the last joke input expire, the store is capped
+    DEFAULT_USER_STATE_TTL = 3600.0
+    DEFAULT_LAST_JOKE_INPUT_TTL = 86400.0
+    DEFAULT_USER_STATE_MAX_ENTRIES = 100000
+
+    # Conversation state persistence: "memory" (none), "file" or "sqlite"
+    STATE_BACKENDS = ["memory", "file", "sqlite"]
+    DEFAULT_STATE_BACKEND = "memory"
+    DEFAULT_STATE_FLUSH_INTERVAL = 1.0
+
+    # JSON encoder/decoder for statistics and API payloads ("auto" = orjson if installed)
+    JSON_BACKENDS = ["auto", "orjson", "json"]
+    DEFAULT_JSON_BACKEND = "auto"
+
+    # Seconds between checks of the locale files for changes (0 = reload only on /reload_locales)
+    DEFAULT_LOCALE_RELOAD_INTERVAL = 0.0
+
 class MainConstants:
     """Main constants"""
     DEFAULT_RECENT_HOURS = 24
@@ -125,6 +162,57 @@ class FilePaths:
     CONFIG_ENV = "config.env"
     ENV_FILE = ".env"
 
+# Built-in HTTP server and update ingress
+class ServerConstants:
+    """Update ingress and HTTP server constants"""
+
+    BOT_MODE_POLLING = "polling"
+    BOT_MODE_WEBHOOK = "webhook"
+    BOT_MODES = [BOT_MODE_POLLING, BOT_MODE_WEBHOOK]
+
+    DEFAULT_HTTP_LISTEN = "0.0.0.0"
+    DEFAULT_HTTP_PORT = 8000  # Exposed by the Dockerfile
+    DEFAULT_WEBHOOK_PATH = "/telegram/webhook"
+    DEFAULT_WEBHOOK_MAX_CONNECTIONS = 40
+    SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+    DEFAULT_METRICS_PATH = "/metrics"
+    HEALTH_PATH = "/healthz"
+    READY_PATH = "/readyz"
+
+    # Health checks: not ready above this loop lag (s) or this many waiting updates;
+    # not alive when long polling has not returned for this long (s)
+    DEFAULT_READY_MAX_LOOP_LAG = 0.5
+    DEFAULT_READY_MAX_PENDING_UPDATES = 1024
+    DEFAULT_HEALTH_POLL_MAX_AGE = 60.0
+
+    # Update processing
+    DEFAULT_MAX_CONCURRENT_UPDATES = 32
+    DEFAULT_MAX_PENDING_UPDATES = 4096
+
+    # Multi-process mode: 1 keeps everything in a single process
+    DEFAULT_WORKER_PROCESSES = 1
+    DEFAULT_WORKER_STOP_TIMEOUT = 30.0
+    # The shared stats process writes the files at most this often (seconds)
+    STATS_SAVE_INTERVAL = 1.0
+
+    # Outbound rate limits (Telegram: ~30 msg/s overall, ~1 msg/s per chat, 20 msg/min per group)
+    DEFAULT_RATE_LIMIT_GLOBAL_PER_SECOND = 30.0
+    DEFAULT_RATE_LIMIT_CHAT_PER_SECOND = 1.0
+    DEFAULT_RATE_LIMIT_CHAT_BURST = 3
+    DEFAULT_RATE_LIMIT_GROUP_PER_MINUTE = 20
+    DEFAULT_RATE_LIMIT_MAX_RETRIES = 3
+
+    # Telegram HTTP transports: outbound calls and getUpdates use separate pools
+    DEFAULT_TELEGRAM_POOL_SIZE = 128
+    DEFAULT_TELEGRAM_KEEPALIVE_CONNECTIONS = 32
+    DEFAULT_TELEGRAM_KEEPALIVE_EXPIRY = 30.0
+    DEFAULT_TELEGRAM_CONNECT_TIMEOUT = 5.0
+    DEFAULT_TELEGRAM_READ_TIMEOUT = 5.0
+    DEFAULT_TELEGRAM_WRITE_TIMEOUT = 5.0
+    DEFAULT_TELEGRAM_POOL_TIMEOUT = 2.0
+    DEFAULT_TELEGRAM_UPDATES_POOL_SIZE = 2
+    DEFAULT_TELEGRAM_UPDATES_READ_TIMEOUT = 10.0
+
 # API constants
 class APIConstants:
     """API related constants"""
@@ -138,6 +226,12 @@ class APIConstants:
     # Timeouts
     DEFAULT_TIMEOUT = 10
     MAX_TIMEOUT = 30
+
+    # Joke delivery: a loading placeholder appears only if generation takes longer
+    DEFAULT_JOKE_PLACEHOLDER_DELAY = 1.0
+
+    # Health reporting: jokes API failures in a row that count as an open circuit
+    DEFAULT_FAILURE_THRESHOLD = 5
     
     # Retry settings
     MAX_RETRIES = 3
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Dict-like store with per-entry TTLs and a size cap
+"""
+import heapq
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+_MISSING = object()
+
+class ExpiringStore:
+    """Mapping whose entries expire ``ttl`` seconds after they were last written.
+
+    Expiry deadlines sit in a min-heap, so purging touches only entries that are due
+    instead of scanning the whole store. Overwritten entries leave stale heap items
+    behind; they are skipped when popped and the heap is compacted once they outnumber
+    the live ones. When ``max_entries`` is exceeded the least recently used entries are
+    evicted. ``clock`` is wall-clock time so deadlines survive a restart.
+
+    ``on_change(key, value, expires_at)`` is called for every write and, with ``value``
+    and ``expires_at`` set to None, for deletions and evictions (not for expiry - expired
+    entries are simply skipped when persisted state is loaded).
+    """
+
+    def __init__(self, name: str, ttl: float, max_entries: int = 0, clock: Callable[[], float] = time.time):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._counter = 0  # Heap tie-breaker, keys need not be comparable
+        self.expired = 0
+        self.evicted = 0
+        self.on_change: Optional[Callable[[Hashable, Any, Optional[float]], None]] = None
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __iter__(self) -> Iterator[Hashable]:
+        self.purge()
+        return iter(list(self._data))
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, expires_at: Optional[float] = None) -> None:
+        """Store ``value``; it expires after ``ttl`` (default: the store's) or at ``expires_at``"""
+        now = self.clock()
+        if expires_at is None:
+            ttl = self.ttl if ttl is None else ttl
+            expires_at = now + ttl if ttl > 0 else float("inf")
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        if expires_at != float("inf"):
+            self._counter += 1
+            heapq.heappush(self._heap, (expires_at, self._counter, key))
+        if self.on_change is not None:
+            self.on_change(key, value, expires_at)
+        self.purge(now)
+        while self.max_entries and len(self._data) > self.max_entries:
+            evicted, _ = self._data.popitem(last=False)
+            self.evicted += 1
+            if self.on_change is not None:
+                self.on_change(evicted, None, None)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        value, expires_at = entry
+        if expires_at <= self.clock():
+            del self._data[key]
+            self.expired += 1
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return default
+        if self.on_change is not None:
+            self.on_change(key, None, None)
+        return entry[0] if entry[1] > self.clock() else default
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.set(key, value)
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __delitem__(self, key: Hashable) -> None:
+        if self.pop(key, _MISSING) is _MISSING:
+            raise KeyError(key)
+
+    def items(self) -> Iterator[Tuple[Hashable, Any, float]]:
+        """Live ``(key, value, expires_at)`` entries"""
+        self.purge()
+        return iter([(key, value, expires_at) for key, (value, expires_at) in self._data.items()])
+
+    def purge(self, now: Optional[float] = None) -> int:
+        """Drop every entry whose deadline has passed; returns how many"""
+        now = self.clock() if now is None else now
+        heap = self._heap
+        purged = 0
+        while heap and heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(heap)
+            entry = self._data.get(key)
+            # Skip heap items of entries that were rewritten or removed since
+            if entry is not None and entry[1] == expires_at:
+                del self._data[key]
+                self.expired += 1
+                purged += 1
+        if len(heap) > 2 * len(self._data) + 64:
+            self._compact()
+        return purged
+
+    def _compact(self) -> None:
+        self._heap = [(expires_at, i, key) for i, (key, (_, expires_at)) in enumerate(self._data.items())
+                      if expires_at != float("inf")]
+        self._counter = len(self._data)
+        heapq.heapify(self._heap)
+
+    def approx_memory_bytes(self) -> int:
+        """Container and payload size estimate (shallow sizes of keys and values)"""
+        total = sys.getsizeof(self._data) + sys.getsizeof(self._heap)
+        total += len(self._heap) * sys.getsizeof((0.0, 0, 0))
+        for key, entry in self._data.items():
+            total += sys.getsizeof(key) + sys.getsizeof(entry) + sys.getsizeof(entry[0])
+        return total
+
+    def get_metrics(self, memory: bool = True) -> Dict[str, Any]:
+        """Counters; ``memory=False`` skips the O(n) memory estimate"""
+        result = {
+            "entries": len(self._data),
+            "heap_items": len(self._heap),
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+        }
+        if memory:
+            result["approx_memory_bytes"] = self.approx_memory_bytes()
+        return result
@@ -2,35 +2,54 @@
 """
 Base handlers for Telegram Bot
 """
+import io
 import logging
+import math
 from typing import Optional
-from telegram import Update, InlineKeyboardMarkup
+from telegram import InputFile, Update, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
 
 from base import BaseCommandHandler, BaseCallbackHandler, BaseMessageHandler, UserInfo
-from constants import TranslationKeys
+from constants import BotConstants, TranslationKeys
 from user_states import state_manager, UserState
 from localization import translate
-from stats import stats_manager
+import stats
+from screens import screen_cache
 from telegram import InlineKeyboardButton
 
+logger = logging.getLogger(__name__)
+
 def _get_main_menu_keyboard(lang: str) -> InlineKeyboardMarkup:
     """Get main menu keyboard layout"""
-    keyboard = [
-        [InlineKeyboardButton(translate(TranslationKeys.STATISTICS, lang), callback_data='stats'), InlineKeyboardButton(translate(TranslationKeys.SETTINGS, lang), callback_data='settings')],
-        [InlineKeyboardButton(translate(TranslationKeys.JOKE, lang), callback_data='joke'), InlineKeyboardButton(translate(TranslationKeys.ABOUT, lang), callback_data='info')],
-        [InlineKeyboardButton(translate(TranslationKeys.HELP, lang), callback_data='help')]
-    ]
-    return InlineKeyboardMarkup(keyboard)
+    return screen_cache.keyboard('main_menu', lang)
 
 def _get_error_keyboard(lang: str) -> InlineKeyboardMarkup:
     """Get error keyboard layout"""
-    keyboard = [
-        [InlineKeyboardButton(translate(TranslationKeys.TRY_AGAIN, lang), callback_data='joke'), InlineKeyboardButton(translate(TranslationKeys.MENU, lang), callback_data='menu')]
-    ]
-    return InlineKeyboardMarkup(keyboard)
+    return screen_cache.keyboard('joke_error', lang)
+
+async def _edit_callback_error(query, error_key: str, retry_data: str) -> None:
+    """Replace a callback's message with an error and Try again / Back to menu buttons"""
+    from message_cache import edit_cache
 
+    try:
+        lang = stats.stats_manager.get_user_language(query.from_user.id)
+        keyboard = [
+            [InlineKeyboardButton(translate(TranslationKeys.TRY_AGAIN, lang), callback_data=retry_data), InlineKeyboardButton(translate(TranslationKeys.BACK_TO_MENU, lang), callback_data='menu')]
+        ]
+        await edit_cache.edit_text(query, translate(error_key, lang), reply_markup=InlineKeyboardMarkup(keyboard))
+    except Exception as e:
+        logger.error(f"Error handling callback error: {e}")
+
+async def _require_admin(update: Update, user_info: Optional[UserInfo]) -> bool:
+    """Whether the command comes from an admin; everyone else is told access is denied"""
+    from utils import is_admin
+
+    if user_info and is_admin(user_info.user_id):
+        return True
+    lang = stats.stats_manager.get_user_language(user_info.user_id) if user_info else BotConstants.DEFAULT_LANG
+    await update.message.reply_text(translate(TranslationKeys.ERROR_ACCESS_DENIED, lang))
+    return False
 
 class LanguageCommandHandler(BaseCommandHandler):
     """Language command handler"""
@@ -41,15 +60,9 @@ def command_name(self) -> str:
 
     async def execute_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, user_info: Optional[UserInfo]) -> None:
         """Execute language command"""
-        lang = stats_manager.get_user_language(user_info.user_id)
-        text = translate(TranslationKeys.PLEASE_SELECT_LANGUAGE, lang)
-        keyboard = [
-            [InlineKeyboardButton("🇺🇦 Українська", callback_data='lang_uk')],
-            [InlineKeyboardButton("🇬🇧 English", callback_data='lang_en')],
-            [InlineKeyboardButton("🇵🇱 Polski", callback_data='lang_pl')]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await update.message.reply_text(text, reply_markup=reply_markup)
+        lang = stats.stats_manager.get_user_language(user_info.user_id)
+        screen = screen_cache.get('language_picker', lang)
+        await update.message.reply_text(screen.text, reply_markup=screen.reply_markup)
 
 
 class StartCommandHandler(BaseCommandHandler):
@@ -61,20 +74,16 @@ def command_name(self) -> str:
 
     async def execute_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, user_info: Optional[UserInfo]) -> None:
         """Execute start command"""
-        from config import Config
-
-        lang = stats_manager.get_user_language(user_info.user_id)
-        welcome_message = translate(TranslationKeys.WELCOME, lang).format(
-            bot_name=Config.BOT_NAME,
+        lang = stats.stats_manager.get_user_language(user_info.user_id)
+        screen = screen_cache.get('welcome', lang)
+        welcome_message = screen.render(
             user_name=user_info.display_name if user_info else translate(TranslationKeys.USER, lang)
         )
 
-        keyboard = _get_main_menu_keyboard(lang)
-
         await update.message.reply_text(
             welcome_message,
-            reply_markup=keyboard,
-            parse_mode=ParseMode.MARKDOWN
+            reply_markup=screen.reply_markup,
+            parse_mode=screen.parse_mode
         )
 
 class HelpCommandHandler(BaseCommandHandler):
@@ -86,15 +95,13 @@ def command_name(self) -> str:
 
     async def execute_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, user_info: Optional[UserInfo]) -> None:
         """Execute help command"""
-        lang = stats_manager.get_user_language(user_info.user_id)
-        help_text = translate(TranslationKeys.HELP_COMMANDS_V2, lang)
-
-        keyboard = _get_main_menu_keyboard(lang)
+        lang = stats.stats_manager.get_user_language(user_info.user_id)
+        screen = screen_cache.get('help_command', lang)
 
         await update.message.reply_text(
-            help_text,
-            reply_markup=keyboard,
-            parse_mode=ParseMode.MARKDOWN
+            screen.text,
+            reply_markup=screen.reply_markup,
+            parse_mode=screen.parse_mode
         )
 
 class InfoCommandHandler(BaseCommandHandler):
@@ -106,21 +113,13 @@ def command_name(self) -> str:
 
     async def execute_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, user_info: Optional[UserInfo]) -> None:
         """Execute info command"""
-        from config import Config
-
-        lang = stats_manager.get_user_language(user_info.user_id)
-        info_text = translate(TranslationKeys.BOT_INFO, lang).format(
-            bot_name=Config.BOT_NAME,
-            bot_version=Config.BOT_VERSION,
-            developer=Config.BOT_DEVELOPER
-        )
-
-        keyboard = _get_main_menu_keyboard(lang)
+        lang = stats.stats_manager.get_user_language(user_info.user_id)
+        screen = screen_cache.get('info_command', lang)
 
         await update.message.reply_text(
-            info_text,
-            reply_markup=keyboard,
-            parse_mode=ParseMode.MARKDOWN
+            screen.text,
+            reply_markup=screen.reply_markup,
+            parse_mode=screen.parse_mode
         )
 
 class MenuCommandHandler(BaseCommandHandler):
@@ -144,14 +143,9 @@ def command_name(self) -> str:
 
     async def execute_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, user_info: Optional[UserInfo]) -> None:
         """Execute stats command"""
-        from stats import stats_manager
-
-        lang = stats_manager.get_user_language(user_info.user_id)
-        stats_text = stats_manager.get_stats_summary(lang)
-        keyboard = [
-            [InlineKeyboardButton(translate(TranslationKeys.REFRESH, lang), callback_data='stats'), InlineKeyboardButton(translate(TranslationKeys.MENU, lang), callback_data='menu')]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        lang = stats.stats_manager.get_user_language(user_info.user_id)
+        stats_text = stats.stats_manager.get_stats_summary(lang)
+        reply_markup = screen_cache.keyboard('stats', lang)
 
         await update.message.reply_text(
             stats_text,
@@ -168,22 +162,12 @@ def command_name(self) -> str:
 
     async def execute_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, user_info: Optional[UserInfo]) -> None:
         """Execute admin command"""
-        from utils import is_admin
-        from stats import stats_manager
-
-        # Check if user is admin
-        if not user_info or not is_admin(user_info.user_id):
-            lang = stats_manager.get_user_language(user_info.user_id)
-            await update.message.reply_text(translate(TranslationKeys.ERROR_ACCESS_DENIED, lang))
+        if not await _require_admin(update, user_info):
             return
 
-        lang = stats_manager.get_user_language(user_info.user_id)
-        users_text = stats_manager.get_users_list(limit=20)
-        keyboard = [
-            [InlineKeyboardButton(translate(TranslationKeys.REFRESH, lang), callback_data='admin'), InlineKeyboardButton(translate(TranslationKeys.STATISTICS, lang), callback_data='stats')],
-            [InlineKeyboardButton(translate(TranslationKeys.MENU, lang), callback_data='menu')]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        lang = stats.stats_manager.get_user_language(user_info.user_id)
+        users_text = stats.stats_manager.get_users_list(limit=20)
+        reply_markup = screen_cache.keyboard('admin', lang)
 
         await update.message.reply_text(
             users_text,
@@ -191,50 +175,163 @@ async def execute_command(self, update: Update, context: ContextTypes.DEFAULT_TY
             parse_mode=ParseMode.HTML
         )
 
-class JokeCommandHandler(BaseCommandHandler):
-    """Joke command handler"""
+class ReloadLocalesCommandHandler(BaseCommandHandler):
+    """Reload translations command handler (admin only)"""
 
     @property
     def command_name(self) -> str:
-        return "/joke"
+        return "/reload_locales"
 
     async def execute_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, user_info: Optional[UserInfo]) -> None:
-        """Execute joke command"""
-        from utils import get_random_joke
-        from telegram import InlineKeyboardMarkup, InlineKeyboardButton
+        """Execute reload_locales command"""
+        from locale_reloader import locale_reloader
 
-        lang = stats_manager.get_user_language(user_info.user_id)
-        # Send loading message
-        loading_message = await update.message.reply_text(translate(TranslationKeys.FETCHING_JOKE, lang))
+        if not await _require_admin(update, user_info):
+            return
 
         try:
-            # Get joke based on user input (if any)
-            default_prompt = translate(TranslationKeys.TELL_ME_A_JOKE, lang)
-            user_input = context.args[0] if context.args else default_prompt
-            joke_text = await get_random_joke(user_input, lang)
+            counts = await locale_reloader.reload()
+        except Exception as e:
+            await update.message.reply_text(f"❌ Reload failed, current translations kept: {e}")
+            return
 
-            # Update message with joke
-            keyboard = [
-                [InlineKeyboardButton(translate(TranslationKeys.ANOTHER_JOKE, lang), callback_data='joke'), InlineKeyboardButton(translate(TranslationKeys.MENU, lang), callback_data='menu')]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+        summary = ", ".join(f"{lang}: {count}" for lang, count in counts.items())
+        await update.message.reply_text(
+            f"✅ Translations reloaded in {locale_reloader.last_reload_seconds * 1000:.0f} ms ({summary})"
+        )
 
-            await loading_message.edit_text(
-                joke_text,
-                reply_markup=reply_markup,
-                parse_mode=ParseMode.MARKDOWN
-            )
+class ProfileCommandHandler(BaseCommandHandler):
+    """Time-boxed profiling session with the report sent as a document (admin only)"""
 
-        except Exception as e:
-            self.logger.error(f"Error fetching joke: {e}")
-            error_message = translate(TranslationKeys.ERROR_JOKE, lang)
-            keyboard = _get_error_keyboard(lang)
+    @property
+    def command_name(self) -> str:
+        return "/profile"
 
-            await loading_message.edit_text(
-                error_message,
-                reply_markup=keyboard
+    async def execute_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, user_info: Optional[UserInfo]) -> None:
+        """Execute profile command: /profile [seconds] [sample|cprofile]"""
+        from config import Config
+        from profiler import MODES, profiler
+        from rate_limiter import Priority
+
+        if not await _require_admin(update, user_info):
+            return
+
+        args = list(context.args or [])
+        mode = args.pop() if args and args[-1] in MODES else MODES[0]
+        try:
+            seconds = float(args[0]) if args else BotConstants.DEFAULT_PROFILE_SECONDS
+        except ValueError:
+            seconds = math.nan
+        if not math.isfinite(seconds):
+            await update.message.reply_text(f"Usage: /profile [seconds] [{'|'.join(MODES)}]")
+            return
+        running = profiler.running
+        # Claimed before the first await, so a second /profile sent meanwhile is refused
+        if not profiler.try_begin(mode):
+            await update.message.reply_text(f"⏳ A {running} profiling session is already running")
+            return
+        seconds = min(max(seconds, 1.0), Config.PROFILE_MAX_SECONDS)
+
+        async def run_session() -> None:
+            try:
+                report = await profiler.run(seconds, mode)
+            except Exception as e:
+                self.logger.error(f"Profiling failed: {e}")
+                await update.message.reply_text(f"❌ Profiling failed: {e}")
+                return
+            finally:
+                profiler.end()
+            # Sent long after the command: must not hold up replies to other users
+            await update.message.reply_document(
+                document=InputFile(io.BytesIO(report.content), filename=report.filename),
+                caption=f"📈 {mode}: {report.summary}"[:1024],
+                rate_limit_args=Priority.BULK,
             )
 
+        # The session outlives this update so the admin's next messages are not held up
+        context.application.create_task(run_session())
+        await update.message.reply_text(f"📈 Profiling ({mode}) for {seconds:g}s...")
+
+class TracesCommandHandler(BaseCommandHandler):
+    """Dump of the slowest recent update traces (admin only)"""
+
+    @property
+    def command_name(self) -> str:
+        return "/traces"
+
+    async def execute_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, user_info: Optional[UserInfo]) -> None:
+        """Execute traces command"""
+        from tracing import tracer
+
+        if not await _require_admin(update, user_info):
+            return
+
+        metrics = tracer.get_metrics()
+        summary = (f"🔎 {metrics['buffered']} slow traces (≥ {tracer.slow_threshold:g}s) "
+                   f"of {metrics['completed']} updates traced")
+        if not tracer.slow_traces:
+            await update.message.reply_text(summary)
+            return
+        await update.message.reply_document(
+            document=InputFile(io.BytesIO(tracer.dump().encode("utf-8")), filename="slow_traces.txt"),
+            caption=summary,
+        )
+
+class StallsCommandHandler(BaseCommandHandler):
+    """Event-loop stalls and the code that caused them (admin only)"""
+
+    @property
+    def command_name(self) -> str:
+        return "/stalls"
+
+    async def execute_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, user_info: Optional[UserInfo]) -> None:
+        """Execute stalls command"""
+        from stall_detector import stall_detector
+
+        if not await _require_admin(update, user_info):
+            return
+
+        metrics = stall_detector.get_metrics()
+        summary = f"🧊 {metrics['stalls']} event loop stalls (≥ {stall_detector.threshold:g}s)"
+        if not metrics["running"]:
+            summary += ", detector is off"
+        worst = stall_detector.worst_offenders(3)
+        if worst:
+            summary += "\n" + "\n".join(f"{total * 1000:.0f} ms in {count}x: {handler} {site}"
+                                         for handler, site, count, total, longest in worst)
+        if not stall_detector.stalls:
+            await update.message.reply_text(summary)
+            return
+        await update.message.reply_document(
+            document=InputFile(io.BytesIO(stall_detector.dump().encode("utf-8")), filename="stalls.txt"),
+            caption=summary[:1024],
+        )
+
+class JokeCommandHandler(BaseCommandHandler):
+    """Joke command handler"""
+
+    @property
+    def command_name(self) -> str:
+        return "/joke"
+
+    async def execute_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, user_info: Optional[UserInfo]) -> None:
+        """Execute joke command"""
+        from handlers.joke_delivery import spawn_joke_delivery
+
+        lang = stats.stats_manager.get_user_language(user_info.user_id)
+
+        # Get joke based on user input (if any)
+        default_prompt = translate(TranslationKeys.TELL_ME_A_JOKE, lang)
+        user_input = context.args[0] if context.args else default_prompt
+
+        reply_markup = screen_cache.keyboard('joke_command_result', lang)
+
+        # Generate in the background; a newer request or navigating away cancels it
+        spawn_joke_delivery(
+            context, user_info.user_id, update.message, translate(TranslationKeys.FETCHING_JOKE, lang), user_input, lang,
+            reply_markup, translate(TranslationKeys.ERROR_JOKE, lang), _get_error_keyboard(lang)
+        )
+
 class EchoMessageHandler(BaseMessageHandler):
     """Echo message handler for user messages"""
 
@@ -242,7 +339,7 @@ async def execute_message(self, update: Update, context: ContextTypes.DEFAULT_TY
         """Execute echo message with helpful response"""
         from utils import get_random_joke
 
-        lang = stats_manager.get_user_language(user_info.user_id)
+        lang = stats.stats_manager.get_user_language(user_info.user_id)
         user_message = update.message.text
 
         # Send loading message
@@ -253,10 +350,7 @@ async def execute_message(self, update: Update, context: ContextTypes.DEFAULT_TY
             joke_text = await get_random_joke(user_message, lang)
 
             # Update message with joke
-            keyboard = [
-                [InlineKeyboardButton(translate(TranslationKeys.ANOTHER_JOKE, lang), callback_data='joke'), InlineKeyboardButton(translate(TranslationKeys.MENU, lang), callback_data='menu')]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            reply_markup = screen_cache.keyboard('joke_command_result', lang)
 
             await loading_message.edit_text(
                 joke_text,
@@ -283,17 +377,23 @@ def callback_data(self) -> str:
 
     async def execute_callback(self, query, context: ContextTypes.DEFAULT_TYPE, user_info: Optional[UserInfo]) -> None:
         """Execute stats callback"""
-        from stats import stats_manager
+        from message_cache import edit_cache
 
-        stats_text = stats_manager.get_stats_summary()
-        keyboard = KeyboardLayouts.get_stats_keyboard()
+        lang = stats.stats_manager.get_user_language(query.from_user.id)
+        stats_text = stats.stats_manager.get_stats_summary(lang)
+        keyboard = screen_cache.keyboard('stats', lang)
 
-        await query.edit_message_text(
+        await edit_cache.edit_text(
+            query,
             stats_text,
             reply_markup=keyboard,
             parse_mode=ParseMode.HTML
         )
 
+    async def handle_error(self, update, context, error: Exception) -> None:
+        """Show the stats error with a retry button"""
+        await _edit_callback_error(update.callback_query, TranslationKeys.ERROR_STATS, self.callback_data)
+
 class AdminCallbackHandler(BaseCallbackHandler):
     """Admin callback handler"""
 
@@ -301,25 +401,35 @@ class AdminCallbackHandler(BaseCallbackHandler):
     def callback_data(self) -> str:
         return "admin"
 
+    def _track_callback(self, user_info: UserInfo) -> None:
+        """Only admins are tracked, once they pass the check in ``execute_callback``"""
+
     async def execute_callback(self, query, context: ContextTypes.DEFAULT_TYPE, user_info: Optional[UserInfo]) -> None:
         """Execute admin callback"""
+        from message_cache import edit_cache
         from utils import is_admin
-        from stats import stats_manager
 
+        lang = stats.stats_manager.get_user_language(query.from_user.id)
         # Check if user is admin
         if not user_info or not is_admin(user_info.user_id):
-            await query.edit_message_text(MessageTemplates.ERROR_ACCESS_DENIED)
+            await edit_cache.edit_text(query, translate(TranslationKeys.ERROR_ACCESS_DENIED, lang))
             return
+        self._track_user_interaction(user_info, f"{self.callback_data}_callback")
 
-        users_text = stats_manager.get_users_list(limit=20)
-        keyboard = KeyboardLayouts.get_admin_keyboard()
+        users_text = stats.stats_manager.get_users_list(lang, limit=20)
+        keyboard = screen_cache.keyboard('admin', lang)
 
-        await query.edit_message_text(
+        await edit_cache.edit_text(
+            query,
             users_text,
             reply_markup=keyboard,
             parse_mode=ParseMode.HTML
         )
 
+    async def handle_error(self, update, context, error: Exception) -> None:
+        """Show the admin error with a retry button"""
+        await _edit_callback_error(update.callback_query, TranslationKeys.ERROR_ADMIN, self.callback_data)
+
 class JokeCallbackHandler(BaseCallbackHandler):
     """Joke callback handler"""
 
@@ -327,31 +437,21 @@ class JokeCallbackHandler(BaseCallbackHandler):
     def callback_data(self) -> str:
         return "joke"
 
+    def _track_callback(self, user_info: UserInfo) -> None:
+        """Opening the joke prompt is an interaction, not a command"""
+        self._track_user_interaction(user_info)
+
     async def execute_callback(self, query, context: ContextTypes.DEFAULT_TYPE, user_info: Optional[UserInfo]) -> None:
         """Execute joke callback - ask user for input"""
+        from message_cache import edit_cache
+
         if user_info:
             # Set user state to waiting for joke input
-            state_manager.set_user_state(user_info.user_id, UserState.WAITING_FOR_JOKE_INPUT)
+            state_manager.set_user_state(user_info.user_id, UserState.WAITING_FOR_JOKE_INPUT, query.message.message_id)
 
-        joke_prompt = """
-🎭 **Joke Generator**
+        lang = stats.stats_manager.get_user_language(query.from_user.id)
+        await edit_cache.edit_screen(query, screen_cache.get('joke_prompt', lang))
 
-Send me any text and I'll create a personalized joke for you!
-
-**Examples:**
-• "Tell me a programming joke"
-• "I want a dad joke"
-• "Make me laugh about cats"
-• Or just send any text!
-
-I'll create a personalized joke for you! 😄
-        """
-
-        keyboard = [[InlineKeyboardButton(ButtonTexts.BACK_TO_MENU, callback_data='menu')]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-
-        await query.edit_message_text(
-            joke_prompt,
-            reply_markup=reply_markup,
-            parse_mode=ParseMode.MARKDOWN
-        )
+    async def handle_error(self, update, context, error: Exception) -> None:
+        """Show the joke error with a retry button"""
+        await _edit_callback_error(update.callback_query, TranslationKeys.ERROR_JOKE, self.callback_data)
@@ -2,39 +2,40 @@
 Callback handlers for Telegram Bot
 """
 import logging
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import Update
 from telegram.ext import ContextTypes
-from telegram.constants import ParseMode
-from config import Config
-from utils import get_random_joke, track_user_interaction, track_command_usage, is_admin
-from stats import stats_manager
+from utils import track_user_interaction, track_command_usage
+import stats
 from base import UserInfo
 from constants import TranslationKeys
 from user_states import state_manager, UserState
 from localization import translate
+from handlers.base_handlers import StatsCallbackHandler, AdminCallbackHandler, JokeCallbackHandler
+from handlers.callback_router import callback_router
+from handlers.joke_delivery import spawn_joke_delivery
+from message_cache import edit_cache
+from screens import screen_cache
 
 logger = logging.getLogger(__name__)
 
 
+@callback_router.route(prefix='lang_', auto_answer=False)
 async def handle_language_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle language selection callback."""
     query = update.callback_query
     user_id = query.from_user.id
     lang_code = query.data.split('_')[1]
 
-    stats_manager.set_user_language(user_id, lang_code)
+    stats.stats_manager.set_user_language(user_id, lang_code)
 
-    language_names = {"uk": "Українська", "en": "English", "pl": "Polski"}
-    confirmation_text = translate(TranslationKeys.LANGUAGE_CHANGED, lang_code).format(language=language_names[lang_code])
-
-    await query.answer(confirmation_text)
+    await query.answer(screen_cache.get('language_changed', lang_code).text)
     await show_menu(update, context, query.message)
 
 async def show_menu(update: Update, context: ContextTypes.DEFAULT_TYPE, message=None) -> None:
     """Display the main menu."""
     # Track user interaction
     user = update.effective_user
-    lang = stats_manager.get_user_language(user.id)
+    lang = stats.stats_manager.get_user_language(user.id)
     if user:
         track_user_interaction(
             user_id=user.id,
@@ -47,109 +48,54 @@ async def show_menu(update: Update, context: ContextTypes.DEFAULT_TYPE, message=
         # Clear user state when returning to menu
         state_manager.clear_user_state(user.id)
 
-    menu_text = translate(TranslationKeys.MAIN_MENU, lang)
-
-    keyboard = [
-        [InlineKeyboardButton(translate(TranslationKeys.STATISTICS, lang), callback_data='stats'), InlineKeyboardButton(translate(TranslationKeys.SETTINGS, lang), callback_data='settings')],
-        [InlineKeyboardButton(translate(TranslationKeys.JOKE, lang), callback_data='joke'), InlineKeyboardButton(translate(TranslationKeys.ABOUT, lang), callback_data='info')],
-        [InlineKeyboardButton(translate(TranslationKeys.HELP, lang), callback_data='help')]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
+    screen = screen_cache.get('main_menu', lang)
     if message:
-        await message.reply_text(menu_text, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
+        await message.reply_text(screen.text, reply_markup=screen.reply_markup, parse_mode=screen.parse_mode)
     else:
-        await update.callback_query.edit_message_text(menu_text, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
+        await edit_cache.edit_screen(update.callback_query, screen)
 
 async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle button callbacks."""
-    query = update.callback_query
-    await query.answer()
+    await callback_router.dispatch(update, context)
 
-    if query.data.startswith('lang_'):
-        await handle_language_callback(update, context)
-        return
+@callback_router.route('menu')
+async def handle_menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle menu button callback - show the menu in a new message."""
+    await show_menu(update, context, update.callback_query.message)
 
-    if query.data == 'menu':
-        await show_menu(update, context, query.message)
-    elif query.data == 'info':
-        await handle_info_callback(update, context)
-    elif query.data == 'help':
-        await handle_help_callback(update, context)
-    elif query.data == 'stats':
-        await handle_stats_callback(update, context)
-    elif query.data == 'settings':
-        await handle_settings_callback(update, context)
-    elif query.data == 'change_language':
-        await handle_change_language_callback(update, context)
-    elif query.data == 'contact':
-        await handle_contact_callback(update, context)
-    elif query.data == 'echo_again':
-        await query.edit_message_text("🔄 Send me any message and I'll echo it back to you!")
-    elif query.data == 'joke':
-        await handle_joke_callback(update, context)
-    elif query.data == 'another_joke':
-        await handle_another_joke_callback(update, context)
-    elif query.data == 'retry_joke':
-        await handle_retry_joke_callback(update, context)
-    elif query.data == 'admin':
-        await handle_admin_callback(update, context)
+@callback_router.route('echo_again')
+async def handle_echo_again_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle echo again button callback."""
+    await edit_cache.edit_text(update.callback_query, "🔄 Send me any message and I'll echo it back to you!")
 
+@callback_router.route('retry_joke', auto_answer=False)
 async def handle_retry_joke_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle retry joke button callback."""
     query = update.callback_query
-    await query.answer()
-
     user_id = query.from_user.id
-    lang = stats_manager.get_user_language(user_id)
+    lang = stats.stats_manager.get_user_language(user_id)
     last_joke_input = state_manager.get_last_joke_input(user_id)
 
     if not last_joke_input:
         await query.answer("Nothing to retry.", show_alert=True)
         return
+    await query.answer()
 
     # Remove the keyboard from the original message
-    await query.edit_message_reply_markup(reply_markup=None)
+    await edit_cache.edit_reply_markup(query, reply_markup=None)
 
-    # Send a new "loading" message
-    loading_message = await query.message.reply_text(translate(TranslationKeys.CREATING_JOKE, lang))
+    error_message = "😅 Sorry, I couldn't create a joke right now. Try again later!"
 
-    try:
-        joke_text = await get_random_joke(last_joke_input, lang)
-        
-        keyboard = [
-            [
-                InlineKeyboardButton(translate(TranslationKeys.ANOTHER_JOKE, lang), callback_data='another_joke'),
-                InlineKeyboardButton(translate(TranslationKeys.TRY_AGAIN, lang), callback_data='retry_joke')
-            ],
-            [InlineKeyboardButton(translate(TranslationKeys.MENU, lang), callback_data='menu')]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await loading_message.edit_text(
-            text=joke_text,
-            reply_markup=reply_markup,
-            parse_mode=ParseMode.MARKDOWN
-        )
-    except Exception as e:
-        logger.error(f"Error retrying joke: {e}")
-        error_message = "😅 Sorry, I couldn't create a joke right now. Try again later!"
-        keyboard = [
-            [
-                InlineKeyboardButton(translate(TranslationKeys.TRY_AGAIN, lang), callback_data='retry_joke'),
-                InlineKeyboardButton(translate(TranslationKeys.MENU, lang), callback_data='menu')
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await loading_message.edit_text(
-            text=error_message,
-            reply_markup=reply_markup
-        )
+    # Generate in the background; a newer request or navigating away cancels it
+    spawn_joke_delivery(
+        context, user_id, query.message, translate(TranslationKeys.CREATING_JOKE, lang), last_joke_input, lang,
+        screen_cache.keyboard('joke_result', lang), error_message, screen_cache.keyboard('joke_retry_error', lang)
+    )
 
+@callback_router.route('another_joke')
 async def handle_another_joke_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle 'Another Joke' button callback - ask user for input in a new message."""
     query = update.callback_query
-    await query.answer()
 
     try:
         # Track user interaction
@@ -166,290 +112,66 @@ async def handle_another_joke_callback(update: Update, context: ContextTypes.DEF
             # Set user state to waiting for joke input
             state_manager.set_user_state(user.id, UserState.WAITING_FOR_JOKE_INPUT)
 
-        lang = stats_manager.get_user_language(user.id)
+        lang = stats.stats_manager.get_user_language(user.id)
         # Ask user for joke input
-        joke_prompt = translate(TranslationKeys.JOKE_GENERATOR_PROMPT, lang)
-
-        keyboard = [
-            [InlineKeyboardButton(translate(TranslationKeys.BACK_TO_MENU, lang), callback_data='menu')]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        screen = screen_cache.get('joke_prompt', lang)
 
         # Send a new message with the prompt
         prompt_message = await query.message.reply_text(
-            joke_prompt,
-            reply_markup=reply_markup,
-            parse_mode=ParseMode.MARKDOWN
+            screen.text,
+            reply_markup=screen.reply_markup,
+            parse_mode=screen.parse_mode
         )
 
         # And now, remove the keyboard from the original message
-        await query.edit_message_reply_markup(reply_markup=None)
+        await edit_cache.edit_reply_markup(query, reply_markup=None)
 
         # Set user state to waiting for joke input
         state_manager.set_user_state(user.id, UserState.WAITING_FOR_JOKE_INPUT, prompt_message.message_id)
 
     except Exception as e:
         logger.error(f"Error in another_joke_callback: {e}")
-        lang = stats_manager.get_user_language(query.from_user.id)
+        lang = stats.stats_manager.get_user_language(query.from_user.id)
         error_text = translate(TranslationKeys.ERROR_JOKE, lang)
         await query.message.reply_text(error_text)
 
+@callback_router.route('info')
 async def handle_info_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle info button callback."""
     query = update.callback_query
-    user_id = query.from_user.id
-    lang = stats_manager.get_user_language(user_id)
-
-    info_text = translate(TranslationKeys.BOT_INFO, lang).format(
-        bot_name=Config.BOT_NAME,
-        bot_version=Config.BOT_VERSION,
-        developer=Config.BOT_DEVELOPER
-    )
-    keyboard = [[InlineKeyboardButton(translate(TranslationKeys.BACK_TO_MENU, lang), callback_data='menu')]]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    await query.edit_message_text(info_text, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
+    lang = stats.stats_manager.get_user_language(query.from_user.id)
+    await edit_cache.edit_screen(query, screen_cache.get('info', lang))
 
+@callback_router.route('help')
 async def handle_help_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle help button callback."""
     query = update.callback_query
-    user_id = query.from_user.id
-    lang = stats_manager.get_user_language(user_id)
-
-    help_text = translate(TranslationKeys.HELP_COMMANDS, lang)
-
-    keyboard = [[InlineKeyboardButton(translate(TranslationKeys.BACK_TO_MENU, lang), callback_data='menu')]]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    await query.edit_message_text(help_text, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
-
-async def handle_stats_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Handle stats button callback."""
-    query = update.callback_query
-    try:
-        # Track user interaction
-        user = query.from_user
-        if user:
-            track_user_interaction(
-                user_id=user.id,
-                username=user.username,
-                first_name=user.first_name,
-                last_name=user.last_name
-            )
-            track_command_usage(user.id, 'stats_callback')
-
-        lang = stats_manager.get_user_language(user.id)
-        # Get statistics
-        stats_text = stats_manager.get_stats_summary(lang)
-
-        # Create keyboard
-        keyboard = [
-            [InlineKeyboardButton(translate("🔄 Refresh", lang), callback_data='stats'), InlineKeyboardButton(translate(TranslationKeys.MENU, lang), callback_data='menu')]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-
-        await query.edit_message_text(
-            stats_text,
-            reply_markup=reply_markup,
-            parse_mode=ParseMode.HTML
-        )
-
-    except Exception as e:
-        logger.error(f"Error in stats callback: {e}")
-        lang = stats_manager.get_user_language(query.from_user.id)
-        error_text = translate(TranslationKeys.ERROR_STATS, lang)
-        keyboard = [
-            [InlineKeyboardButton(translate(TranslationKeys.TRY_AGAIN, lang), callback_data='stats'), InlineKeyboardButton(translate(TranslationKeys.BACK_TO_MENU, lang), callback_data='menu')]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-
-        await query.edit_message_text(
-            error_text,
-            reply_markup=reply_markup
-        )
+    lang = stats.stats_manager.get_user_language(query.from_user.id)
+    await edit_cache.edit_screen(query, screen_cache.get('help', lang))
 
+@callback_router.route('settings')
 async def handle_settings_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle settings button callback."""
     query = update.callback_query
-    user_id = query.from_user.id
-    lang = stats_manager.get_user_language(user_id)
-
-    language_names = {"uk": "Українська", "en": "English", "pl": "Polski"}
-    current_language_name = language_names.get(lang, lang)
-
-    settings_text = translate(TranslationKeys.SETTINGS_MENU, lang).format(language=current_language_name)
-
-    keyboard = [
-        [InlineKeyboardButton(translate(TranslationKeys.CHANGE_LANGUAGE, lang), callback_data='change_language')],
-        [InlineKeyboardButton(translate(TranslationKeys.BACK_TO_MENU, lang), callback_data='menu')]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    await query.edit_message_text(settings_text, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
+    lang = stats.stats_manager.get_user_language(query.from_user.id)
+    await edit_cache.edit_screen(query, screen_cache.get('settings', lang))
 
 
+@callback_router.route('contact')
 async def handle_contact_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle contact button callback."""
     query = update.callback_query
-    lang = stats_manager.get_user_language(query.from_user.id)
-    contact_text = translate(TranslationKeys.CONTACT, lang).format(
-        developer=Config.BOT_DEVELOPER,
-        email=Config.BOT_EMAIL,
-        github=Config.BOT_GITHUB
-    )
-    keyboard = [[InlineKeyboardButton(translate(TranslationKeys.BACK_TO_MENU, lang), callback_data='menu')]]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    await query.edit_message_text(contact_text, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
-
-async def handle_joke_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Handle joke button callback - ask user for input."""
-    query = update.callback_query
-    try:
-        # Track user interaction
-        user = query.from_user
-        if user:
-            track_user_interaction(
-                user_id=user.id,
-                username=user.username,
-                first_name=user.first_name,
-                last_name=user.last_name
-            )
-            # Set user state to waiting for joke input
-            state_manager.set_user_state(user.id, UserState.WAITING_FOR_JOKE_INPUT, query.message.message_id)
-
-        lang = stats_manager.get_user_language(user.id)
-        # Ask user for joke input
-        joke_prompt = translate(TranslationKeys.JOKE_GENERATOR_PROMPT, lang)
-
-        keyboard = [
-            [InlineKeyboardButton(translate(TranslationKeys.BACK_TO_MENU, lang), callback_data='menu')]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-
-        await query.edit_message_text(
-            joke_prompt,
-            reply_markup=reply_markup,
-            parse_mode=ParseMode.MARKDOWN
-        )
-
-    except Exception as e:
-        logger.error(f"Error in joke callback: {e}")
-        lang = stats_manager.get_user_language(query.from_user.id)
-        error_text = translate(TranslationKeys.ERROR_JOKE, lang)
-        keyboard = [
-            [InlineKeyboardButton(translate(TranslationKeys.TRY_AGAIN, lang), callback_data='joke'), InlineKeyboardButton(translate(TranslationKeys.BACK_TO_MENU, lang), callback_data='menu')]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-
-        await query.edit_message_text(
-            error_text,
-            reply_markup=reply_markup
-        )
-
-async def handle_stats_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Handle stats button callback."""
-    query = update.callback_query
-    try:
-        # Track user interaction
-        user = query.from_user
-        if user:
-            track_user_interaction(
-                user_id=user.id,
-                username=user.username,
-                first_name=user.first_name,
-                last_name=user.last_name
-            )
-            track_command_usage(user.id, 'stats_callback')
-
-        lang = stats_manager.get_user_language(user.id)
-        # Get statistics
-        stats_text = stats_manager.get_stats_summary(lang)
-
-        # Create keyboard
-        keyboard = [
-            [InlineKeyboardButton(translate("🔄 Refresh", lang), callback_data='stats'), InlineKeyboardButton(translate(TranslationKeys.MENU, lang), callback_data='menu')]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-
-        await query.edit_message_text(
-            stats_text,
-            reply_markup=reply_markup,
-            parse_mode=ParseMode.HTML
-        )
-
-    except Exception as e:
-        logger.error(f"Error in stats callback: {e}")
-        lang = stats_manager.get_user_language(query.from_user.id)
-        error_text = translate(TranslationKeys.ERROR_STATS, lang)
-        keyboard = [
-            [InlineKeyboardButton(translate(TranslationKeys.TRY_AGAIN, lang), callback_data='stats'), InlineKeyboardButton(translate(TranslationKeys.BACK_TO_MENU, lang), callback_data='menu')]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-
-        await query.edit_message_text(
-            error_text,
-            reply_markup=reply_markup
-        )
-
-async def handle_admin_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Handle admin button callback."""
-    query = update.callback_query
-    try:
-        # Check if user is admin
-        user = query.from_user
-        lang = stats_manager.get_user_language(user.id)
-        if not is_admin(user.id):
-            await query.edit_message_text(translate(TranslationKeys.ERROR_ACCESS_DENIED, lang))
-            return
-
-        # Track user interaction
-        if user:
-            track_user_interaction(
-                user_id=user.id,
-                username=user.username,
-                first_name=user.first_name,
-                last_name=user.last_name
-            )
-            track_command_usage(user.id, 'admin_callback')
-
-        # Get users list
-        users_text = stats_manager.get_users_list(lang, limit=20)
-
-        # Create keyboard
-        keyboard = [
-            [InlineKeyboardButton(translate(TranslationKeys.REFRESH, lang), callback_data='admin'), InlineKeyboardButton(translate(TranslationKeys.STATISTICS, lang), callback_data='stats')],
-            [InlineKeyboardButton(translate(TranslationKeys.MENU, lang), callback_data='menu')]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-
-        await query.edit_message_text(
-            users_text,
-            reply_markup=reply_markup,
-            parse_mode=ParseMode.HTML
-        )
-
-    except Exception as e:
-        logger.error(f"Error in admin callback: {e}")
-        lang = stats_manager.get_user_language(query.from_user.id)
-        error_text = translate(TranslationKeys.ERROR_ADMIN, lang)
-        keyboard = [
-            [InlineKeyboardButton(translate(TranslationKeys.TRY_AGAIN, lang), callback_data='admin'), InlineKeyboardButton(translate(TranslationKeys.BACK_TO_MENU, lang), callback_data='menu')]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-
-        await query.edit_message_text(
-            error_text,
-            reply_markup=reply_markup
-        )
+    lang = stats.stats_manager.get_user_language(query.from_user.id)
+    await edit_cache.edit_screen(query, screen_cache.get('contact', lang))
 
+@callback_router.route('change_language')
 async def handle_change_language_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle change_language button callback."""
     query = update.callback_query
-    user_id = query.from_user.id
-    lang = stats_manager.get_user_language(user_id)
+    lang = stats.stats_manager.get_user_language(query.from_user.id)
+    await edit_cache.edit_screen(query, screen_cache.get('language_picker', lang))
 
-    text = translate(TranslationKeys.PLEASE_SELECT_LANGUAGE, lang)
-    keyboard = [
-        [InlineKeyboardButton("🇺🇦 Українська", callback_data='lang_uk')],
-        [InlineKeyboardButton("🇬🇧 English", callback_data='lang_en')],
-        [InlineKeyboardButton("🇵🇱 Polski", callback_data='lang_pl')]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    await query.edit_message_text(text, reply_markup=reply_markup)
+# Class-based handlers answer their queries themselves
+callback_router.register_handler(StatsCallbackHandler())
+callback_router.register_handler(AdminCallbackHandler())
+callback_router.register_handler(JokeCallbackHandler())
@@ -0,0 +1,94 @@
+"""
+Table-driven routing of inline keyboard callbacks for Telegram Bot
+"""
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+import metrics
+from base import BaseCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+CallbackFunction = Callable[[Update, ContextTypes.DEFAULT_TYPE], Awaitable[None]]
+
+@dataclass(frozen=True)
+class CallbackRoute:
+    """A registered callback target"""
+    callback: CallbackFunction
+    # False when the handler answers the query itself (e.g. with a notification text)
+    auto_answer: bool = True
+    # Latency series in /metrics; None for handlers that time themselves (BaseCallbackHandler)
+    latency: Optional[Any] = None
+
+class CallbackRouter:
+    """Dispatches callback queries by exact ``callback_data`` or by its prefix.
+
+    Prefixes end with ``separator`` (``lang_`` matches ``lang_uk``); both lookups are
+    dictionary hits. Every callback query is answered exactly once: by the router for
+    ``auto_answer`` routes and unknown data, otherwise by the handler.
+    """
+
+    def __init__(self, separator: str = "_"):
+        self.separator = separator
+        self._exact: Dict[str, CallbackRoute] = {}
+        self._prefixes: Dict[str, CallbackRoute] = {}
+
+    def route(self, *keys: str, prefix: Optional[str] = None,
+              auto_answer: bool = True) -> Callable[[CallbackFunction], CallbackFunction]:
+        """Decorator registering a handler for exact keys and/or a prefix"""
+        def decorator(callback: CallbackFunction) -> CallbackFunction:
+            self.add_route(callback, *keys, prefix=prefix, auto_answer=auto_answer)
+            return callback
+        return decorator
+
+    def add_route(self, callback: CallbackFunction, *keys: str, prefix: Optional[str] = None,
+                  auto_answer: bool = True, timed: bool = True) -> None:
+        """Register ``callback`` for exact keys and/or a prefix"""
+        if not keys and prefix is None:
+            raise ValueError("A callback route needs at least one key or a prefix")
+        for key in keys:
+            latency = metrics.handler_latency.labels("callback", key) if timed else None
+            self._exact[key] = CallbackRoute(callback, auto_answer, latency)
+        if prefix is not None:
+            if not prefix.endswith(self.separator):
+                raise ValueError(f"Callback prefix '{prefix}' must end with '{self.separator}'")
+            latency = metrics.handler_latency.labels("callback", prefix + "*") if timed else None
+            self._prefixes[prefix] = CallbackRoute(callback, auto_answer, latency)
+
+    def register_handler(self, handler: BaseCallbackHandler) -> None:
+        """Plug in a ``BaseCallbackHandler`` under its ``callback_data`` (it answers the query itself)"""
+        self.add_route(handler.handle, handler.callback_data, auto_answer=False, timed=False)
+
+    def resolve(self, data: str) -> Optional[CallbackRoute]:
+        """Find the route for callback data: exact key first, then prefix"""
+        target = self._exact.get(data)
+        if target is None:
+            head, separator, _ = data.partition(self.separator)
+            if separator:
+                target = self._prefixes.get(head + separator)
+        return target
+
+    async def dispatch(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Entry point for ``CallbackQueryHandler``"""
+        query = update.callback_query
+        target = self.resolve(query.data or "")
+        if target is None:
+            logger.warning(f"No callback route for '{query.data}'")
+            await query.answer()
+            return
+        started = time.perf_counter()
+        try:
+            if target.auto_answer:
+                await query.answer()
+            await target.callback(update, context)
+        finally:
+            if target.latency is not None:
+                target.latency.observe(time.perf_counter() - started)
+
+# Global callback router instance
+callback_router = CallbackRouter()
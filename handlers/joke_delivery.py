@@ -0,0 +1,122 @@
+"""
+Background joke delivery for Telegram Bot
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Union
+from telegram.constants import ChatAction, ParseMode
+from telegram.ext import ContextTypes
+
+import metrics
+from config import Config
+from utils import get_random_joke, start_joke_task
+
+logger = logging.getLogger(__name__)
+
+class DeliveryStats:
+    """Bot API calls spent per delivered joke"""
+
+    # Placeholder message + edit, what every joke used to cost
+    BASELINE_MESSAGE_CALLS = 2
+
+    def __init__(self):
+        self.jokes = 0
+        self.fast_replies = 0
+        self.placeholders = 0
+        self.chat_actions = 0
+        self.message_calls = 0
+
+    def record(self, placeholder_sent: bool, chat_action_sent: bool) -> None:
+        self.jokes += 1
+        self.placeholders += int(placeholder_sent)
+        self.fast_replies += int(not placeholder_sent)
+        self.chat_actions += int(chat_action_sent)
+        self.message_calls += 2 if placeholder_sent else 1
+
+    def get_metrics(self) -> Dict[str, Union[int, float]]:
+        """Totals plus message calls saved per joke compared to always sending a placeholder"""
+        saved = self.jokes * self.BASELINE_MESSAGE_CALLS - self.message_calls
+        return {
+            "jokes": self.jokes,
+            "fast_replies": self.fast_replies,
+            "placeholders": self.placeholders,
+            "chat_actions": self.chat_actions,
+            "message_calls": self.message_calls,
+            "message_calls_saved": saved,
+            "message_calls_saved_per_joke": round(saved / self.jokes, 3) if self.jokes else 0.0,
+            "api_calls_per_joke": round((self.message_calls + self.chat_actions) / self.jokes, 3) if self.jokes else 0.0,
+        }
+
+# Global delivery statistics
+delivery_stats = DeliveryStats()
+metrics.registry.gauge_callback(
+    "bot_joke_deliveries", "Jokes delivered as a single reply (fast) or through a loading placeholder",
+    lambda: {("fast",): delivery_stats.fast_replies, ("placeholder",): delivery_stats.placeholders}, ("delivery",))
+metrics.registry.gauge_callback(
+    "bot_joke_message_calls_saved", "Message calls saved compared to always sending a placeholder",
+    lambda: delivery_stats.get_metrics()["message_calls_saved"])
+
+async def _deliver_joke(reply_to, loading_text: str, user_input: str, lang: str, reply_markup,
+                        error_text: str, error_markup, deadline: float) -> None:
+    """Generate a joke and reply with it.
+
+    With ``JOKE_PLACEHOLDER_DELAY`` > 0 the user first sees "typing..." and a loading
+    placeholder is only sent if the joke takes longer than the delay; a fast joke goes
+    out as a single reply. With 0 the placeholder is sent at once and edited later.
+    """
+    generation = asyncio.ensure_future(get_random_joke(user_input, lang, deadline=deadline))
+    placeholder = None
+    chat_action_sent = False
+    try:
+        if Config.JOKE_PLACEHOLDER_DELAY > 0:
+            if Config.JOKE_TYPING_ACTION:
+                try:
+                    await reply_to.reply_chat_action(ChatAction.TYPING)
+                    chat_action_sent = True
+                except Exception as e:
+                    logger.warning(f"Could not send typing action: {e}")
+            await asyncio.wait({generation}, timeout=Config.JOKE_PLACEHOLDER_DELAY)
+        if not generation.done():
+            placeholder = await reply_to.reply_text(loading_text)
+
+        try:
+            joke_text = await generation
+            if placeholder:
+                await placeholder.edit_text(joke_text, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
+            else:
+                await reply_to.reply_text(joke_text, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
+        except Exception as e:
+            logger.error(f"Error delivering joke: {e}")
+            if placeholder:
+                await placeholder.edit_text(error_text, reply_markup=error_markup)
+            else:
+                await reply_to.reply_text(error_text, reply_markup=error_markup)
+        delivery_stats.record(placeholder is not None, chat_action_sent)
+
+    except asyncio.CancelledError:
+        # The user navigated away or asked for a newer joke - drop the stale loading message
+        generation.cancel()
+        if placeholder:
+            try:
+                await placeholder.delete()
+            except Exception as e:
+                logger.warning(f"Could not delete stale loading message: {e}")
+        raise
+    finally:
+        # Also when sending the placeholder or the error reply failed: never leave the generation unowned
+        if not generation.done():
+            generation.cancel()
+        elif not generation.cancelled():
+            generation.exception()  # Retrieved, so a failed generation is not reported as unhandled
+
+def spawn_joke_delivery(context: ContextTypes.DEFAULT_TYPE, user_id: int, reply_to, loading_text: str,
+                        user_input: str, lang: str, reply_markup,
+                        error_text: str, error_markup) -> asyncio.Task:
+    """Start joke delivery in the background so the user's next update is not blocked"""
+    deadline = time.monotonic() + Config.JOKES_API_TIMEOUT
+    return start_joke_task(
+        context.application,
+        user_id,
+        _deliver_joke(reply_to, loading_text, user_input, lang, reply_markup, error_text, error_markup, deadline)
+    )
@@ -5,15 +5,19 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
-from utils import get_random_joke, track_user_interaction, track_command_usage
+from utils import track_user_interaction, track_command_usage
 from base import UserInfo
 from constants import TranslationKeys
 from user_states import state_manager, UserState
-from stats import stats_manager
+import stats
 from localization import translate
+from handlers.joke_delivery import spawn_joke_delivery
+from screens import screen_cache
+from metrics import timed_handler
 
 logger = logging.getLogger(__name__)
 
+@timed_handler("message", "echo")
 async def echo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle user messages with echo response or joke creation."""
     try:
@@ -36,10 +40,8 @@ async def echo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         
         # Check if user is waiting for joke input
         if state_manager.is_waiting_for_joke_input(user.id):
-            # User is waiting for joke input - create joke
+            # User is waiting for joke input - create joke (clears the waiting state)
             await handle_joke_creation(update, user_message, context)
-            # Clear user state after processing
-            state_manager.clear_user_state(user.id)
         else:
             # Normal echo behavior
             await handle_normal_echo(update, user_message)
@@ -63,7 +65,7 @@ async def echo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 async def handle_normal_echo(update: Update, user_message: str) -> None:
     """Handle normal echo response"""
     user_id = update.message.from_user.id
-    lang = stats_manager.get_user_language(user_id)
+    lang = stats.stats_manager.get_user_language(user_id)
 
     # Echo the message back to the user
     echo_response = translate(TranslationKeys.YOU_SAID, lang).format(user_message=user_message)
@@ -72,10 +74,7 @@ async def handle_normal_echo(update: Update, user_message: str) -> None:
     help_text = translate(TranslationKeys.JOKE_BOT_HELP, lang)
     
     # Create keyboard with options
-    keyboard = [
-        [InlineKeyboardButton(translate(TranslationKeys.CREATE_JOKE, lang), callback_data='joke'), InlineKeyboardButton(translate(TranslationKeys.MENU, lang), callback_data='menu')]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    reply_markup = screen_cache.keyboard('echo', lang)
     
     await update.message.reply_text(
         f"{echo_response}\n\n{help_text}",
@@ -86,7 +85,7 @@ async def handle_normal_echo(update: Update, user_message: str) -> None:
 async def handle_joke_creation(update: Update, user_message: str, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle joke creation from user input"""
     user_id = update.message.from_user.id
-    lang = stats_manager.get_user_language(user_id)
+    lang = stats.stats_manager.get_user_language(user_id)
 
     # Get the prompt message ID and delete it
     prompt_message_id = state_manager.get_joke_prompt_message_id(user_id)
@@ -96,39 +95,16 @@ async def handle_joke_creation(update: Update, user_message: str, context: Conte
         except Exception as e:
             logger.warning(f"Could not delete joke prompt message: {e}")
 
-    # Send loading message
-    loading_message = await update.message.reply_text(translate(TranslationKeys.CREATING_JOKE, lang))
-    
-    try:
-        # Save the last joke input
-        state_manager.set_last_joke_input(user_id, user_message)
+    # The prompt is answered - leave the waiting state before the joke starts generating
+    state_manager.clear_user_state(user_id)
 
-        # Get joke based on user input
-        joke_text = await get_random_joke(user_message, lang)
-        
-        # Update message with joke
-        keyboard = [
-            [InlineKeyboardButton(translate(TranslationKeys.ANOTHER_JOKE, lang), callback_data='another_joke'),
-             InlineKeyboardButton(translate(TranslationKeys.TRY_AGAIN, lang), callback_data='retry_joke')],
-            [InlineKeyboardButton(translate(TranslationKeys.MENU, lang), callback_data='menu')]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await loading_message.edit_text(
-            joke_text, 
-            reply_markup=reply_markup, 
-            parse_mode=ParseMode.MARKDOWN
-        )
-        
-    except Exception as e:
-        logger.error(f"Error creating joke: {e}")
-        error_message = "😅 Sorry, I couldn't create a joke right now. Try again later!"
-        keyboard = [
-            [InlineKeyboardButton(translate(TranslationKeys.TRY_AGAIN, lang), callback_data='retry_joke'), InlineKeyboardButton(translate(TranslationKeys.MENU, lang), callback_data='menu')]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await loading_message.edit_text(
-            error_message, 
-            reply_markup=reply_markup
-        )
+    # Save the last joke input
+    state_manager.set_last_joke_input(user_id, user_message)
+
+    error_message = "😅 Sorry, I couldn't create a joke right now. Try again later!"
+
+    # Generate in the background; navigating away or a newer request cancels it
+    spawn_joke_delivery(
+        context, user_id, update.message, translate(TranslationKeys.CREATING_JOKE, lang), user_message, lang,
+        screen_cache.keyboard('joke_result', lang), error_message, screen_cache.keyboard('joke_retry_error', lang)
+    )
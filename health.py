@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Liveness and readiness endpoints for Telegram Bot.
+
+``GET /healthz`` answers whether the process should be restarted: it fails only when
+the bot cannot recover by itself (long polling has not returned for
+``HEALTH_POLL_MAX_AGE`` seconds). ``GET /readyz`` answers whether it should get more
+traffic: it also fails while the application is starting or stopping and under
+overload - event loop lag or a stall above ``READY_MAX_LOOP_LAG``, or more than
+``READY_MAX_PENDING_UPDATES`` updates waiting for a handler.
+
+Both return JSON with every check's status (``ok``, ``degraded`` or ``fail``) and
+the numbers behind it, with status 200, or 503 if any check fails. Degraded
+dependencies (jokes API failing, state writes failing) are reported but never fail
+the bot: menus, statistics and settings keep working without them.
+
+The endpoints are served next to ``/metrics`` (see ``metrics.add_routes``).
+"""
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from telegram.ext import Application
+
+import metrics
+from config import Config
+from constants import ServerConstants
+from http_server import HTTPServer, Request, Response
+
+OK = "ok"
+DEGRADED = "degraded"
+FAIL = "fail"
+
+CheckResult = Tuple[str, Dict[str, Any]]
+
+class DependencyState:
+    """Recent outcomes of calls to an external service.
+
+    The "circuit" is open after ``failure_threshold`` failures in a row and closes with
+    the next success. It is only reported; callers keep sending requests.
+    """
+
+    def __init__(self, failure_threshold: int = 5, smoothing: float = 0.2):
+        self.failure_threshold = failure_threshold
+        self.smoothing = smoothing
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_success: Optional[float] = None
+        self.last_failure: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.latency_ewma: Optional[float] = None
+
+    def record(self, outcome: str, latency: float, success: bool) -> None:
+        self.calls += 1
+        now = time.monotonic()
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += self.smoothing * (latency - self.latency_ewma)
+        if success:
+            self.consecutive_failures = 0
+            self.last_success = now
+        else:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_failure = now
+            self.last_error = outcome
+
+    @property
+    def circuit(self) -> str:
+        return "open" if self.consecutive_failures >= self.failure_threshold else "closed"
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "circuit": self.circuit,
+            "calls": self.calls,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+            "seconds_since_success": _age(self.last_success, now),
+            "seconds_since_failure": _age(self.last_failure, now),
+            "latency_ewma_seconds": round(self.latency_ewma, 4) if self.latency_ewma is not None else None,
+        }
+
+class Freshness:
+    """When something last happened (``time.monotonic()``)"""
+
+    def __init__(self):
+        self.last: Optional[float] = None
+
+    def mark(self) -> None:
+        self.last = time.monotonic()
+
+    def age(self) -> Optional[float]:
+        return time.monotonic() - self.last if self.last is not None else None
+
+def _age(moment: Optional[float], now: float) -> Optional[float]:
+    return round(now - moment, 3) if moment is not None else None
+
+# Updated by utils.fetch_joke, telegram_transport and the webhook ingress
+jokes_api = DependencyState(Config.JOKES_API_FAILURE_THRESHOLD)
+polling = Freshness()  # Last successful getUpdates
+webhook_updates = Freshness()  # Last update accepted by the webhook
+
+_application: Optional[Application] = None
+_attached_at: Optional[float] = None
+_supervisor = None  # sharding.ShardSupervisor of a multi-process ingress
+
+def attach(application: Application) -> None:
+    """Report on ``application`` (post_init)"""
+    global _application, _attached_at
+    _application = application
+    _attached_at = time.monotonic()
+
+def detach() -> None:
+    global _application
+    _application = None
+
+def attach_supervisor(supervisor) -> None:
+    """Report on the worker processes of a multi-process ingress instead of an application"""
+    global _supervisor
+    _supervisor = supervisor
+
+def check_application() -> CheckResult:
+    if _supervisor is not None:
+        workers = _supervisor.get_metrics()
+        details = {"workers": workers["workers"], "alive": workers["alive"]}
+        if not workers["alive"]:
+            return FAIL, details
+        # A worker being restarted: its users' updates wait in its queue meanwhile
+        return (OK if workers["alive"] == workers["workers"] else DEGRADED), details
+    if _application is None:
+        return FAIL, {"running": False}
+    return (OK if _application.running else FAIL), {"running": _application.running}
+
+def check_telegram() -> CheckResult:
+    """Long polling must keep returning; in webhook mode updates simply arrive (or not)"""
+    updater = _application.updater if _application is not None else None
+    if updater is None or not updater.running:
+        age = webhook_updates.age()
+        return OK, {"mode": "webhook", "seconds_since_update": round(age, 3) if age is not None else None}
+    # Before the first poll returns, count from start-up
+    age = polling.age()
+    if age is None and _attached_at is not None:
+        age = time.monotonic() - _attached_at
+    details = {"mode": "polling", "seconds_since_poll": round(age, 3) if age is not None else None,
+               "max_age_seconds": Config.HEALTH_POLL_MAX_AGE}
+    return (FAIL if age is not None and age > Config.HEALTH_POLL_MAX_AGE else OK), details
+
+def check_event_loop() -> CheckResult:
+    from stall_detector import stall_detector
+
+    monitor = metrics.loop_lag_monitor
+    stalled = stall_detector.current_stall
+    details = {
+        "lag_seconds": round(monitor.last_lag, 4),
+        "max_lag_seconds": round(monitor.max_lag, 4),
+        "stalls": stall_detector.total,
+        "max_allowed_lag_seconds": Config.READY_MAX_LOOP_LAG,
+    }
+    # A stall the watchdog has not seen end yet counts with its duration so far
+    lag = monitor.last_lag
+    if stalled is not None:
+        details["stalled_seconds"] = round(stalled.duration, 4)
+        lag = max(lag, stalled.duration)
+    return (FAIL if lag > Config.READY_MAX_LOOP_LAG else OK), details
+
+def check_updates() -> CheckResult:
+    """Updates received but not handled yet"""
+    if _application is None:
+        return OK, {}
+    processor = _application.update_processor
+    in_processor = processor.current_concurrent_updates
+    running = getattr(processor, "running", in_processor)
+    queued = _application.update_queue.qsize()
+    pending = queued + in_processor - running
+    details = {
+        "queued": queued,
+        "waiting": in_processor - running,
+        "running": running,
+        "concurrency_limit": getattr(processor, "concurrency_limit", processor.max_concurrent_updates),
+        "max_pending": Config.READY_MAX_PENDING_UPDATES,
+    }
+    return (FAIL if pending > Config.READY_MAX_PENDING_UPDATES else OK), details
+
+def check_jokes_api() -> CheckResult:
+    details = jokes_api.snapshot()
+    return (DEGRADED if details["circuit"] == "open" else OK), details
+
+def check_state() -> CheckResult:
+    """User state store size and the persistence writer's backlog"""
+    import state_persistence
+    from user_states import state_manager
+
+    # Counters only: the memory estimate walks every entry and is left to /metrics scrapes
+    details: Dict[str, Any] = {"store": state_manager.get_metrics(memory=False)}
+    persister = state_persistence.state_persister
+    if persister is None:
+        return OK, details
+    writer = persister.get_metrics()
+    details["writer"] = writer
+    # Pending changes after failed writes: the next flush retries them, nothing is lost yet
+    return (DEGRADED if writer["failures"] and writer["pending"] else OK), details
+
+LIVENESS: List[Tuple[str, Callable[[], CheckResult]]] = [
+    ("telegram", check_telegram),
+]
+READINESS: List[Tuple[str, Callable[[], CheckResult]]] = [
+    ("application", check_application),
+    ("telegram", check_telegram),
+    ("event_loop", check_event_loop),
+    ("updates", check_updates),
+    ("jokes_api", check_jokes_api),
+    ("state", check_state),
+]
+
+def evaluate(checks: List[Tuple[str, Callable[[], CheckResult]]]) -> Dict[str, Any]:
+    """Run ``checks``; the overall status is the worst of them"""
+    results: Dict[str, Any] = {}
+    overall = OK
+    for name, check in checks:
+        try:
+            status, details = check()
+        except Exception as e:
+            status, details = FAIL, {"error": str(e)}
+        results[name] = {"status": status, **details}
+        if status == FAIL or (status == DEGRADED and overall == OK):
+            overall = status
+    return {"status": overall, "checks": results}
+
+def _respond(report: Dict[str, Any]) -> Response:
+    return Response.json(report, 503 if report["status"] == FAIL else 200)
+
+async def healthz(request: Request) -> Response:
+    """``GET /healthz``"""
+    return _respond(evaluate(LIVENESS))
+
+async def readyz(request: Request) -> Response:
+    """``GET /readyz``"""
+    return _respond(evaluate(READINESS))
+
+def add_routes(server: HTTPServer) -> None:
+    server.add_route("GET", ServerConstants.HEALTH_PATH, healthz)
+    server.add_route("GET", ServerConstants.READY_PATH, readyz)
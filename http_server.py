@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Minimal asyncio HTTP/1.1 server for the bot's own endpoints (webhook ingress)
+"""
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+logger = logging.getLogger(__name__)
+
+STATUS_REASONS = {
+    200: "OK", 204: "No Content", 400: "Bad Request", 401: "Unauthorized", 403: "Forbidden",
+    404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 429: "Too Many Requests",
+    500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+@dataclass
+class Request:
+    """Parsed HTTP request"""
+    method: str
+    path: str
+    query: Dict[str, str]
+    headers: Dict[str, str]
+    body: bytes = b""
+
+    def json(self):
+        """Decode the body as JSON"""
+        return json.loads(self.body or b"null")
+
+@dataclass
+class Response:
+    """HTTP response to send back"""
+    status: int = 200
+    body: bytes = b""
+    content_type: str = "text/plain; charset=utf-8"
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def json(cls, payload, status: int = 200) -> "Response":
+        """Build a JSON response"""
+        return cls(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json")
+
+    @classmethod
+    def text(cls, text: str, status: int = 200) -> "Response":
+        """Build a plain text response"""
+        return cls(status, text.encode("utf-8"))
+
+RouteHandler = Callable[[Request], Awaitable[Response]]
+
+class HTTPServer:
+    """Tiny route table on top of ``asyncio.start_server`` with keep-alive support"""
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 8000, max_body_size: int = 1024 * 1024):
+        self.host = host
+        self.port = port
+        self.max_body_size = max_body_size
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._routes: Dict[Tuple[str, str], RouteHandler] = {}
+        self._prefix_routes: Dict[Tuple[str, str], RouteHandler] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def add_route(self, method: str, path: str, handler: RouteHandler, prefix: bool = False) -> None:
+        """Register a handler for an exact path, or for every path under ``path`` if ``prefix``"""
+        routes = self._prefix_routes if prefix else self._routes
+        routes[(method.upper(), path)] = handler
+
+    @property
+    def running(self) -> bool:
+        return self._server is not None
+
+    async def start(self) -> None:
+        """Start listening; port 0 picks a free port"""
+        if self._server is not None:
+            return
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.logger.info(f"HTTP server listening on {self.host}:{self.port}")
+
+    async def stop(self) -> None:
+        """Stop listening"""
+        if self._server is None:
+            return
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+        self.logger.info("HTTP server stopped")
+
+    def _resolve(self, method: str, path: str) -> Tuple[Optional[RouteHandler], bool]:
+        """Find a handler; the flag tells whether the path exists for another method"""
+        handler = self._routes.get((method, path))
+        if handler:
+            return handler, True
+        for (route_method, route_prefix), prefix_handler in self._prefix_routes.items():
+            if path.startswith(route_prefix) and route_method == method:
+                return prefix_handler, True
+        known = any(route_path == path for _, route_path in self._routes) or any(
+            path.startswith(route_prefix) for _, route_prefix in self._prefix_routes
+        )
+        return None, known
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Request]:
+        """Read one request; None means the client closed the connection"""
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        method, target, _ = request_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", "0") or 0)
+        if length > self.max_body_size:
+            raise OverflowError(length)
+        body = await reader.readexactly(length) if length else b""
+        url = urlsplit(target)
+        return Request(method.upper(), url.path, dict(parse_qsl(url.query)), headers, body)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except OverflowError:
+                    await self._write(writer, Response.text("Payload too large", 413), keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                handler, known = self._resolve(request.method, request.path)
+                if handler is None:
+                    response = Response.text("Method not allowed", 405) if known else Response.text("Not found", 404)
+                else:
+                    try:
+                        response = await handler(request)
+                    except Exception as e:
+                        self.logger.error(f"Error handling {request.method} {request.path}: {e}")
+                        response = Response.text("Internal server error", 500)
+
+                keep_alive = request.headers.get("connection", "").lower() != "close"
+                await self._write(writer, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _write(self, writer: asyncio.StreamWriter, response: Response, keep_alive: bool) -> None:
+        head = [
+            f"HTTP/1.1 {response.status} {STATUS_REASONS.get(response.status, 'Status')}",
+            f"Content-Type: {response.content_type}",
+            f"Content-Length: {len(response.body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        head.extend(f"{name}: {value}" for name, value in response.headers.items())
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + response.body)
+        await writer.drain()
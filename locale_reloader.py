@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Hot reload of translation catalogs without restarting the bot.
+
+Catalogs are parsed in a worker thread, checked, and swapped in with a single assignment,
+so handlers running meanwhile keep translating with the old set. The rendered screens in
+``screens.screen_cache`` are rebuilt from the new catalogs right after the swap. A reload
+is triggered by the admin ``/reload_locales`` command or, with ``LOCALE_RELOAD_INTERVAL``
+set, by a background task that polls the catalog files' modification times.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import localization
+from config import Config
+from screens import screen_cache
+
+logger = logging.getLogger(__name__)
+
+class LocaleReloader:
+    """Rebuilds catalogs off the event loop and swaps them in atomically"""
+
+    def __init__(self, interval: float = 0.0):
+        self.interval = interval
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._mtimes: Dict[str, float] = {}
+        self.reloads = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.last_reload_seconds = 0.0
+        self.last_reload_at: Optional[float] = None
+
+    async def reload(self) -> Dict[str, int]:
+        """Reload now; returns the number of strings per language.
+
+        Raises if a language that is currently loaded could not be read - the old
+        catalogs stay in place in that case.
+        """
+        async with self._lock:
+            started = time.perf_counter()
+            try:
+                mtimes = localization.catalog_mtimes()
+                new_catalogs = await asyncio.to_thread(localization.build_catalogs)
+                missing = set(localization.catalogs) - set(new_catalogs)
+                if missing:
+                    raise ValueError(f"catalogs failed to load: {', '.join(sorted(missing))}")
+
+                localization.install_catalogs(new_catalogs)
+                await asyncio.to_thread(screen_cache.build)
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                logger.error(f"Translation reload failed, keeping the current catalogs: {e}")
+                raise
+
+            self._mtimes = mtimes
+            self.reloads += 1
+            self.last_error = None
+            self.last_reload_at = time.time()
+            self.last_reload_seconds = time.perf_counter() - started
+            counts = {lang: len(catalog) for lang, catalog in new_catalogs.items()}
+            logger.info(f"Translations reloaded in {self.last_reload_seconds * 1000:.1f} ms: {counts}")
+            return counts
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            mtimes = localization.catalog_mtimes()
+            if mtimes == self._mtimes:
+                continue
+            try:
+                await self.reload()
+            except Exception:
+                # Logged in reload; retry once the files change again
+                self._mtimes = mtimes
+
+    def start(self) -> None:
+        """Start watching the catalog files, if an interval is configured"""
+        if self.interval <= 0 or self._task is not None:
+            return
+        self._mtimes = localization.catalog_mtimes()
+        self._task = asyncio.create_task(self._watch())
+        logger.info(f"Watching translation catalogs every {self.interval:g}s")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "watching": self._task is not None,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "last_reload_seconds": round(self.last_reload_seconds, 6),
+            "last_reload_at": self.last_reload_at,
+        }
+
+# Global locale reloader instance
+locale_reloader = LocaleReloader(Config.LOCALE_RELOAD_INTERVAL)
@@ -2,8 +2,14 @@
 """
 Localization module for the Telegram bot.
 Handles multi-language support using polib.
+
+Catalogs are compiled at load time into one dict per language with the fallback to the
+default language already merged in, so ``translate`` is a single dictionary lookup.
+Nothing is read on import: the application factory loads the catalogs at startup, and
+anything else that translates first (scripts, benchmarks) loads them on its first call.
 """
 import os
+import sys
 import polib
 from typing import Dict
 
@@ -11,34 +17,86 @@
 
 LOCALE_DIR = os.path.join(os.path.dirname(__file__), 'locales')
 
-# Dictionary to hold PO file objects
-po_files: Dict[str, polib.POFile] = {}
+# msgid -> msgstr per language, fallback to the default language already resolved
+catalogs: Dict[str, Dict[str, str]] = {}
+_loaded = False
+
+def _catalog_paths(lang: str):
+    base = os.path.join(LOCALE_DIR, lang, 'LC_MESSAGES', 'bot')
+    return base + '.po', base + '.mo'
+
+def _read_catalog(lang: str) -> Dict[str, str]:
+    """Translated entries of one language, from a fresh .mo if available, else the .po"""
+    po_path, mo_path = _catalog_paths(lang)
+    if os.path.exists(mo_path) and (not os.path.exists(po_path) or os.path.getmtime(mo_path) >= os.path.getmtime(po_path)):
+        source = polib.mofile(mo_path)
+    elif os.path.exists(po_path):
+        source = polib.pofile(po_path)
+    else:
+        print(f"Translation file for language '{lang}' not found.")
+        return {}
+
+    catalog: Dict[str, str] = {}
+    for entry in source:
+        if entry.msgstr and not entry.obsolete:
+            # First entry wins, like POFile.find
+            catalog.setdefault(entry.msgid, entry.msgstr)
+    return catalog
+
+def build_catalogs() -> Dict[str, Dict[str, str]]:
+    """Read every supported language and merge in the default-language fallback"""
+    raw: Dict[str, Dict[str, str]] = {}
+    for lang in BotConstants.SUPPORTED_LANGUAGES:
+        try:
+            raw[lang] = _read_catalog(lang)
+        except Exception as e:
+            print(f"Error loading translation file for language '{lang}': {e}")
+
+    default = raw.get(BotConstants.DEFAULT_LANG, {})
+    return {lang: {**default, **entries} for lang, entries in raw.items()}
+
+def install_catalogs(new_catalogs: Dict[str, Dict[str, str]]) -> None:
+    """Swap in a complete set of catalogs; translate() sees either the old or the new set"""
+    global catalogs, _loaded
+    catalogs = new_catalogs
+    _loaded = True
 
 def load_translations():
-    """Load all available translations from .po files"""
+    """Load all available translations"""
+    install_catalogs(build_catalogs())
+
+def catalog_mtimes() -> Dict[str, float]:
+    """Modification time of every catalog file, to notice edits"""
+    mtimes = {}
     for lang in BotConstants.SUPPORTED_LANGUAGES:
-        po_file_path = os.path.join(LOCALE_DIR, lang, 'LC_MESSAGES', 'bot.po')
-        if os.path.exists(po_file_path):
+        for path in _catalog_paths(lang):
             try:
-                po_files[lang] = polib.pofile(po_file_path)
-            except Exception as e:
-                print(f"Error loading translation file for language '{lang}': {e}")
-        else:
-            print(f"Translation file for language '{lang}' not found.")
+                mtimes[path] = os.stat(path).st_mtime
+            except OSError:
+                pass
+    return mtimes
+
+def compile_catalogs() -> None:
+    """Write bot.mo next to every bot.po so later starts skip .po parsing"""
+    for lang in BotConstants.SUPPORTED_LANGUAGES:
+        po_path, mo_path = _catalog_paths(lang)
+        if os.path.exists(po_path):
+            polib.pofile(po_path).save_as_mofile(mo_path)
+            print(f"Compiled {mo_path}")
 
 def translate(text: str, lang: str) -> str:
     """Translate a given text to the specified language"""
-    if lang in po_files:
-        entry = po_files[lang].find(text)
-        if entry and entry.msgstr:
-            return entry.msgstr
-    # Fallback to default language if translation not found
-    if BotConstants.DEFAULT_LANG in po_files:
-        entry = po_files[BotConstants.DEFAULT_LANG].find(text)
-        if entry and entry.msgstr:
-            return entry.msgstr
+    catalog = catalogs.get(lang) or catalogs.get(BotConstants.DEFAULT_LANG)
+    if catalog is None:
+        if _loaded:
+            return text
+        load_translations()
+        return translate(text, lang)
     # Fallback to msgid if no translation is found at all
-    return text
+    return catalog.get(text, text)
 
-# Load translations on module import
-load_translations()
\ No newline at end of file
+if __name__ == '__main__':
+    if sys.argv[1:] == ['compile']:
+        compile_catalogs()
+    else:
+        print("Usage: python localization.py compile")
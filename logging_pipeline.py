@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Non-blocking logging for the Telegram bot.
+
+Log calls on the event loop only put the record on a queue; a ``QueueListener`` thread
+formats it and writes it to the console and ``bot.log``. Records are not pre-formatted
+on the calling thread, so ``logger.info("... %s", value)`` costs no string building
+there. Before queueing, high-frequency INFO/DEBUG call sites are sampled per logger
+(``LOG_SAMPLE_RATES``) and rate-limited per call site (``LOG_RATE_LIMIT``); warnings
+and errors always pass. Secrets (the jokes API key / Authorization header) are redacted
+in the listener thread before anything is written.
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+REDACTED = "***"
+
+def redact_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    """Copy of ``headers`` that is safe to log"""
+    return {name: REDACTED if name.lower() in ("authorization", "x-api-key") else value
+            for name, value in headers.items()}
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """``"utils=0.1,stats=0.5"`` -> ``{"utils": 0.1, "stats": 0.5}``"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, rate = item.partition("=")
+        rates[name.strip()] = float(rate)
+    return rates
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stdlib version formats here, on the caller's thread. Within one process
+        # the record (args, exc_info) can travel through the queue as it is.
+        return record
+
+class SamplingFilter(logging.Filter):
+    """Drops part of the INFO/DEBUG traffic: per-logger sampling and per-call-site rate limits.
+
+    ``sample_rates`` maps a logger name (children included) to the fraction of records
+    kept. ``rate_limit`` caps records per second from one call site (file and line),
+    with bursts of up to the same number; 0 disables it.
+    """
+
+    def __init__(self, sample_rates: Optional[Dict[str, float]] = None, rate_limit: float = 0.0,
+                 clock=time.monotonic):
+        super().__init__()
+        self.sample_rates = dict(sample_rates or {})
+        self.rate_limit = rate_limit
+        self.clock = clock
+        self._logger_rates: Dict[str, float] = {}
+        self._buckets: Dict[Tuple[str, int], List[float]] = {}  # call site -> [tokens, last refill]
+        self.sampled_out = 0
+        self.rate_limited = 0
+
+    def _sample_rate(self, name: str) -> float:
+        rate = self._logger_rates.get(name)
+        if rate is None:
+            # Most specific configured ancestor wins
+            matches = [prefix for prefix in self.sample_rates if name == prefix or name.startswith(prefix + ".")]
+            rate = self.sample_rates[max(matches, key=len)] if matches else 1.0
+            self._logger_rates[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        if self.sample_rates:
+            rate = self._sample_rate(record.name)
+            if rate < 1.0 and random.random() >= rate:
+                self.sampled_out += 1
+                return False
+
+        if self.rate_limit > 0:
+            now = self.clock()
+            site = (record.pathname, record.lineno)
+            bucket = self._buckets.get(site)
+            if bucket is None:
+                bucket = self._buckets[site] = [self.rate_limit, now]
+            else:
+                bucket[0] = min(self.rate_limit, bucket[0] + (now - bucket[1]) * self.rate_limit)
+                bucket[1] = now
+            if bucket[0] < 1.0:
+                self.rate_limited += 1
+                return False
+            bucket[0] -= 1.0
+        return True
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {"sampled_out": self.sampled_out, "rate_limited": self.rate_limited, "call_sites": len(self._buckets)}
+
+class RedactingFilter(logging.Filter):
+    """Replaces secrets and Authorization header values in the final message"""
+
+    _AUTH_RE = re.compile(r"(['\"]?authorization['\"]?\s*[:=]\s*['\"]?)(bearer\s+)?[^'\",}\s]+", re.IGNORECASE)
+
+    def __init__(self, secrets: Iterable[str] = ()):
+        super().__init__()
+        self.secrets = [secret for secret in secrets if secret]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        message = record.getMessage()
+        redacted = self._AUTH_RE.sub(lambda m: m.group(1) + (m.group(2) or "") + REDACTED, message)
+        for secret in self.secrets:
+            redacted = redacted.replace(secret, REDACTED)
+        if redacted != message:
+            record.msg, record.args = redacted, None
+        return True
+
+class LoggingPipeline:
+    """Queue, listener thread and filters installed by ``utils.setup_logging``"""
+
+    def __init__(self, handlers: List[logging.Handler], secrets: Iterable[str] = (),
+                 sample_rates: Optional[Dict[str, float]] = None, rate_limit: float = 0.0):
+        self.queue: "queue.Queue[logging.LogRecord]" = queue.Queue()
+        self.redactor = RedactingFilter(secrets)
+        for handler in handlers:
+            handler.addFilter(self.redactor)
+        self.sampler = SamplingFilter(sample_rates, rate_limit)
+        self.handler = LazyQueueHandler(self.queue)
+        self.handler.addFilter(self.sampler)
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+
+    def start(self) -> None:
+        self.listener.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Write out everything still queued and stop the listener thread"""
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {"queued": self.queue.qsize(), **self.sampler.get_metrics()}
+
+# Pipeline installed on the root logger, if any
+active_pipeline: Optional[LoggingPipeline] = None
+
+def install(handlers: List[logging.Handler], level: int, secrets: Iterable[str] = (),
+            sample_rates: Optional[Dict[str, float]] = None, rate_limit: float = 0.0) -> LoggingPipeline:
+    """Route the root logger through a new pipeline writing to ``handlers``"""
+    global active_pipeline
+    if active_pipeline is not None:
+        active_pipeline.stop()
+    pipeline = LoggingPipeline(handlers, secrets, sample_rates, rate_limit)
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(pipeline.handler)
+    root.setLevel(level)
+    pipeline.start()
+    active_pipeline = pipeline
+    return pipeline
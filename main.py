@@ -1,27 +1,52 @@
 #!/usr/bin/env python3
 """
 Main entry point for Telegram Bot (Refactored)
+
+Importing this module (or any handler) does no I/O: ``build_application`` is the
+factory that validates the configuration, sets up logging, loads translations and
+statistics and builds the Application, timing each phase (see ``startup``).
 """
+import time
+_import_started = time.perf_counter()
+
+import asyncio
 import logging
 from telegram import Update
 from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, filters
 
 # Import configuration and handlers
 from config import Config
+from constants import ServerConstants
 from handlers.base_handlers import (
     StartCommandHandler, HelpCommandHandler, InfoCommandHandler,
     MenuCommandHandler, StatsCommandHandler, AdminCommandHandler,
-    JokeCommandHandler, StatsCallbackHandler,
-    AdminCallbackHandler, JokeCallbackHandler, LanguageCommandHandler
+    JokeCommandHandler, LanguageCommandHandler, ReloadLocalesCommandHandler,
+    TracesCommandHandler, ProfileCommandHandler, StallsCommandHandler
 )
 from handlers.callback_handlers import button_callback
 from handlers.error_handlers import error_handler
 from handlers.message_handlers import echo
-from utils import setup_logging
+from utils import setup_logging, close_jokes_client
+from webhook import run_webhook
+from sharding import run_sharded
+from update_processor import PerUserUpdateProcessor
+from rate_limiter import PriorityRateLimiter
+from telegram_transport import build_transports
+from screens import screen_cache
+from locale_reloader import locale_reloader
+from state_persistence import start_state_persistence, stop_state_persistence
+from user_states import state_manager
+import localization
+import stats
+import metrics
+import health
+from tracing import TracingApplication
+from stall_detector import stall_detector
+from startup import startup
 
-# Setup logging
-setup_logging(Config.LOG_LEVEL, Config.LOG_FORMAT, Config.IS_DOCKER)
+startup.record("imports", time.perf_counter() - _import_started)
 logger = logging.getLogger(__name__)
+_configured = False
 
 # Create handler instances
 start_handler = StartCommandHandler()
@@ -31,16 +56,92 @@
 stats_handler = StatsCommandHandler()
 admin_handler = AdminCommandHandler()
 joke_handler = JokeCommandHandler()
-stats_callback_handler = StatsCallbackHandler()
-admin_callback_handler = AdminCallbackHandler()
-joke_callback_handler = JokeCallbackHandler()
 language_handler = LanguageCommandHandler()
+reload_locales_handler = ReloadLocalesCommandHandler()
+traces_handler = TracesCommandHandler()
+profile_handler = ProfileCommandHandler()
+stalls_handler = StallsCommandHandler()
 
-def main() -> None:
-    """Start the bot."""
-    # Create the Application
-    application = Application.builder().token(Config.BOT_TOKEN).build()
+def configure() -> None:
+    """Validate the configuration and set up logging (once per process: main() and the factory both call it)"""
+    global _configured
+    if _configured:
+        return
+    with startup.phase("config"):
+        Config.validate()
+    with startup.phase("logging"):
+        setup_logging(Config.LOG_LEVEL, Config.LOG_FORMAT, Config.IS_DOCKER)
+    _configured = True
+
+async def post_init(application: Application) -> None:
+    """Restore saved state and start background tasks once the bot is initialized."""
+    with startup.phase("state"):
+        await start_state_persistence(state_manager)
+    locale_reloader.start()
+    health.attach(application)
+    with startup.phase("http_server"):
+        # No-op for the server when the webhook server already serves /metrics and /healthz
+        await metrics.start(Config.HTTP_LISTEN, Config.METRICS_PORT)
+    if Config.STALL_DETECTION_ENABLED:
+        stall_detector.start()
+    startup.report()
+
+async def post_shutdown(application: Application) -> None:
+    """Release shared resources after the bot stops."""
+    await asyncio.to_thread(stall_detector.stop)
+    await metrics.stop()
+    health.detach()
+    await locale_reloader.stop()
+    await stop_state_persistence()
+    await close_jokes_client()
 
+def build_application() -> Application:
+    """Application factory: load what the bot needs, create the Application and register all handlers."""
+    configure()
+    with startup.phase("localization"):
+        localization.load_translations()
+    with startup.phase("stats"):
+        # In a worker process this is the proxy of the supervisor's manager, loaded there
+        if isinstance(stats.stats_manager, stats.StatsManager):
+            stats.stats_manager.load()
+
+    with startup.phase("application"):
+        application = _build_application()
+    with startup.phase("screens"):
+        # Render static screens for every language now rather than on the first request
+        screen_cache.build()
+    with startup.phase("handlers"):
+        _register_handlers(application)
+    return application
+
+def _build_application() -> Application:
+    request, get_updates_request = build_transports()
+    builder = (
+        Application.builder()
+        .token(Config.BOT_TOKEN)
+        .request(request)
+        .get_updates_request(get_updates_request)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .application_class(TracingApplication)
+    )
+    if Config.TELEGRAM_BASE_URL:
+        builder = builder.base_url(Config.TELEGRAM_BASE_URL)
+    if Config.MAX_CONCURRENT_UPDATES > 1:
+        builder = builder.concurrent_updates(
+            PerUserUpdateProcessor(Config.MAX_CONCURRENT_UPDATES, Config.MAX_PENDING_UPDATES)
+        )
+    if Config.RATE_LIMIT_ENABLED:
+        builder = builder.rate_limiter(PriorityRateLimiter(
+            global_rate=Config.RATE_LIMIT_GLOBAL_PER_SECOND,
+            chat_rate=Config.RATE_LIMIT_CHAT_PER_SECOND,
+            chat_burst=Config.RATE_LIMIT_CHAT_BURST,
+            group_per_minute=Config.RATE_LIMIT_GROUP_PER_MINUTE,
+            max_retries=Config.RATE_LIMIT_MAX_RETRIES,
+        ))
+    return builder.build()
+
+def _register_handlers(application: Application) -> None:
     # Register command handlers
     application.add_handler(CommandHandler("start", start_handler.handle))
     application.add_handler(CommandHandler("help", help_handler.handle))
@@ -50,6 +151,10 @@ def main() -> None:
     application.add_handler(CommandHandler("stats", stats_handler.handle))
     application.add_handler(CommandHandler("admin", admin_handler.handle))
     application.add_handler(CommandHandler("language", language_handler.handle))
+    application.add_handler(CommandHandler("reload_locales", reload_locales_handler.handle))
+    application.add_handler(CommandHandler("traces", traces_handler.handle))
+    application.add_handler(CommandHandler("profile", profile_handler.handle))
+    application.add_handler(CommandHandler("stalls", stalls_handler.handle))
     
     # Register message handler
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, echo))
@@ -60,11 +165,23 @@ def main() -> None:
     # Add error handler
     application.add_error_handler(error_handler)
 
+def main() -> None:
+    """Start the bot."""
+    configure()
     # Run the bot until the user presses Ctrl-C
-    logger.info(f"🤖 {Config.BOT_NAME} v{Config.BOT_VERSION} is starting...")
-    print(f"🤖 {Config.BOT_NAME} v{Config.BOT_VERSION} is starting...")
+    logger.info(f"🤖 {Config.BOT_NAME} v{Config.BOT_VERSION} is starting ({Config.BOT_MODE} mode)...")
+    print(f"🤖 {Config.BOT_NAME} v{Config.BOT_VERSION} is starting ({Config.BOT_MODE} mode)...")
     print("Press Ctrl+C to stop the bot")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    if Config.WORKER_PROCESSES > 1:
+        # Workers build their own applications; this process only receives updates
+        run_sharded(Config.WORKER_PROCESSES)
+        return
+
+    application = build_application()
+    if Config.BOT_MODE == ServerConstants.BOT_MODE_WEBHOOK:
+        run_webhook(application)
+    else:
+        application.run_polling(allowed_updates=Update.ALL_TYPES)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Rendered-content fingerprints of bot messages for skipping redundant edits
+"""
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Union
+
+from telegram import CallbackQuery, InlineKeyboardMarkup
+from telegram.error import BadRequest
+
+import metrics
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+MessageKey = Tuple[Union[int, str], ...]
+Fingerprint = Tuple[Optional[str], str]  # (content, markup)
+
+def _digest(payload: Any) -> str:
+    data = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def is_not_modified_error(error: Exception) -> bool:
+    """Whether Telegram rejected an edit because nothing changed"""
+    return isinstance(error, BadRequest) and "message is not modified" in str(error).lower()
+
+class EditFingerprintCache:
+    """Bounded LRU of the last content and markup fingerprints sent for each message"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[MessageKey, Fingerprint]" = OrderedDict()
+        self.edits_sent = 0
+        self.edits_skipped = 0
+        self.not_modified = 0
+
+    @staticmethod
+    def content_fingerprint(text: str, parse_mode: Optional[str] = None) -> str:
+        return _digest([text, str(parse_mode) if parse_mode else None])
+
+    @staticmethod
+    def markup_fingerprint(reply_markup: Optional[InlineKeyboardMarkup]) -> str:
+        return _digest(reply_markup.to_dict() if reply_markup else None)
+
+    @staticmethod
+    def message_key(query: CallbackQuery) -> Optional[MessageKey]:
+        """Identify the message a callback query belongs to"""
+        if query.message:
+            return (query.message.chat.id, query.message.message_id)
+        if query.inline_message_id:
+            return ("inline", query.inline_message_id)
+        return None
+
+    def get(self, key: MessageKey) -> Optional[Fingerprint]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def remember(self, key: MessageKey, content: Optional[str], markup: str) -> None:
+        self._entries[key] = (content, markup)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def forget(self, key: MessageKey) -> None:
+        self._entries.pop(key, None)
+
+    def get_metrics(self) -> Dict[str, int]:
+        """Cache size and how many Bot API calls were saved"""
+        return {
+            "entries": len(self._entries),
+            "edits_sent": self.edits_sent,
+            "edits_skipped": self.edits_skipped,
+            "not_modified": self.not_modified,
+            "api_calls_saved": self.edits_skipped,
+        }
+
+    async def edit_text(self, query: CallbackQuery, text: str,
+                        reply_markup: Optional[InlineKeyboardMarkup] = None,
+                        parse_mode: Optional[str] = None, markup_fingerprint: Optional[str] = None) -> bool:
+        """Edit the query's message unless it already shows exactly this; True if an edit was sent.
+
+        ``markup_fingerprint`` may be passed for keyboards whose fingerprint is precomputed.
+        """
+        key = self.message_key(query)
+        content = self.content_fingerprint(text, parse_mode)
+        markup = markup_fingerprint or self.markup_fingerprint(reply_markup)
+        if key is not None and self.get(key) == (content, markup):
+            self.edits_skipped += 1
+            return False
+
+        try:
+            await query.edit_message_text(text, reply_markup=reply_markup, parse_mode=parse_mode)
+        except BadRequest as e:
+            if not is_not_modified_error(e):
+                raise
+            # Edited before the cache knew about this message; it is up to date anyway
+            self.not_modified += 1
+        else:
+            self.edits_sent += 1
+        if key is not None:
+            self.remember(key, content, markup)
+        return True
+
+    async def edit_screen(self, query: CallbackQuery, screen, **values: str) -> bool:
+        """``edit_text`` with a prerendered ``screens.Screen``"""
+        return await self.edit_text(query, screen.render(**values), reply_markup=screen.reply_markup,
+                                    parse_mode=screen.parse_mode, markup_fingerprint=screen.markup_fingerprint)
+
+    async def edit_reply_markup(self, query: CallbackQuery,
+                                reply_markup: Optional[InlineKeyboardMarkup] = None) -> bool:
+        """Replace only the keyboard unless it is already this one; True if an edit was sent"""
+        key = self.message_key(query)
+        markup = self.markup_fingerprint(reply_markup)
+        entry = self.get(key) if key is not None else None
+        if entry is not None and entry[1] == markup:
+            self.edits_skipped += 1
+            return False
+
+        try:
+            await query.edit_message_reply_markup(reply_markup=reply_markup)
+        except BadRequest as e:
+            if not is_not_modified_error(e):
+                raise
+            self.not_modified += 1
+        else:
+            self.edits_sent += 1
+        if key is not None:
+            self.remember(key, entry[0] if entry else None, markup)
+        return True
+
+# Global edit cache instance
+edit_cache = EditFingerprintCache(Config.EDIT_CACHE_SIZE)
+
+metrics.registry.gauge_callback(
+    "bot_message_edits", "Message edits sent, skipped as identical to what the message shows, or rejected as not modified",
+    lambda: {("sent",): edit_cache.edits_sent, ("skipped",): edit_cache.edits_skipped,
+             ("not_modified",): edit_cache.not_modified}, ("result",))
+metrics.registry.gauge_callback(
+    "bot_edit_cache_api_calls_saved", "Bot API calls saved by skipping redundant edits",
+    lambda: edit_cache.get_metrics()["api_calls_saved"])
+metrics.registry.gauge_callback(
+    "bot_edit_cache_entries", "Messages whose last content is remembered", lambda: edit_cache.get_metrics()["entries"])
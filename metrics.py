@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Prometheus metrics for Telegram Bot, without third-party dependencies.
+
+Metrics are plain counters, gauges and histograms updated in place on the event loop
+(a dict lookup and an addition per observation); nothing is formatted until Prometheus
+scrapes ``/metrics``. Values that already live elsewhere (store sizes, connections in
+flight) are read by callbacks at scrape time instead of being tracked twice.
+
+``/metrics`` (and ``/healthz``, ``/readyz`` from ``health``) is served by the webhook
+server when there is one, otherwise by a small server of its own on ``METRICS_PORT`` (in multi-process mode every worker listens on
+``METRICS_PORT + 1 + index``).
+"""
+import asyncio
+import functools
+import logging
+import math
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from http_server import HTTPServer, Request, Response
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+API_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Value:
+    """One counter or gauge time series"""
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+class _Buckets:
+    """One histogram time series; bucket counts are made cumulative when rendered"""
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class Metric:
+    """A named metric family; ``labels(*values)`` returns the (cached) series to update"""
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[LabelValues, object] = {}
+        if not self.labelnames:
+            self._series[()] = self._new_series()
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        series = self._series.get(values)
+        if series is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            series = self._series[values] = self._new_series()
+        return series
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, series in list(self._series.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(series.value)}")
+        return lines
+
+class Counter(Metric):
+    kind = "counter"
+
+    def _new_series(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._series[()].inc(amount)
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float) -> None:
+        self._series[()].set(value)
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_series(self) -> _Buckets:
+        return _Buckets(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._series[()].observe(value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        names = self.labelnames + ("le",)
+        for values, series in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series.counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(names, values + (_format_value(bound),))} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series.sum)}")
+            lines.append(f"{self.name}_count{labels} {series.count}")
+        return lines
+
+class CallbackGauge(Metric):
+    """Gauge read from ``callback`` at scrape time.
+
+    The callback returns a number, or ``{label values: number}`` for labelled gauges.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], Union[float, Dict[LabelValues, float]]],
+                 labelnames: Sequence[str] = ()):
+        self.callback = callback
+        super().__init__(name, documentation, labelnames)
+
+    def _new_series(self) -> _Value:
+        return _Value()
+
+    def render(self) -> List[str]:
+        try:
+            values = self.callback()
+        except Exception as e:
+            logger.warning(f"Metric {self.name} could not be collected: {e}")
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+class MetricsRegistry:
+    """All metrics of this process, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        # Re-registering replaces the old family (e.g. a callback bound to a rebuilt object)
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge_callback(self, name: str, documentation: str, callback, labelnames: Sequence[str] = ()) -> CallbackGauge:
+        return self.register(CallbackGauge(name, documentation, callback, labelnames))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+# Global metrics registry
+registry = MetricsRegistry()
+
+handler_latency = registry.histogram(
+    "bot_handler_duration_seconds", "Time spent in update handlers", ("kind", "handler"))
+joke_api_latency = registry.histogram(
+    "bot_joke_api_duration_seconds", "Jokes API request latency by outcome (HTTP status or error)",
+    ("outcome",), API_LATENCY_BUCKETS)
+stats_save_latency = registry.histogram(
+    "bot_stats_save_duration_seconds", "Time spent writing statistics to disk")
+telegram_api_calls = registry.counter(
+    "bot_telegram_api_calls_total", "Outbound Bot API calls by method and outcome (HTTP status or error)",
+    ("method", "outcome"))
+event_loop_lag = registry.histogram(
+    "bot_event_loop_lag_seconds", "How late the event loop woke up a periodic timer", buckets=LAG_BUCKETS)
+
+_started = time.monotonic()
+registry.gauge_callback("bot_uptime_seconds", "Seconds since the process started", lambda: time.monotonic() - _started)
+
+def timed_handle(handle):
+    """Wrap ``BaseHandler.handle`` so its duration lands in ``handler_latency``"""
+    @functools.wraps(handle)
+    async def wrapper(self, update, context):
+        started = time.perf_counter()
+        try:
+            return await handle(self, update, context)
+        finally:
+            handler_latency.labels(self.handler_kind, self.handler_name).observe(time.perf_counter() - started)
+    return wrapper
+
+def timed_handler(kind: str, name: str):
+    """Decorator recording the duration of a plain handler function"""
+    series = handler_latency.labels(kind, name)
+
+    def decorator(callback):
+        @functools.wraps(callback)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await callback(*args, **kwargs)
+            finally:
+                series.observe(time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+class LoopLagMonitor:
+    """Sleeps ``interval`` seconds in a loop and records how much later than asked it woke up"""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        # When the current sleep should end (``loop.time()``); the stall detector watches it
+        self.deadline: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = self.deadline = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            event_loop_lag.observe(lag)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.deadline = None
+
+loop_lag_monitor = LoopLagMonitor()
+registry.gauge_callback("bot_event_loop_lag_last_seconds", "Event loop lag at the last check",
+                        lambda: loop_lag_monitor.last_lag)
+
+async def metrics_endpoint(request: Request) -> Response:
+    """``GET /metrics``"""
+    return Response(200, registry.render().encode("utf-8"), CONTENT_TYPE)
+
+# Set once some HTTP server of this process serves /metrics and the health endpoints
+_exposed = False
+_server: Optional[HTTPServer] = None
+
+def add_routes(server: HTTPServer) -> None:
+    """Serve ``METRICS_PATH``, ``/healthz`` and ``/readyz`` (those enabled) on an existing server"""
+    # config imports base, which imports this module
+    from config import Config
+
+    global _exposed
+    if Config.METRICS_ENABLED:
+        server.add_route("GET", Config.METRICS_PATH, metrics_endpoint)
+    if Config.HEALTH_ENABLED:
+        import health
+        health.add_routes(server)
+    _exposed = True
+
+async def start(host: str, port: int) -> None:
+    """Start the lag monitor and, unless another server already exposes them, serve the endpoints"""
+    from config import Config
+
+    global _server
+    loop_lag_monitor.start()
+    if _exposed or _server is not None or not (Config.METRICS_ENABLED or Config.HEALTH_ENABLED):
+        return
+    server = HTTPServer(host, port)
+    add_routes(server)
+    try:
+        await server.start()
+    except OSError as e:
+        logger.error(f"Metrics server could not listen on {host}:{port}: {e}")
+        return
+    _server = server
+
+async def stop() -> None:
+    global _server, _exposed
+    await loop_lag_monitor.stop()
+    if _server is not None:
+        await _server.stop()
+        _server = None
+        _exposed = False
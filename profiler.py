@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+On-demand profiling of the running bot (admin ``/profile`` command).
+
+Two modes:
+  * ``sample``   - a background thread reads the event-loop thread's stack every
+                   ``PROFILE_SAMPLE_INTERVAL`` seconds and counts identical stacks. The
+                   loop itself is never slowed down beyond the GIL hand-offs, so this is
+                   the mode for production load. The report is in the collapsed-stack
+                   format (``frame;frame;frame count``) that flamegraph.pl, speedscope
+                   and similar tools read.
+  * ``cprofile`` - deterministic ``cProfile`` on the event-loop thread; exact call
+                   counts, but every Python call gets slower while it runs. The report
+                   is pstats text sorted by cumulative time.
+
+Only one session runs at a time and none runs longer than ``PROFILE_MAX_SECONDS``.
+"""
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from config import Config
+
+MODES = ("sample", "cprofile")
+
+Stack = Tuple[str, ...]
+
+@dataclass
+class ProfileReport:
+    """Result of a session, ready to be sent as a document"""
+    filename: str
+    content: bytes
+    summary: str
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class StackSampler:
+    """Samples one thread's Python stack from a background thread"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: "Counter[Stack]" = Counter()
+        self.samples = 0
+        self._labels: Dict[object, str] = {}  # code object -> label, formatted once
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _sample(self) -> None:
+        frame = sys._current_frames().get(self.thread_id)
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = _frame_label(code)
+            stack.append(label)
+            frame = frame.f_back
+        if stack:
+            self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        """One ``frame;frame;frame count`` line per distinct stack"""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit: int = 10) -> str:
+        """Innermost frames by share of samples (self time)"""
+        leaves: "Counter[str]" = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack[-1]] += count
+        return "\n".join(f"{count * 100 / self.samples:5.1f}% {label}" for label, count in leaves.most_common(limit))
+
+class Profiler:
+    """Runs one profiling session at a time on the current event loop"""
+
+    def __init__(self, max_seconds: float = 120.0, sample_interval: float = 0.005):
+        self.max_seconds = max_seconds
+        self.sample_interval = sample_interval
+        self.running: Optional[str] = None
+        self.sessions = 0
+
+    def try_begin(self, mode: str) -> bool:
+        """Claim the session for ``mode`` without awaiting; False if one is already running"""
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of: {', '.join(MODES)}")
+        if self.running is not None:
+            return False
+        self.running = mode
+        return True
+
+    def end(self) -> None:
+        """Release the session claimed by ``try_begin``"""
+        self.running = None
+
+    async def profile(self, seconds: float, mode: str = "sample") -> ProfileReport:
+        """Profile the event loop for ``seconds`` (capped at ``max_seconds``)"""
+        running = self.running
+        if not self.try_begin(mode):
+            raise RuntimeError(f"a {running} session is already running")
+        try:
+            return await self.run(seconds, mode)
+        finally:
+            self.end()
+
+    async def run(self, seconds: float, mode: str) -> ProfileReport:
+        """The session itself; the caller has claimed it with ``try_begin``"""
+        seconds = min(max(seconds, 1.0), self.max_seconds)
+        if mode == "cprofile":
+            report = await self._cprofile(seconds)
+        else:
+            report = await self._sample(seconds)
+        self.sessions += 1
+        return report
+
+    async def _sample(self, seconds: float) -> ProfileReport:
+        sampler = StackSampler(threading.get_ident(), self.sample_interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            await asyncio.to_thread(sampler.stop)
+        elapsed = time.perf_counter() - started
+        content = await asyncio.to_thread(sampler.collapsed)
+        top = sampler.top_functions() if sampler.samples else "no samples"
+        summary = (f"{sampler.samples} samples in {elapsed:.1f}s, "
+                   f"{len(sampler.stacks)} distinct stacks\n{top}")
+        return ProfileReport(f"profile-{time.strftime('%Y%m%d-%H%M%S')}.folded", content.encode("utf-8"), summary)
+
+    async def _cprofile(self, seconds: float) -> ProfileReport:
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        # Profiles this thread, i.e. every callback the event loop runs meanwhile
+        profile.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profile.disable()
+        elapsed = time.perf_counter() - started
+
+        def render() -> Tuple[str, int]:
+            out = io.StringIO()
+            stats = pstats.Stats(profile, stream=out)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(80)
+            stats.sort_stats(pstats.SortKey.TIME).print_stats(30)
+            return out.getvalue(), stats.total_calls
+
+        content, calls = await asyncio.to_thread(render)
+        summary = f"{calls} calls profiled in {elapsed:.1f}s"
+        return ProfileReport(f"profile-{time.strftime('%Y%m%d-%H%M%S')}.pstats.txt", content.encode("utf-8"), summary)
+
+    def get_metrics(self) -> Dict[str, object]:
+        return {"running": self.running, "sessions": self.sessions, "max_seconds": self.max_seconds}
+
+# Global profiler instance
+profiler = Profiler(Config.PROFILE_MAX_SECONDS, Config.PROFILE_SAMPLE_INTERVAL)
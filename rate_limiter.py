@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Priority-aware outbound rate limiting for Telegram Bot API calls
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import timedelta
+from enum import IntEnum
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Union
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+class Priority(IntEnum):
+    """Outbound request priority (lower is served first)"""
+    INTERACTIVE = 0  # Direct replies to something the user just did
+    NORMAL = 1
+    BULK = 2  # Broadcasts and other background sends
+
+# Calls that are answered immediately: not chat messages, or must not be delayed
+UNLIMITED_ENDPOINTS = frozenset({
+    "answerCallbackQuery", "answerInlineQuery", "sendChatAction",
+    "getMe", "getUpdates", "setWebhook", "deleteWebhook", "getWebhookInfo",
+})
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at ``rate`` tokens per second"""
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def available(self, now: float) -> bool:
+        """Whether a token can be taken right now"""
+        if now < self.blocked_until:
+            return False
+        self._refill(now)
+        return self.tokens >= 1.0
+
+    def take(self, now: float) -> None:
+        """Consume one token (call only after ``available``)"""
+        self._refill(now)
+        self.tokens -= 1.0
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token will be available"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self._refill(now)
+        return 0.0 if self.tokens >= 1.0 else (1.0 - self.tokens) / self.rate
+
+    def block(self, now: float, seconds: float) -> None:
+        """Stop handing out tokens for ``seconds`` (RetryAfter from Telegram)"""
+        self.blocked_until = max(self.blocked_until, now + seconds)
+        self.tokens = 0.0
+        self.updated = self.blocked_until
+
+    @property
+    def idle(self) -> bool:
+        return self.tokens >= self.capacity
+
+    @classmethod
+    def for_window(cls, limit: float, period: float, now: float) -> "TokenBucket":
+        """Bucket that never lets more than ``limit`` requests through in any ``period`` seconds"""
+        # One token of burst plus (limit - 1) refilled per period fits any sliding window
+        return cls(max(limit - 1, 1) / period, 1.0, now)
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    sequence: int
+    chat_id: Optional[Union[int, str]] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+
+class PriorityRateLimiter(BaseRateLimiter[int]):
+    """Throttles sends with a global and per-chat token buckets, serving higher priority first.
+
+    Pass ``rate_limit_args=Priority.BULK`` to a bot method to mark background sends;
+    everything else is treated as ``Priority.INTERACTIVE``. A ``RetryAfter`` from Telegram
+    blocks the affected chat (or everything, for calls without a chat) and the request
+    is retried up to ``max_retries`` times.
+    """
+
+    def __init__(self, global_rate: float = 30.0, chat_rate: float = 1.0, chat_burst: float = 3.0,
+                 group_per_minute: float = 20.0, max_retries: int = 3, max_tracked_chats: int = 10000):
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_per_minute = group_per_minute
+        self.max_retries = max_retries
+        self.max_tracked_chats = max_tracked_chats
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._global: Optional[TokenBucket] = None
+        self._chats: "OrderedDict[Union[int, str], TokenBucket]" = OrderedDict()
+        self._waiters: List[_Waiter] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._metrics: Dict[str, Any] = self._empty_metrics()
+
+    @staticmethod
+    def _empty_metrics() -> Dict[str, Any]:
+        return {
+            "requests": 0,
+            "unlimited": 0,
+            "sent_immediately": 0,
+            "queued": 0,
+            "retry_after": 0,
+            "retries_exhausted": 0,
+            "wait_seconds_total": {priority.name: 0.0 for priority in Priority},
+            "wait_seconds_max": {priority.name: 0.0 for priority in Priority},
+            "dequeued": {priority.name: 0 for priority in Priority},
+        }
+
+    async def initialize(self) -> None:
+        """Create the global bucket on the running loop and export this limiter's metrics"""
+        self._global = TokenBucket.for_window(self.global_rate, 1.0, asyncio.get_running_loop().time())
+        self._register_metrics()
+
+    def _register_metrics(self) -> None:
+        def per_priority(key: str):
+            return lambda: {(name,): value for name, value in self.get_metrics()[key].items()}
+
+        registry = metrics.registry
+        registry.gauge_callback("bot_rate_limit_queue_depth", "Outbound requests waiting for a send slot",
+                                per_priority("queue_depth"), ("priority",))
+        registry.gauge_callback("bot_rate_limit_dequeued", "Outbound requests that had to wait for a send slot",
+                                per_priority("dequeued"), ("priority",))
+        registry.gauge_callback("bot_rate_limit_waited_seconds", "Total time outbound requests waited for a send slot",
+                                per_priority("wait_seconds_total"), ("priority",))
+        registry.gauge_callback("bot_rate_limit_wait_seconds_max", "Longest wait of an outbound request",
+                                per_priority("wait_seconds_max"), ("priority",))
+        registry.gauge_callback("bot_rate_limit_retry_after", "RetryAfter responses from Telegram",
+                                lambda: self._metrics["retry_after"])
+
+    async def shutdown(self) -> None:
+        """Cancel the dispatch timer and release anything still waiting"""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        for waiter in self._waiters:
+            if not waiter.future.done():
+                waiter.future.cancel()
+        self._waiters.clear()
+
+    def _loop_time(self) -> float:
+        return asyncio.get_running_loop().time()
+
+    def _chat_bucket(self, chat_id: Union[int, str], now: float) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # Negative IDs and @usernames are groups/channels with the stricter limit
+            if isinstance(chat_id, str) or chat_id < 0:
+                bucket = TokenBucket.for_window(self.group_per_minute, 60.0, now)
+            else:
+                bucket = TokenBucket(self.chat_rate, self.chat_burst, now)
+            self._chats[chat_id] = bucket
+            if len(self._chats) > self.max_tracked_chats:
+                self._evict_idle_chats(now)
+        else:
+            self._chats.move_to_end(chat_id)
+        return bucket
+
+    def _evict_idle_chats(self, now: float) -> None:
+        """Forget least recently used chats whose buckets are full again"""
+        for chat_id in list(self._chats)[: len(self._chats) - self.max_tracked_chats]:
+            bucket = self._chats[chat_id]
+            bucket.available(now)
+            if bucket.idle:
+                del self._chats[chat_id]
+
+    def _global_bucket(self) -> TokenBucket:
+        if self._global is None:
+            self._global = TokenBucket.for_window(self.global_rate, 1.0, self._loop_time())
+        return self._global
+
+    def _try_send_now(self, chat_id: Optional[Union[int, str]], now: float) -> bool:
+        global_bucket = self._global_bucket()
+        if not global_bucket.available(now):
+            return False
+        if chat_id is not None:
+            chat_bucket = self._chat_bucket(chat_id, now)
+            if not chat_bucket.available(now):
+                return False
+            chat_bucket.take(now)
+        global_bucket.take(now)
+        return True
+
+    def _schedule(self, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+        when = loop.time() + max(0.0, delay)
+        if self._timer is not None:
+            if self._timer.when() <= when:
+                return
+            self._timer.cancel()
+        self._timer = loop.call_at(when, self._dispatch)
+
+    def _dispatch(self) -> None:
+        """Release waiters in priority order, skipping chats that are still throttled"""
+        self._timer = None
+        now = self._loop_time()
+        global_bucket = self._global_bucket()
+        throttled: List[_Waiter] = []
+        next_wake = float("inf")
+
+        while self._waiters:
+            if not global_bucket.available(now):
+                next_wake = min(next_wake, global_bucket.wait_time(now))
+                break
+            waiter = heapq.heappop(self._waiters)
+            if waiter.future.done():
+                continue  # Cancelled while waiting
+            if not self._try_send_now(waiter.chat_id, now):
+                throttled.append(waiter)
+                next_wake = min(next_wake, self._chat_bucket(waiter.chat_id, now).wait_time(now))
+                continue
+            self._record_wait(waiter, now)
+            waiter.future.set_result(None)
+
+        for waiter in throttled:
+            heapq.heappush(self._waiters, waiter)
+        if self._waiters:
+            self._schedule(next_wake if next_wake != float("inf") else 0.05)
+
+    def _record_wait(self, waiter: _Waiter, now: float) -> None:
+        name = Priority(waiter.priority).name
+        waited = now - waiter.enqueued_at
+        self._metrics["dequeued"][name] += 1
+        self._metrics["wait_seconds_total"][name] += waited
+        self._metrics["wait_seconds_max"][name] = max(self._metrics["wait_seconds_max"][name], waited)
+
+    async def _acquire(self, chat_id: Optional[Union[int, str]], priority: int) -> None:
+        now = self._loop_time()
+        if not self._waiters and self._try_send_now(chat_id, now):
+            self._metrics["sent_immediately"] += 1
+            return
+
+        self._metrics["queued"] += 1
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, _Waiter(priority, next(self._sequence), chat_id, future, now))
+        self._schedule(0.0)
+        await future
+
+    @staticmethod
+    def _retry_seconds(error: RetryAfter) -> float:
+        retry_after = error.retry_after
+        if isinstance(retry_after, timedelta):
+            return retry_after.total_seconds()
+        return float(retry_after)
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, Union[bool, Dict[str, Any], List[Dict[str, Any]]]]],
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: Optional[int],
+    ) -> Union[bool, Dict[str, Any], List[Dict[str, Any]]]:
+        """Wait for a send slot, then make the request, retrying on RetryAfter"""
+        self._metrics["requests"] += 1
+        if endpoint in UNLIMITED_ENDPOINTS:
+            self._metrics["unlimited"] += 1
+            return await callback(*args, **kwargs)
+
+        chat_id = data.get("chat_id")
+        try:
+            chat_id = int(chat_id) if chat_id is not None else None
+        except (TypeError, ValueError):
+            pass  # @channelusername
+        priority = int(rate_limit_args) if rate_limit_args is not None else Priority.INTERACTIVE
+
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(chat_id, priority)
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                self._metrics["retry_after"] += 1
+                if attempt == self.max_retries:
+                    self._metrics["retries_exhausted"] += 1
+                    self.logger.error(f"{endpoint} still rate limited after {self.max_retries} retries")
+                    raise
+                seconds = self._retry_seconds(e) + 0.1
+                now = self._loop_time()
+                if chat_id is not None:
+                    self._chat_bucket(chat_id, now).block(now, seconds)
+                else:
+                    self._global_bucket().block(now, seconds)
+                self.logger.warning(f"Telegram asked to retry {endpoint} for chat {chat_id} after {seconds:.1f}s")
+        raise RuntimeError("unreachable")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth per priority, wait times and RetryAfter counters"""
+        depth = {priority.name: 0 for priority in Priority}
+        for waiter in self._waiters:
+            if not waiter.future.done():
+                depth[Priority(waiter.priority).name] += 1
+        metrics = dict(self._metrics)
+        metrics["queue_depth"] = depth
+        metrics["tracked_chats"] = len(self._chats)
+        return metrics
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Static screens and keyboards rendered once per supported language.
+
+Menus, help/info/contact pages and the language picker never change between requests,
+so their text and InlineKeyboardMarkup are built for every language up front and served
+from a read-only table. Per-user values (e.g. the user's name in the welcome message) are
+kept as slots of a pre-split template and filled in by ``Screen.render``.
+"""
+import logging
+import re
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.constants import ParseMode
+
+from config import Config
+from constants import BotConstants, TranslationKeys
+from localization import translate
+from message_cache import EditFingerprintCache
+
+logger = logging.getLogger(__name__)
+
+LANGUAGE_NAMES = {"uk": "Українська", "en": "English", "pl": "Polski"}
+LANGUAGE_FLAGS = {"uk": "🇺🇦", "en": "🇬🇧", "pl": "🇵🇱"}
+
+# Marks a per-user slot while the static part of a template is formatted
+_SLOT = "\x00{}\x00"
+_SLOT_RE = re.compile("\x00(\\w+)\x00")
+
+@dataclass(frozen=True)
+class Screen:
+    """Text and keyboard of one screen in one language"""
+    text: str
+    reply_markup: Optional[InlineKeyboardMarkup]
+    parse_mode: Optional[str]
+    markup_fingerprint: str
+    # Literal text and slot names alternating, empty for fully static screens
+    parts: Tuple[str, ...] = ()
+
+    def render(self, **values: str) -> str:
+        """Text with the per-user slots filled in"""
+        if not self.parts:
+            return self.text
+        return "".join(part if i % 2 == 0 else str(values[part]) for i, part in enumerate(self.parts))
+
+@dataclass(frozen=True)
+class ScreenSpec:
+    """How to build a screen: translated text, static format values, per-user slots"""
+    text_key: str
+    keyboard: Optional[str] = None
+    parse_mode: Optional[str] = ParseMode.MARKDOWN
+    values: Callable[[str], Dict[str, str]] = lambda lang: {}
+    slots: Tuple[str, ...] = ()
+
+def _button(key: str, lang: str, data: str) -> InlineKeyboardButton:
+    return InlineKeyboardButton(translate(key, lang), callback_data=data)
+
+KEYBOARDS: Dict[str, Callable[[str], List[List[InlineKeyboardButton]]]] = {
+    "main_menu": lambda lang: [
+        [_button(TranslationKeys.STATISTICS, lang, 'stats'), _button(TranslationKeys.SETTINGS, lang, 'settings')],
+        [_button(TranslationKeys.JOKE, lang, 'joke'), _button(TranslationKeys.ABOUT, lang, 'info')],
+        [_button(TranslationKeys.HELP, lang, 'help')],
+    ],
+    "back_to_menu": lambda lang: [[_button(TranslationKeys.BACK_TO_MENU, lang, 'menu')]],
+    "settings": lambda lang: [
+        [_button(TranslationKeys.CHANGE_LANGUAGE, lang, 'change_language')],
+        [_button(TranslationKeys.BACK_TO_MENU, lang, 'menu')],
+    ],
+    "language_picker": lambda lang: [
+        [InlineKeyboardButton(f"{LANGUAGE_FLAGS[code]} {LANGUAGE_NAMES[code]}", callback_data=f'lang_{code}')]
+        for code in BotConstants.SUPPORTED_LANGUAGES
+    ],
+    "echo": lambda lang: [
+        [_button(TranslationKeys.CREATE_JOKE, lang, 'joke'), _button(TranslationKeys.MENU, lang, 'menu')],
+    ],
+    # Joke from free text input: another prompt, retry the same input, menu
+    "joke_result": lambda lang: [
+        [_button(TranslationKeys.ANOTHER_JOKE, lang, 'another_joke'), _button(TranslationKeys.TRY_AGAIN, lang, 'retry_joke')],
+        [_button(TranslationKeys.MENU, lang, 'menu')],
+    ],
+    "joke_retry_error": lambda lang: [
+        [_button(TranslationKeys.TRY_AGAIN, lang, 'retry_joke'), _button(TranslationKeys.MENU, lang, 'menu')],
+    ],
+    # Joke from /joke and the Joke button
+    "joke_command_result": lambda lang: [
+        [_button(TranslationKeys.ANOTHER_JOKE, lang, 'joke'), _button(TranslationKeys.MENU, lang, 'menu')],
+    ],
+    "joke_error": lambda lang: [
+        [_button(TranslationKeys.TRY_AGAIN, lang, 'joke'), _button(TranslationKeys.MENU, lang, 'menu')],
+    ],
+    "stats": lambda lang: [
+        [_button(TranslationKeys.REFRESH, lang, 'stats'), _button(TranslationKeys.MENU, lang, 'menu')],
+    ],
+    "admin": lambda lang: [
+        [_button(TranslationKeys.REFRESH, lang, 'admin'), _button(TranslationKeys.STATISTICS, lang, 'stats')],
+        [_button(TranslationKeys.MENU, lang, 'menu')],
+    ],
+}
+
+def _bot_info(lang: str) -> Dict[str, str]:
+    return {"bot_name": Config.BOT_NAME, "bot_version": Config.BOT_VERSION, "developer": Config.BOT_DEVELOPER}
+
+def _contact(lang: str) -> Dict[str, str]:
+    return {"developer": Config.BOT_DEVELOPER, "email": Config.BOT_EMAIL, "github": Config.BOT_GITHUB}
+
+def _language(lang: str) -> Dict[str, str]:
+    return {"language": LANGUAGE_NAMES.get(lang, lang)}
+
+SCREENS: Dict[str, ScreenSpec] = {
+    "main_menu": ScreenSpec(TranslationKeys.MAIN_MENU, "main_menu"),
+    "welcome": ScreenSpec(TranslationKeys.WELCOME, "main_menu",
+                          values=lambda lang: {"bot_name": Config.BOT_NAME}, slots=("user_name",)),
+    "help": ScreenSpec(TranslationKeys.HELP_COMMANDS, "back_to_menu"),
+    "help_command": ScreenSpec(TranslationKeys.HELP_COMMANDS, "main_menu"),
+    "info": ScreenSpec(TranslationKeys.BOT_INFO, "back_to_menu", values=_bot_info),
+    "info_command": ScreenSpec(TranslationKeys.BOT_INFO, "main_menu", values=_bot_info),
+    "contact": ScreenSpec(TranslationKeys.CONTACT, "back_to_menu", values=_contact),
+    "settings": ScreenSpec(TranslationKeys.SETTINGS_MENU, "settings", values=_language),
+    "language_picker": ScreenSpec(TranslationKeys.PLEASE_SELECT_LANGUAGE, "language_picker", parse_mode=None),
+    "joke_prompt": ScreenSpec(TranslationKeys.JOKE_GENERATOR_PROMPT, "back_to_menu"),
+    "language_changed": ScreenSpec(TranslationKeys.LANGUAGE_CHANGED, parse_mode=None, values=_language),
+}
+
+def _build_screen(spec: ScreenSpec, lang: str, keyboards: Mapping[str, InlineKeyboardMarkup]) -> Screen:
+    template = translate(spec.text_key, lang)
+    reply_markup = keyboards[spec.keyboard] if spec.keyboard else None
+    markup_fingerprint = EditFingerprintCache.markup_fingerprint(reply_markup)
+
+    values = spec.values(lang)
+    if not values and not spec.slots:
+        # Not a format string; leave braces alone
+        return Screen(template, reply_markup, spec.parse_mode, markup_fingerprint)
+
+    text = template.format(**values, **{slot: _SLOT.format(slot) for slot in spec.slots})
+    parts = tuple(_SLOT_RE.split(text)) if spec.slots else ()
+    if parts:
+        # Readable form with the slots left as {name}
+        text = "".join(part if i % 2 == 0 else "{" + part + "}" for i, part in enumerate(parts))
+    return Screen(text, reply_markup, spec.parse_mode, markup_fingerprint, parts)
+
+class ScreenCache:
+    """Read-only per-language table of screens and keyboards, rebuilt as a whole"""
+
+    def __init__(self, screens: Dict[str, ScreenSpec], keyboards: Dict[str, Callable[[str], list]]):
+        self.screens = screens
+        self.keyboards = keyboards
+        self._screens: Optional[Mapping[Tuple[str, str], Screen]] = None
+        self._keyboards: Mapping[Tuple[str, str], InlineKeyboardMarkup] = MappingProxyType({})
+        self.builds = 0
+        self.last_build_seconds = 0.0
+
+    def build(self) -> Mapping[Tuple[str, str], Screen]:
+        """Render everything for every supported language, then swap the tables in"""
+        started = time.perf_counter()
+        keyboards: Dict[Tuple[str, str], InlineKeyboardMarkup] = {}
+        screens: Dict[Tuple[str, str], Screen] = {}
+        for lang in BotConstants.SUPPORTED_LANGUAGES:
+            markups = {name: InlineKeyboardMarkup(build(lang)) for name, build in self.keyboards.items()}
+            keyboards.update({(name, lang): markup for name, markup in markups.items()})
+            for name, spec in self.screens.items():
+                screens[(name, lang)] = _build_screen(spec, lang, markups)
+
+        self._keyboards = MappingProxyType(keyboards)
+        self._screens = MappingProxyType(screens)
+        self.builds += 1
+        self.last_build_seconds = time.perf_counter() - started
+        logger.debug(f"Built {len(screens)} screens and {len(keyboards)} keyboards in {self.last_build_seconds * 1000:.1f} ms")
+        return self._screens
+
+    def _table(self) -> Mapping[Tuple[str, str], Screen]:
+        return self._screens if self._screens is not None else self.build()
+
+    def get(self, name: str, lang: str) -> Screen:
+        """Screen in the given language, or in the default language if unsupported"""
+        table = self._table()
+        screen = table.get((name, lang))
+        return screen if screen is not None else table[(name, BotConstants.DEFAULT_LANG)]
+
+    def keyboard(self, name: str, lang: str) -> InlineKeyboardMarkup:
+        """Keyboard in the given language, or in the default language if unsupported"""
+        self._table()
+        markup = self._keyboards.get((name, lang))
+        return markup if markup is not None else self._keyboards[(name, BotConstants.DEFAULT_LANG)]
+
+    def invalidate(self) -> None:
+        """Drop the rendered tables; the next lookup rebuilds them"""
+        self._screens = None
+
+    def get_metrics(self) -> Dict[str, float]:
+        return {
+            "screens": len(self._screens or {}),
+            "keyboards": len(self._keyboards),
+            "builds": self.builds,
+            "last_build_seconds": round(self.last_build_seconds, 6),
+        }
+
+# Global screen cache instance
+screen_cache = ScreenCache(SCREENS, KEYBOARDS)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+JSON encoding and decoding with an optional fast backend.
+
+``orjson`` is used when it is installed - it encodes and decodes several times faster
+than the standard library and serializes dataclasses natively - otherwise ``json``.
+``JSON_BACKEND`` forces one of them. Both produce the same JSON: UTF-8 bytes, non-ASCII
+characters kept as is, dictionary keys that are not strings written as strings, and
+dataclasses as objects. ``pretty`` output is indented by two spaces, the default is
+compact (no whitespace), which is what the bot writes in production.
+"""
+import dataclasses
+import json
+import logging
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+def _to_json(value: Any) -> Any:
+    """``default`` hook of the stdlib encoder: dataclasses without ``asdict``'s deep copy"""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        try:
+            return vars(value)
+        except TypeError:  # __slots__ dataclass
+            return dataclasses.asdict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class JsonSerializer:
+    """Standard library backend"""
+    name = "json"
+
+    def dumps(self, value: Any, pretty: bool = False) -> bytes:
+        if pretty:
+            text = json.dumps(value, ensure_ascii=False, indent=2, default=_to_json)
+        else:
+            text = json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_to_json)
+        return text.encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+class OrjsonSerializer:
+    """``orjson`` backend"""
+    name = "orjson"
+
+    def dumps(self, value: Any, pretty: bool = False) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(value, option=option)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+Serializer = Union[JsonSerializer, OrjsonSerializer]
+
+def get_serializer(backend: str = "auto") -> Serializer:
+    """The requested backend; ``auto`` (or ``orjson`` when it is not installed) falls back to ``json``"""
+    if backend in ("auto", "orjson") and orjson is not None:
+        return OrjsonSerializer()
+    if backend == "orjson":
+        logger.warning("JSON_BACKEND=orjson but orjson is not installed, using json")
+    return JsonSerializer()
+
+# Global serializer instance
+serializer = get_serializer(Config.JSON_BACKEND)
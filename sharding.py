@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Multi-process update processing sharded by user ID for Telegram Bot
+"""
+import asyncio
+import contextlib
+import importlib
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.managers import BaseManager
+from typing import Any, Dict, List, Optional, Tuple
+
+from telegram import Bot, Update
+from telegram.ext import Updater
+
+from config import Config
+from constants import ServerConstants
+from http_server import HTTPServer
+import health
+import metrics
+from telegram_transport import build_transports
+from webhook import WebhookIngress, register_webhook
+
+logger = logging.getLogger(__name__)
+
+# StatsManager methods the handlers call; everything else stays inside the stats process
+STATS_METHODS = (
+    "track_user", "track_command", "set_user_language", "get_user_language",
+    "get_user_stats", "get_all_users", "get_bot_stats", "get_stats_summary", "get_users_list",
+)
+# Writes the workers send without waiting for them
+STATS_WRITES = ("track_user", "track_command", "set_user_language")
+
+class SharedStats:
+    """The stats process's StatsManager, called from one server thread per worker connection.
+
+    Every call holds one lock, so a save never iterates ``users`` while another worker's
+    call changes it. Changes do not save by themselves: a writer thread saves at most once
+    per ``save_interval``, with everything that changed meanwhile.
+    """
+
+    def __init__(self, manager, save_interval: float = ServerConstants.STATS_SAVE_INTERVAL):
+        self._manager = manager
+        self._lock = threading.Lock()
+        self._dirty = threading.Event()
+        self.save_interval = save_interval
+        manager.on_change = self._dirty.set
+        threading.Thread(target=self._write_loop, name="stats-writer", daemon=True).start()
+
+    def _write_loop(self) -> None:
+        while True:
+            self._dirty.wait()
+            time.sleep(self.save_interval)
+            self.flush()
+
+    def flush(self) -> None:
+        """Save now (the supervisor calls it before stopping the stats process)"""
+        with self._lock:
+            self._dirty.clear()
+            self._manager._save_data()
+
+def _locked(name: str):
+    def call(self, *args, **kwargs):
+        with self._lock:
+            return getattr(self._manager, name)(*args, **kwargs)
+    call.__name__ = name
+    return call
+
+for _name in STATS_METHODS:
+    setattr(SharedStats, _name, _locked(_name))
+
+_shared_stats: Optional[SharedStats] = None
+
+def _start_stats_process() -> None:
+    """Stats process initializer: load the files before any worker connects"""
+    global _shared_stats
+    from stats import stats_manager
+    stats_manager.load()
+    _shared_stats = SharedStats(stats_manager)
+
+def _owned_stats_manager() -> SharedStats:
+    """The one StatsManager that reads and writes the statistics files"""
+    return _shared_stats
+
+class StatsServer(BaseManager):
+    """Serves the shared StatsManager to worker processes"""
+
+StatsServer.register("stats_manager", callable=_owned_stats_manager, exposed=STATS_METHODS + ("flush",))
+
+class StatsClient(BaseManager):
+    """Worker-side connection to ``StatsServer``"""
+
+StatsClient.register("stats_manager", exposed=STATS_METHODS + ("flush",))
+
+class WorkerStats:
+    """What a worker's handlers see as ``stats_manager``.
+
+    Writes are sent to the stats process by one background thread, in order, so a
+    handler never waits for IPC. The worker owns its users, so their languages are
+    cached here: only the first lookup of a user is a round trip. The admin queries
+    (summary, user list) go to the stats process directly.
+    """
+
+    def __init__(self, proxy):
+        self._proxy = proxy
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stats-client")
+        self._languages: Dict[int, str] = {}
+
+    def _send(self, method: str, *args) -> None:
+        self._writer.submit(self._call, method, *args)
+
+    def _call(self, method: str, *args) -> None:
+        try:
+            getattr(self._proxy, method)(*args)
+        except Exception as e:
+            logger.error(f"Stats {method} failed: {e}")
+
+    def track_user(self, user_info) -> None:
+        self._send("track_user", user_info)
+
+    def track_command(self, user_id: int, command: str) -> None:
+        self._send("track_command", user_id, command)
+
+    def set_user_language(self, user_id: int, language: str) -> None:
+        self._languages[user_id] = language
+        self._send("set_user_language", user_id, language)
+
+    def get_user_language(self, user_id: int) -> str:
+        language = self._languages.get(user_id)
+        if language is None:
+            language = self._languages[user_id] = self._proxy.get_user_language(user_id)
+        return language
+
+    def __getattr__(self, name: str):
+        return getattr(self._proxy, name)
+
+    def close(self) -> None:
+        """Wait until the queued writes have reached the stats process"""
+        self._writer.shutdown(wait=True)
+
+def shard_key(data: Dict[str, Any]) -> Optional[int]:
+    """User (or, failing that, chat) ID of a raw update"""
+    for field, payload in data.items():
+        if field == "update_id" or not isinstance(payload, dict):
+            continue
+        user = payload.get("from") or payload.get("user")
+        if isinstance(user, dict) and "id" in user:
+            return int(user["id"])
+        chat = payload.get("chat") or payload.get("message", {}).get("chat")
+        if isinstance(chat, dict) and "id" in chat:
+            return int(chat["id"])
+    return None
+
+def _load_factory(path: str):
+    """Resolve ``module:function``"""
+    module_name, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+def _worker_main(index: int, workers: int, updates: multiprocessing.Queue, stats_address: Tuple[str, int],
+                 authkey: bytes, factory_path: str) -> None:
+    """Process entry point: bind to the shared stats, build the application and serve the shard"""
+    # The supervisor decides when workers stop; Ctrl+C reaches the whole process group
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Each worker owns its shard's conversation state
+    Config.STATE_PATH = f"{Config.STATE_PATH}.{index}"
+    # ... and serves its own /metrics; the supervisor may hold HTTP_PORT
+    Config.METRICS_PORT += 1 + index
+    # Telegram's overall limit is per bot, not per process
+    Config.RATE_LIMIT_GLOBAL_PER_SECOND /= workers
+
+    client = StatsClient(address=stats_address, authkey=authkey)
+    client.connect()
+    import stats
+    # The child has already re-imported the parent's main module (and with it the handlers),
+    # so this only works because handlers and utils look ``stats.stats_manager`` up per call
+    stats.stats_manager = WorkerStats(client.stats_manager())
+
+    application = _load_factory(factory_path)()
+    try:
+        asyncio.run(_serve_shard(index, updates, application))
+    finally:
+        stats.stats_manager.close()
+
+async def _serve_shard(index: int, updates: multiprocessing.Queue, application) -> None:
+    """Feed updates from the supervisor into the application until the stop sentinel"""
+    loop = asyncio.get_running_loop()
+    async with application:
+        if application.post_init:
+            await application.post_init(application)
+        await application.start()
+        logger.info(f"Worker {index} (pid {os.getpid()}) ready")
+        try:
+            while True:
+                data = await loop.run_in_executor(None, updates.get)
+                if data is None:
+                    break
+                application.update_queue.put_nowait(Update.de_json(data, application.bot))
+        finally:
+            # Finishes queued updates and background tasks such as joke delivery
+            await application.stop()
+            if application.post_stop:
+                await application.post_stop(application)
+    if application.post_shutdown:
+        await application.post_shutdown(application)
+    logger.info(f"Worker {index} stopped")
+
+class ShardSupervisor:
+    """Starts N worker processes, routes each user's updates to one of them and keeps them alive.
+
+    Every worker owns a queue that outlives the process, so updates that arrive while a
+    worker restarts wait for its replacement instead of being lost or reordered.
+    """
+
+    def __init__(self, workers: int, factory_path: str = "main:build_application",
+                 stop_timeout: Optional[float] = None):
+        if workers < 1:
+            raise ValueError("workers must be a positive integer")
+        self.workers = workers
+        self.factory_path = factory_path
+        self.stop_timeout = stop_timeout if stop_timeout is not None else Config.WORKER_STOP_TIMEOUT
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._context = multiprocessing.get_context("spawn")
+        self._authkey = os.urandom(32)
+        self._stats_server: Optional[StatsServer] = None
+        self._queues: List[multiprocessing.Queue] = []
+        self._processes: List[Optional[multiprocessing.Process]] = []
+        self._restarting: set = set()
+        self._monitor_task: Optional[asyncio.Task] = None
+        self.dispatched = [0] * workers
+        self.restarts = [0] * workers
+
+    def shard_for(self, data: Dict[str, Any]) -> int:
+        key = shard_key(data)
+        return (key if key is not None else data.get("update_id", 0)) % self.workers
+
+    def _spawn(self, index: int) -> None:
+        process = self._context.Process(
+            target=_worker_main,
+            args=(index, self.workers, self._queues[index], self._stats_server.address, self._authkey, self.factory_path),
+            name=f"bot-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        self._processes[index] = process
+
+    async def start(self) -> None:
+        """Start the stats server and all workers"""
+        self._stats_server = StatsServer(address=("127.0.0.1", 0), authkey=self._authkey, ctx=self._context)
+        self._stats_server.start(_start_stats_process)
+        self._queues = [self._context.Queue() for _ in range(self.workers)]
+        self._processes = [None] * self.workers
+        for index in range(self.workers):
+            self._spawn(index)
+        self._monitor_task = asyncio.create_task(self._monitor())
+        self.logger.info(f"Started {self.workers} workers")
+
+    def dispatch(self, data: Dict[str, Any]) -> None:
+        """Queue a raw update for the worker that owns its user"""
+        index = self.shard_for(data)
+        self._queues[index].put(data)
+        self.dispatched[index] += 1
+
+    async def _join(self, index: int, timeout: float) -> bool:
+        process = self._processes[index]
+        await asyncio.get_running_loop().run_in_executor(None, process.join, timeout)
+        if process.is_alive():
+            self.logger.warning(f"Worker {index} did not stop within {timeout}s, terminating")
+            process.terminate()
+            await asyncio.get_running_loop().run_in_executor(None, process.join, 5)
+            return False
+        return True
+
+    async def restart_worker(self, index: int) -> None:
+        """Let a worker finish what it has queued so far, then replace it"""
+        self._restarting.add(index)
+        try:
+            self._queues[index].put(None)
+            await self._join(index, self.stop_timeout)
+            self._spawn(index)
+            self.restarts[index] += 1
+            self.logger.info(f"Worker {index} restarted (pid {self._processes[index].pid})")
+        finally:
+            self._restarting.discard(index)
+
+    async def rolling_restart(self) -> None:
+        """Restart workers one at a time, e.g. to pick up new code"""
+        for index in range(self.workers):
+            await self.restart_worker(index)
+
+    async def _monitor(self) -> None:
+        """Replace workers that died unexpectedly"""
+        while True:
+            await asyncio.sleep(1.0)
+            for index, process in enumerate(self._processes):
+                if index in self._restarting or process is None or process.is_alive():
+                    continue
+                self.logger.error(f"Worker {index} exited with code {process.exitcode}, restarting")
+                self._spawn(index)
+                self.restarts[index] += 1
+
+    async def stop(self) -> None:
+        """Drain and stop every worker, then the stats server"""
+        if self._monitor_task:
+            self._monitor_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._monitor_task
+        for queue in self._queues:
+            queue.put(None)
+        await asyncio.gather(*(self._join(index, self.stop_timeout) for index in range(self.workers)))
+        if self._stats_server:
+            self._stats_server.stats_manager().flush()
+            self._stats_server.shutdown()
+        self.logger.info("All workers stopped")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Per-worker dispatch and restart counters"""
+        return {
+            "workers": self.workers,
+            "alive": sum(1 for process in self._processes if process and process.is_alive()),
+            "dispatched": list(self.dispatched),
+            "restarts": list(self.restarts),
+        }
+
+async def _poll_into(supervisor: ShardSupervisor, bot: Bot, stop_event: asyncio.Event) -> None:
+    """Long-poll Telegram and forward raw updates to the workers"""
+    queue: asyncio.Queue = asyncio.Queue()
+    updater = Updater(bot=bot, update_queue=queue)
+    async with updater:
+        await updater.start_polling(allowed_updates=Update.ALL_TYPES)
+        getter = asyncio.ensure_future(queue.get())
+        stopper = asyncio.ensure_future(stop_event.wait())
+        try:
+            while True:
+                done, _ = await asyncio.wait({getter, stopper}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    supervisor.dispatch(getter.result().to_dict())
+                    getter = asyncio.ensure_future(queue.get())
+                if stopper in done:
+                    break
+        finally:
+            getter.cancel()
+            await updater.stop()
+
+async def serve_sharded(workers: int) -> None:
+    """Single ingress (polling or webhook) in front of ``workers`` processes until SIGINT/SIGTERM"""
+    stop_event = asyncio.Event()
+    supervisor = ShardSupervisor(workers)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        with contextlib.suppress(NotImplementedError):
+            loop.add_signal_handler(sig, stop_event.set)
+    with contextlib.suppress(NotImplementedError, AttributeError):
+        # kill -HUP <pid> restarts the workers one by one
+        loop.add_signal_handler(signal.SIGHUP, lambda: asyncio.ensure_future(supervisor.rolling_restart()))
+
+    bot_kwargs = {"base_url": Config.TELEGRAM_BASE_URL} if Config.TELEGRAM_BASE_URL else {}
+    request, get_updates_request = build_transports()
+    bot = Bot(Config.BOT_TOKEN, request=request, get_updates_request=get_updates_request, **bot_kwargs)
+    started = time.monotonic()
+    health.attach_supervisor(supervisor)
+    await supervisor.start()
+    try:
+        if Config.BOT_MODE == ServerConstants.BOT_MODE_WEBHOOK:
+            async def forward(data: Dict[str, Any]) -> None:
+                supervisor.dispatch(data)
+
+            server = HTTPServer(Config.HTTP_LISTEN, Config.HTTP_PORT)
+            server.add_route("POST", Config.WEBHOOK_PATH, WebhookIngress(forward, Config.WEBHOOK_SECRET_TOKEN).handle)
+            metrics.add_routes(server)
+            async with bot:
+                await server.start()
+                await register_webhook(bot)
+                try:
+                    await stop_event.wait()
+                finally:
+                    await server.stop()
+        else:
+            # No webhook server: /metrics, /healthz and /readyz of the ingress on METRICS_PORT
+            await metrics.start(Config.HTTP_LISTEN, Config.METRICS_PORT)
+            await _poll_into(supervisor, bot, stop_event)
+    finally:
+        await metrics.stop()
+        await supervisor.stop()
+        logger.info(f"Sharded bot ran for {time.monotonic() - started:.0f}s: {supervisor.get_metrics()}")
+
+def run_sharded(workers: int) -> None:
+    """Blocking entry point for multi-process mode"""
+    asyncio.run(serve_sharded(workers))
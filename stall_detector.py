@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Event-loop stall detector for Telegram Bot.
+
+Synchronous work on the event loop (statistics rewrites, catalog lookups, file
+logging) blocks every other update while it runs. The detector finds out which code
+does it: the loop lag monitor in ``metrics`` wakes up every quarter of
+``STALL_THRESHOLD`` seconds, and a watchdog thread checks that it did. Once the
+monitor is overdue by more than the threshold, the watchdog captures the loop
+thread's stack - the code that is blocking right now - and attributes it to the
+update (ID, user, command or callback data, correlation ID) and handler found among
+the frames. When the loop resumes, the stall's duration is known and it is counted
+per handler and code site.
+
+The newest stalls and the worst offenders are in ``/stalls`` (admins) and in
+``bot_event_loop_stalls_total`` / ``bot_event_loop_stall_seconds``.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import metrics
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+stall_count = metrics.registry.counter(
+    "bot_event_loop_stalls_total", "Event loop stalls longer than STALL_THRESHOLD by handler and code site",
+    ("handler", "site"))
+stall_duration = metrics.registry.histogram(
+    "bot_event_loop_stall_seconds", "Duration of event loop stalls", buckets=metrics.LAG_BUCKETS)
+
+@dataclass
+class Stall:
+    """One blocked stretch of the event loop"""
+    started_at: float  # Wall-clock time
+    deadline: float  # Monitor deadline the loop missed (``loop.time()``)
+    stack: str
+    site: str
+    handler: str
+    update: Dict[str, Any] = field(default_factory=dict)
+    correlation_id: Optional[str] = None
+    duration: float = 0.0  # Lower bound until the loop resumes
+    resumed: bool = False
+
+    def format(self) -> str:
+        header = " ".join(f"{key}={value}" for key, value in self.update.items())
+        state = "" if self.resumed else " (still blocked)"
+        lines = [f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started_at))} "
+                 f"{self.duration * 1000:.0f} ms{state} handler={self.handler} site={self.site}",
+                 f"  update: {header or '-'} correlation_id={self.correlation_id or '-'}",
+                 self.stack.rstrip()]
+        return "\n".join(lines)
+
+def _is_project_frame(filename: str) -> bool:
+    return filename.startswith(_PROJECT_DIR) and "site-packages" not in filename
+
+def _attribute(frame) -> Tuple[str, str, Dict[str, Any], Optional[str]]:
+    """Code site, handler, update attributes and correlation ID from a blocked stack"""
+    from base import BaseHandler
+    from telegram import Update
+    from tracing import Span, describe_update
+
+    site = handler = entry_point = None
+    update_attrs: Dict[str, Any] = {}
+    correlation = None
+    while frame is not None:
+        code = frame.f_code
+        if site is None and _is_project_frame(code.co_filename):
+            site = f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+        # Frame locals of a paused thread are read under the GIL; only look, never write
+        local_vars = frame.f_locals
+        owner = local_vars.get("self")
+        if handler is None and isinstance(owner, BaseHandler):
+            handler = f"{owner.handler_kind}:{owner.handler_name}"
+        if os.path.basename(os.path.dirname(code.co_filename)) == "handlers":
+            entry_point = code.co_name  # Outermost one wins: the function PTB called
+        if not update_attrs and isinstance(local_vars.get("update"), Update):
+            update_attrs = describe_update(local_vars["update"])
+        if correlation is None:
+            span = next((value for value in local_vars.values() if isinstance(value, Span)), None)
+            if span is not None:
+                correlation = span.trace.correlation_id
+        frame = frame.f_back
+    return site or "-", handler or entry_point or "-", update_attrs, correlation
+
+class StallDetector:
+    """Watchdog thread that catches the event loop blocked for more than ``threshold`` seconds"""
+
+    def __init__(self, monitor: metrics.LoopLagMonitor, threshold: float = 0.1, buffer_size: int = 20):
+        self.monitor = monitor
+        self.threshold = threshold
+        self.stalls: Deque[Stall] = deque(maxlen=buffer_size)
+        self.total = 0
+        # (handler, site) -> [count, total seconds, longest]
+        self.offenders: Dict[Tuple[str, str], List[float]] = {}
+        self._current: Optional[Stall] = None
+        self._loop_thread: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start watching the loop this is called from"""
+        if self._thread is not None:
+            return
+        # The monitor must wake up often enough to notice short stalls
+        self.monitor.interval = min(self.monitor.interval, self.threshold / 4)
+        self.monitor.start()
+        self._loop_thread = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stall-detector", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.monitor.interval):
+            try:
+                self._check()
+            except Exception:
+                logger.exception("Stall detector check failed")
+
+    def _check(self) -> None:
+        deadline = self.monitor.deadline
+        current = self._current
+        if current is not None:
+            if deadline == current.deadline:
+                current.duration = time.monotonic() - current.deadline
+                return
+            # The loop ran the monitor again: the stall is over and its lag is exact
+            current.duration = max(current.duration, self.monitor.last_lag)
+            self._finish(current)
+            self._current = None
+        if deadline is None or time.monotonic() - deadline <= self.threshold:
+            return
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return
+        stack = "".join(traceback.format_stack(frame))
+        site, handler, update_attrs, correlation = _attribute(frame)
+        self._current = Stall(time.time(), deadline, stack, site, handler, update_attrs, correlation,
+                              time.monotonic() - deadline)
+        self.stalls.append(self._current)
+        logger.warning(f"Event loop blocked for over {self.threshold:g}s in {site} "
+                       f"(handler {handler}, update {update_attrs.get('update_id', '-')})")
+
+    def _finish(self, stall: Stall) -> None:
+        stall.resumed = True
+        self.total += 1
+        entry = self.offenders.setdefault((stall.handler, stall.site), [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += stall.duration
+        entry[2] = max(entry[2], stall.duration)
+        stall_count.labels(stall.handler, stall.site).inc()
+        stall_duration.observe(stall.duration)
+
+    @property
+    def current_stall(self) -> Optional[Stall]:
+        """The stall in progress, if the loop is blocked right now"""
+        current = self._current
+        return current if current is not None and not current.resumed else None
+
+    def worst_offenders(self, limit: int = 10) -> List[Tuple[str, str, int, float, float]]:
+        """``(handler, site, stalls, total seconds, longest)`` by total blocked time"""
+        ranked = sorted(self.offenders.items(), key=lambda item: item[1][1], reverse=True)
+        return [(handler, site, int(count), total, longest)
+                for (handler, site), (count, total, longest) in ranked[:limit]]
+
+    def dump(self) -> str:
+        """Worst offenders, then the captured stacks of the newest stalls"""
+        lines = ["Worst offenders (total / count / longest):"]
+        for handler, site, count, total, longest in self.worst_offenders():
+            lines.append(f"  {total * 1000:8.0f} ms {count:5d}x {longest * 1000:6.0f} ms  {handler}  {site}")
+        lines.append("")
+        lines.extend(stall.format() + "\n" for stall in reversed(self.stalls))
+        return "\n".join(lines)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "running": self._thread is not None,
+            "stalls": self.total,
+            "buffered": len(self.stalls),
+            "threshold_seconds": self.threshold,
+        }
+
+# Global stall detector instance
+stall_detector = StallDetector(metrics.loop_lag_monitor, Config.STALL_THRESHOLD, Config.STALL_BUFFER_SIZE)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Startup phase timing for Telegram Bot.
+
+Nothing heavy happens at import time: configuration is validated, catalogs parsed and
+statistics read by ``main.build_application`` (and ``post_init``), each inside a
+``startup.phase(...)`` block. The durations are logged once the bot is up and exported
+as ``bot_startup_phase_seconds{phase}``.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+class StartupTimer:
+    """Durations of the named startup phases, in the order they ran"""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float) -> None:
+        # A phase that runs again (application rebuilt in the same process) adds up
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @property
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+    def report(self) -> None:
+        """Log the phases, slowest first"""
+        parts = ", ".join(f"{name} {seconds * 1000:.1f} ms"
+                          for name, seconds in sorted(self.phases.items(), key=lambda item: item[1], reverse=True))
+        logger.info(f"Started in {self.total * 1000:.1f} ms: {parts}")
+
+    def get_metrics(self) -> Dict[str, float]:
+        return {name: round(seconds, 6) for name, seconds in self.phases.items()}
+
+# Global startup timer instance
+startup = StartupTimer()
+metrics.registry.gauge_callback("bot_startup_phase_seconds", "Duration of each startup phase",
+                                lambda: {(name,): seconds for name, seconds in startup.phases.items()}, ("phase",))
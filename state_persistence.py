@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Restart-safe persistence for ``UserStateManager``.
+
+Handlers keep reading and writing the in-memory stores. Every change is recorded in a
+pending batch (later changes to the same key replace earlier ones) that a background
+task hands to the backend in a worker thread every ``STATE_FLUSH_INTERVAL`` seconds and
+once more on shutdown. On startup the backend's entries are loaded back, skipping those
+that expired while the bot was down.
+
+Backends:
+  * ``file``   - JSON snapshot plus an append-only journal of changes; the journal is
+                 folded into a new snapshot (written aside, then renamed) once it grows.
+  * ``sqlite`` - one row per entry, upserted in a single transaction per batch.
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# (store name, key, encoded value or None for a deletion, expires_at or None)
+Change = Tuple[str, str, Any, Optional[float]]
+Entry = Tuple[str, str, Any, float]
+
+class StateBackend(ABC):
+    """Durable storage of encoded store entries"""
+
+    @abstractmethod
+    def load(self, now: float) -> List[Entry]:
+        """Entries that have not expired by ``now``"""
+
+    @abstractmethod
+    def write(self, changes: List[Change]) -> None:
+        """Apply a batch of changes; called from a worker thread, one batch at a time"""
+
+    def close(self) -> None:
+        pass
+
+class FileStateBackend(StateBackend):
+    """JSON snapshot plus append-only journal"""
+
+    def __init__(self, path: str, compact_after: int = 10000):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.compact_after = compact_after
+        # Mirror of what is on disk, to write snapshots without asking the stores
+        self._entries: Dict[str, Dict[str, Tuple[Any, float]]] = {}
+        self._journal_lines = 0
+        self.snapshots = 0
+
+    def load(self, now: float) -> List[Entry]:
+        self._entries = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for store, entries in json.load(f).items():
+                    self._entries[store] = {key: (value, expires_at) for key, (value, expires_at) in entries.items()}
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        store, key, value, expires_at = json.loads(line)
+                    except ValueError:
+                        # Torn last line from a crash mid-append
+                        break
+                    self._apply(store, key, value, expires_at)
+        for entries in self._entries.values():
+            for key in [key for key, (_, expires_at) in entries.items() if expires_at <= now]:
+                del entries[key]
+        # Start from a compact snapshot and an empty journal
+        self._snapshot()
+        return [(store, key, value, expires_at)
+                for store, entries in self._entries.items()
+                for key, (value, expires_at) in entries.items()]
+
+    def _apply(self, store: str, key: str, value: Any, expires_at: Optional[float]) -> None:
+        entries = self._entries.setdefault(store, {})
+        if expires_at is None:
+            entries.pop(key, None)
+        else:
+            entries[key] = (value, expires_at)
+
+    def write(self, changes: List[Change]) -> None:
+        for change in changes:
+            self._apply(*change)
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write("".join(json.dumps(change, ensure_ascii=False) + "\n" for change in changes))
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_lines += len(changes)
+        if self._journal_lines >= self.compact_after:
+            self._snapshot()
+
+    def _snapshot(self) -> None:
+        now = time.time()
+        data = {store: {key: [value, expires_at] for key, (value, expires_at) in entries.items() if expires_at > now}
+                for store, entries in self._entries.items()}
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        # The snapshot now contains everything the journal had
+        open(self.journal_path, 'w').close()
+        self._journal_lines = 0
+        self.snapshots += 1
+
+    def close(self) -> None:
+        if self._journal_lines:
+            self._snapshot()
+
+class SQLiteStateBackend(StateBackend):
+    """One row per entry in a SQLite database (WAL mode)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Used from worker threads, never concurrently
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS state ("
+            " store TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL,"
+            " PRIMARY KEY (store, key))"
+        )
+        self._db.commit()
+
+    def load(self, now: float) -> List[Entry]:
+        with self._db:
+            self._db.execute("DELETE FROM state WHERE expires_at <= ?", (now,))
+        rows = self._db.execute("SELECT store, key, value, expires_at FROM state").fetchall()
+        return [(store, key, json.loads(value), expires_at) for store, key, value, expires_at in rows]
+
+    def write(self, changes: List[Change]) -> None:
+        upserts = [(store, key, json.dumps(value, ensure_ascii=False), expires_at)
+                   for store, key, value, expires_at in changes if expires_at is not None]
+        deletes = [(store, key) for store, key, _, expires_at in changes if expires_at is None]
+        with self._db:
+            if upserts:
+                self._db.executemany(
+                    "INSERT INTO state (store, key, value, expires_at) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (store, key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+                    upserts,
+                )
+            if deletes:
+                self._db.executemany("DELETE FROM state WHERE store = ? AND key = ?", deletes)
+
+    def close(self) -> None:
+        self._db.close()
+
+def build_state_backend(kind: str, path: str) -> Optional[StateBackend]:
+    """Backend for ``STATE_BACKEND``; None keeps state in memory only"""
+    if kind == "file":
+        return FileStateBackend(path + ".json")
+    if kind == "sqlite":
+        return SQLiteStateBackend(path + ".sqlite3")
+    return None
+
+class StatePersister:
+    """Batches store changes and writes them to a backend off the event loop.
+
+    ``stores`` maps a name to ``(store, encode, decode)``; encode/decode convert values
+    to and from JSON-compatible data. Keys are persisted as strings and restored as ints.
+    """
+
+    def __init__(self, stores: Dict[str, Tuple[Any, Any, Any]], backend: StateBackend, flush_interval: float = 1.0):
+        self.stores = stores
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self._pending: Dict[Tuple[str, str], Change] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.flushes = 0
+        self.written = 0
+        self.loaded = 0
+        self.failures = 0
+        self.last_flush_seconds = 0.0
+
+    def load(self) -> int:
+        """Fill the stores from the backend and start recording their changes"""
+        started = time.perf_counter()
+        now = time.time()
+        for store_name, key, value, expires_at in self.backend.load(now):
+            if store_name not in self.stores or expires_at <= now:
+                continue
+            store, _, decode = self.stores[store_name]
+            store.set(int(key), decode(value), expires_at=expires_at)
+            self.loaded += 1
+        for store_name, (store, encode, _) in self.stores.items():
+            store.on_change = self._recorder(store_name, encode)
+        logger.info(f"Loaded {self.loaded} user state entries in {(time.perf_counter() - started) * 1000:.1f} ms")
+        return self.loaded
+
+    def _recorder(self, store_name: str, encode):
+        pending = self._pending
+
+        def record(key, value, expires_at) -> None:
+            encoded = encode(value) if expires_at is not None else None
+            pending[(store_name, str(key))] = (store_name, str(key), encoded, expires_at)
+        return record
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def flush(self) -> int:
+        """Write everything recorded so far; returns the number of changes written"""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            changes = list(self._pending.values())
+            self._pending.clear()
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(self.backend.write, changes)
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Error writing user state: {e}")
+                # Keep the batch unless newer changes to the same keys arrived meanwhile
+                for change in changes:
+                    self._pending.setdefault(change[:2], change)
+                return 0
+            self.flushes += 1
+            self.written += len(changes)
+            self.last_flush_seconds = time.perf_counter() - started
+            return len(changes)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def start(self) -> None:
+        """Load persisted state (in a worker thread) and start periodic flushing"""
+        if self._task is not None:
+            return
+        await asyncio.to_thread(self.load)
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Stop flushing, write what is left and close the backend"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        await asyncio.to_thread(self.backend.close)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.backend).__name__,
+            "loaded": self.loaded,
+            "pending": len(self._pending),
+            "flushes": self.flushes,
+            "written": self.written,
+            "failures": self.failures,
+            "last_flush_seconds": round(self.last_flush_seconds, 6),
+        }
+
+# Persister of the running bot, if STATE_BACKEND is not "memory"
+state_persister: Optional[StatePersister] = None
+
+async def start_state_persistence(manager) -> None:
+    """Load ``manager``'s persisted state and keep saving it (post_init)"""
+    global state_persister
+    backend = build_state_backend(Config.STATE_BACKEND, Config.STATE_PATH)
+    if backend is None or state_persister is not None:
+        return
+    state_persister = StatePersister(manager.persisted_stores(), backend, Config.STATE_FLUSH_INTERVAL)
+    await state_persister.start()
+
+async def stop_state_persistence() -> None:
+    """Write remaining changes and close the backend (post_shutdown)"""
+    global state_persister
+    if state_persister is not None:
+        await state_persister.stop()
+        state_persister = None
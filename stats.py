@@ -3,17 +3,21 @@
 Statistics module for Telegram bot
 Handles user tracking, bot statistics, and data persistence
 """
-import json
 import os
 import logging
+import time
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional, Set
-from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional, Set
+from dataclasses import dataclass
 from pathlib import Path
 
 from base import BaseStatsManager, UserInfo
+from config import Config
 from constants import BotConstants, TranslationKeys
 from localization import translate
+from metrics import stats_save_latency
+from serialization import serializer
+import tracing
 
 logger = logging.getLogger(__name__)
 
@@ -89,16 +93,30 @@ def _format_last_seen(self, last_seen: str) -> str:
     """Manages bot and user statistics"""
 
     def __init__(self, data_dir: str = BotConstants.DEFAULT_STATS_DATA_DIR):
+        """Nothing is read here: the files are loaded by ``load()`` (the application
+        factory calls it) or on first use of ``users``/``bot_stats``"""
         super().__init__(data_dir)
         self.data_dir = Path(data_dir)
-        self.data_dir.mkdir(exist_ok=True)
 
         self.users_file = self.data_dir / "users.json"
         self.stats_file = self.data_dir / "bot_stats.json"
-
+        # Called instead of saving after each change when set (the shared stats process coalesces saves)
+        self.on_change: Optional[Callable[[], None]] = None
+
+    def __getattr__(self, name: str):
+        # Only reached while ``users``/``bot_stats`` are not set yet, i.e. before loading
+        if name in ("users", "bot_stats"):
+            self.load()
+            return self.__dict__[name]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def load(self) -> None:
+        """Read the statistics files (once)"""
+        if "users" in self.__dict__:
+            return
+        self.data_dir.mkdir(exist_ok=True)
         self.users: Dict[int, UserStats] = {}
         self.bot_stats: Optional[BotStats] = None
-
         self._load_data()
         self._update_bot_start_time()
 
@@ -107,18 +125,16 @@ def _load_data(self):
         try:
             # Load users
             if self.users_file.exists():
-                with open(self.users_file, 'r', encoding='utf-8') as f:
-                    users_data = json.load(f)
-                    for user_id_str, user_data in users_data.items():
-                        user_id = int(user_id_str)
-                        self.users[user_id] = UserStats(**user_data)
+                users_data = serializer.loads(self.users_file.read_bytes())
+                for user_id_str, user_data in users_data.items():
+                    user_id = int(user_id_str)
+                    self.users[user_id] = UserStats(**user_data)
                 logger.info(f"Loaded {len(self.users)} users from storage")
 
             # Load bot stats
             if self.stats_file.exists():
-                with open(self.stats_file, 'r', encoding='utf-8') as f:
-                    stats_data = json.load(f)
-                    self.bot_stats = BotStats(**stats_data)
+                stats_data = serializer.loads(self.stats_file.read_bytes())
+                self.bot_stats = BotStats(**stats_data)
                 logger.info("Loaded bot statistics from storage")
             else:
                 self._initialize_bot_stats()
@@ -147,19 +163,27 @@ def _update_bot_start_time(self):
 
     def _save_data(self):
         """Save data to files"""
-        try:
-            # Save users
-            users_data = {str(user_id): asdict(user_stats) for user_id, user_stats in self.users.items()}
-            with open(self.users_file, 'w', encoding='utf-8') as f:
-                json.dump(users_data, f, indent=2, ensure_ascii=False)
-
-            # Save bot stats
-            if self.bot_stats:
-                with open(self.stats_file, 'w', encoding='utf-8') as f:
-                    json.dump(asdict(self.bot_stats), f, indent=2, ensure_ascii=False)
-
-        except Exception as e:
-            logger.error(f"Error saving data: {e}")
+        started = time.perf_counter()
+        with tracing.span("stats.save", users=len(self.users)):
+            try:
+                # Dataclasses and integer user IDs are encoded directly (same JSON as asdict/str keys)
+                pretty = Config.STATS_FILE_FORMAT == "pretty"
+                self.users_file.write_bytes(serializer.dumps(self.users, pretty=pretty))
+
+                # Save bot stats
+                if self.bot_stats:
+                    self.stats_file.write_bytes(serializer.dumps(self.bot_stats, pretty=pretty))
+
+            except Exception as e:
+                logger.error(f"Error saving data: {e}")
+        stats_save_latency.observe(time.perf_counter() - started)
+
+    def _changed(self):
+        """Persist a change now, or let ``on_change`` schedule it"""
+        if self.on_change is not None:
+            self.on_change()
+        else:
+            self._save_data()
 
     def track_user(self, user_info: UserInfo) -> None:
         """Track user interaction"""
@@ -178,7 +202,7 @@ def track_user(self, user_info: UserInfo) -> None:
             if user_info.last_name:
                 user.last_name = user_info.last_name
 
-            self.logger.debug(f"Updated user {user_info.user_id}: last_seen {old_last_seen} -> {now}")
+            self.logger.debug("Updated user %s: last_seen %s -> %s", user_info.user_id, old_last_seen, now)
         else:
             # Create new user
             user = UserStats(
@@ -193,14 +217,14 @@ def track_user(self, user_info: UserInfo) -> None:
                 commands_used={}
             )
             self.users[user_info.user_id] = user
-            self.logger.info(f"New user tracked: {user_info.user_id} (@{user_info.username or 'unknown'})")
+            self.logger.info("New user tracked: %s (@%s)", user_info.user_id, user_info.username or 'unknown')
 
         # Update bot stats
         if self.bot_stats:
             self.bot_stats.total_users = len(self.users)
             self.bot_stats.total_messages += 1
 
-        self._save_data()
+        self._changed()
 
     def track_user_legacy(self, user_id: int, username: str = None, first_name: str = None, last_name: str = None):
         """Legacy method for backward compatibility"""
@@ -227,13 +251,13 @@ def track_command(self, user_id: int, command: str):
                 self.bot_stats.commands_breakdown[command] = 0
             self.bot_stats.commands_breakdown[command] += 1
 
-        self._save_data()
+        self._changed()
 
     def set_user_language(self, user_id: int, language: str):
         """Set user language"""
         if user_id in self.users:
             self.users[user_id].language = language
-            self._save_data()
+            self._changed()
             self.logger.info(f"Set language for user {user_id} to {language}")
 
     def get_user_language(self, user_id: int) -> str:
@@ -354,4 +378,4 @@ def _format_duration(self, duration, lang: str = "uk") -> str:
             return f"{minutes}{translate(TranslationKeys.MINUTE_UNIT, lang)} {seconds}{translate(TranslationKeys.SECOND_UNIT, lang)}"
 
 # Global stats manager instance
-stats_manager = StatsManager()
+stats_manager = StatsManager(Config.STATS_DATA_DIR)
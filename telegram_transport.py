@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tunable, instrumented HTTP transports for Telegram Bot API calls
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from telegram.error import TimedOut
+from telegram.request import BaseRequest, HTTPXRequest, RequestData
+
+import health
+import metrics
+import tracing
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+def _api_method(url: str) -> str:
+    """Bot API method of a request URL (``.../bot<token>/sendMessage`` -> ``sendMessage``)"""
+    if "/file/bot" in url:
+        return "file_download"
+    return url.rsplit("/", 1)[-1]
+
+class InstrumentedHTTPXRequest(HTTPXRequest):
+    """HTTPXRequest that measures how long calls wait for a free pooled connection.
+
+    A semaphore sized like the connection pool is taken before each request, so waiting
+    happens here (where it can be timed) and never inside httpx. The pool timeout applies
+    to that wait exactly like PTB's own pool timeout does.
+    """
+
+    def __init__(self, name: str, connection_pool_size: int, keepalive_connections: Optional[int] = None,
+                 keepalive_expiry: Optional[float] = None, **kwargs: Any):
+        limits = httpx.Limits(
+            max_connections=connection_pool_size,
+            max_keepalive_connections=keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        httpx_kwargs = dict(kwargs.pop("httpx_kwargs", None) or {})
+        httpx_kwargs["limits"] = limits
+        super().__init__(connection_pool_size=connection_pool_size, httpx_kwargs=httpx_kwargs, **kwargs)
+        self.name = name
+        self.pool_size = connection_pool_size
+        self._slots = asyncio.Semaphore(connection_pool_size)
+        self.requests = 0
+        self.in_flight = 0
+        self.waited = 0
+        self.pool_timeouts = 0
+        self.pool_wait_seconds_total = 0.0
+        self.pool_wait_seconds_max = 0.0
+
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: Optional[RequestData] = None,
+        read_timeout=BaseRequest.DEFAULT_NONE,
+        write_timeout=BaseRequest.DEFAULT_NONE,
+        connect_timeout=BaseRequest.DEFAULT_NONE,
+        pool_timeout=BaseRequest.DEFAULT_NONE,
+    ) -> Tuple[int, bytes]:
+        """Wait for a pool slot (timed), then send the request"""
+        # Bot methods pass the public DEFAULT_NONE sentinel when no timeout was given
+        if pool_timeout is BaseRequest.DEFAULT_NONE:
+            pool_timeout = self._client.timeout.pool
+
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), pool_timeout)
+        except asyncio.TimeoutError as e:
+            self.pool_timeouts += 1
+            metrics.telegram_api_calls.labels(_api_method(url), "pool_timeout").inc()
+            raise TimedOut(
+                message=f"Pool timeout: all {self.pool_size} '{self.name}' connections are busy. "
+                        "Request was *not* sent to Telegram."
+            ) from e
+        waited = time.perf_counter() - started
+        self.requests += 1
+        if waited > 0.0005:
+            self.waited += 1
+        self.pool_wait_seconds_total += waited
+        self.pool_wait_seconds_max = max(self.pool_wait_seconds_max, waited)
+
+        self.in_flight += 1
+        api_method = _api_method(url)
+        outcome = "error"
+        try:
+            with tracing.span(f"telegram.{api_method}") as call_span:
+                code, payload = await super().do_request(
+                    url, method, request_data,
+                    read_timeout=read_timeout, write_timeout=write_timeout,
+                    connect_timeout=connect_timeout, pool_timeout=pool_timeout,
+                )
+                if call_span is not None:
+                    call_span.set(status=code, pool_wait_ms=round(waited * 1000, 1))
+            outcome = str(code)
+            if code == 200 and api_method == "getUpdates":
+                health.polling.mark()
+            return code, payload
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+            metrics.telegram_api_calls.labels(api_method, outcome).inc()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Pool size, usage and wait-time counters"""
+        return {
+            "pool_size": self.pool_size,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "waited": self.waited,
+            "pool_timeouts": self.pool_timeouts,
+            "pool_wait_seconds_total": round(self.pool_wait_seconds_total, 6),
+            "pool_wait_seconds_max": round(self.pool_wait_seconds_max, 6),
+            "pool_wait_seconds_mean": round(self.pool_wait_seconds_total / self.requests, 6) if self.requests else 0.0,
+        }
+
+# Most recently built transports by name, for metrics
+transport_registry: Dict[str, InstrumentedHTTPXRequest] = {}
+
+def build_transports() -> Tuple[InstrumentedHTTPXRequest, InstrumentedHTTPXRequest]:
+    """Separate pools for outbound Bot API calls and for getUpdates long polling"""
+    outbound = InstrumentedHTTPXRequest(
+        "outbound",
+        connection_pool_size=Config.TELEGRAM_POOL_SIZE,
+        keepalive_connections=Config.TELEGRAM_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=Config.TELEGRAM_KEEPALIVE_EXPIRY,
+        connect_timeout=Config.TELEGRAM_CONNECT_TIMEOUT,
+        read_timeout=Config.TELEGRAM_READ_TIMEOUT,
+        write_timeout=Config.TELEGRAM_WRITE_TIMEOUT,
+        pool_timeout=Config.TELEGRAM_POOL_TIMEOUT,
+    )
+    # getUpdates holds its connection for the whole long poll; PTB adds the poll timeout
+    # to this read timeout
+    updates = InstrumentedHTTPXRequest(
+        "get_updates",
+        connection_pool_size=Config.TELEGRAM_UPDATES_POOL_SIZE,
+        keepalive_expiry=Config.TELEGRAM_KEEPALIVE_EXPIRY,
+        connect_timeout=Config.TELEGRAM_CONNECT_TIMEOUT,
+        read_timeout=Config.TELEGRAM_UPDATES_READ_TIMEOUT,
+        write_timeout=Config.TELEGRAM_WRITE_TIMEOUT,
+        pool_timeout=Config.TELEGRAM_POOL_TIMEOUT,
+    )
+    transport_registry[outbound.name] = outbound
+    transport_registry[updates.name] = updates
+    return outbound, updates
+
+def get_transport_metrics() -> Dict[str, Dict[str, Any]]:
+    """Metrics of every transport built so far"""
+    return {name: transport.get_metrics() for name, transport in transport_registry.items()}
+
+metrics.registry.gauge_callback(
+    "bot_telegram_requests_in_flight", "Bot API requests currently holding a pooled connection",
+    lambda: {(name,): transport.in_flight for name, transport in transport_registry.items()}, ("transport",))
+metrics.registry.gauge_callback(
+    "bot_telegram_pool_wait_seconds_max", "Longest wait for a free pooled connection so far",
+    lambda: {(name,): transport.pool_wait_seconds_max for name, transport in transport_registry.items()}, ("transport",))
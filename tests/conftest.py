@@ -0,0 +1,14 @@
+"""
+Shared test setup: the bot modules read their configuration at import time
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+os.environ.setdefault("BOT_TOKEN", "123456:TEST")
+os.environ.setdefault("JOKES_API_URL", "http://127.0.0.1:9")
+os.environ.setdefault("STATS_DATA_DIR", tempfile.mkdtemp(prefix="bot-tests-"))
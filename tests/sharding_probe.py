@@ -0,0 +1,63 @@
+"""
+Worker-side probe for tests/test_sharding.py, run inside spawned worker processes
+"""
+import json
+import os
+import sys
+
+
+def report_stats_binding():
+    """Factory for ``_worker_main``: record which stats object the handlers use, then exit"""
+    import handlers.base_handlers
+    import handlers.callback_handlers
+    import handlers.message_handlers
+    import utils
+
+    modules = (handlers.base_handlers, handlers.callback_handlers, handlers.message_handlers, utils)
+    # A module-level ``from stats import stats_manager`` would still hold the parent's StatsManager
+    result = {module.__name__: type(getattr(module, "stats_manager", None) or module.stats.stats_manager).__name__
+              for module in modules}
+    result["main_imported_first"] = "main" in sys.modules and "__mp_main__" in sys.modules
+    output = os.environ["PROBE_OUTPUT"]
+    with open(output + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(result, f)
+    os.replace(output + ".tmp", output)
+    sys.exit(0)
+
+
+class _ProbeApplication:
+    """Just enough of an ``Application`` for ``_serve_shard``, without Telegram.
+
+    Every update is tracked as the ``pid-<worker pid>`` command of its sender, so a
+    test can tell from the shared statistics which worker process handled it.
+    """
+    post_init = post_stop = post_shutdown = None
+    bot = None
+
+    def __init__(self):
+        self.update_queue = self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def put_nowait(self, update):
+        import stats
+        from base import UserInfo
+
+        user = update.effective_user
+        stats.stats_manager.track_user(UserInfo(user_id=user.id, username=user.username, first_name=user.first_name))
+        stats.stats_manager.track_command(user.id, f"pid-{os.getpid()}")
+
+
+def tracking_application():
+    """Factory for ``_worker_main``"""
+    return _ProbeApplication()
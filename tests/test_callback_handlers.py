@@ -0,0 +1,89 @@
+"""
+Callback handlers: what each button press adds to the statistics
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import stats
+from config import Config
+from handlers.base_handlers import AdminCallbackHandler, JokeCallbackHandler, StatsCallbackHandler
+from user_states import state_manager
+
+
+class _RecordingStats:
+    def __init__(self):
+        self.users = []
+        self.commands = []
+
+    def track_user(self, user_info):
+        self.users.append(user_info.user_id)
+
+    def track_command(self, user_id, command):
+        self.commands.append((user_id, command))
+
+    def get_user_language(self, user_id):
+        return "en"
+
+    def get_users_list(self, lang, limit):
+        return "users"
+
+    def get_stats_summary(self, lang):
+        return "summary"
+
+
+class _Query:
+    def __init__(self, user_id: int, data: str):
+        self.data = data
+        self.from_user = SimpleNamespace(id=user_id, username=None, first_name="Probe", last_name=None)
+        self.message = SimpleNamespace(message_id=user_id, chat=SimpleNamespace(id=user_id))
+        self.inline_message_id = None
+        self.edits = []
+
+    async def answer(self, *args, **kwargs):
+        pass
+
+    async def edit_message_text(self, text, **kwargs):
+        self.edits.append(text)
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    recording = _RecordingStats()
+    monkeypatch.setattr(stats, "stats_manager", recording)
+    monkeypatch.setattr(Config, "ADMIN_USER_IDS", [1])
+    return recording
+
+
+def _press(handler, user_id: int) -> _Query:
+    query = _Query(user_id, handler.callback_data)
+    update = SimpleNamespace(callback_query=query, effective_user=query.from_user, message=None)
+    asyncio.run(handler.handle(update, SimpleNamespace()))
+    return query
+
+
+def test_stats_callback_counts_as_a_command(recorded):
+    _press(StatsCallbackHandler(), 501)
+    assert recorded.users == [501]
+    assert recorded.commands == [(501, "stats_callback")]
+
+
+def test_admin_callback_tracks_admins_only(recorded):
+    query = _press(AdminCallbackHandler(), 502)
+    assert query.edits and query.edits[0] != "users"  # Access denied
+    assert recorded.users == [] and recorded.commands == []
+
+    query = _press(AdminCallbackHandler(), 1)
+    assert query.edits == ["users"]
+    assert recorded.users == [1]
+    assert recorded.commands == [(1, "admin_callback")]
+
+
+def test_joke_callback_is_an_interaction_not_a_command(recorded):
+    try:
+        _press(JokeCallbackHandler(), 503)
+    finally:
+        state_manager.clear_user_state(503)
+    assert recorded.users == [503]
+    assert recorded.commands == []
@@ -0,0 +1,128 @@
+"""
+ExpiringStore: TTL expiry, LRU eviction and change notifications
+"""
+import pytest
+
+from expiring_store import ExpiringStore
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_entry_expires_after_ttl(clock):
+    store = ExpiringStore("test", ttl=10, clock=clock)
+    store["a"] = 1
+    clock.now += 9.9
+    assert store.get("a") == 1
+    clock.now += 0.2
+    assert store.get("a") is None
+    assert "a" not in store
+    assert store.expired == 1
+
+
+def test_write_restarts_ttl(clock):
+    store = ExpiringStore("test", ttl=10, clock=clock)
+    store["a"] = 1
+    clock.now += 8
+    store["a"] = 2
+    clock.now += 8
+    assert store["a"] == 2
+
+
+def test_per_entry_ttl_and_absolute_deadline(clock):
+    store = ExpiringStore("test", ttl=10, clock=clock)
+    store.set("short", 1, ttl=1)
+    store.set("fixed", 2, expires_at=clock.now + 100)
+    clock.now += 50
+    assert "short" not in store
+    assert store["fixed"] == 2
+
+
+def test_zero_ttl_never_expires(clock):
+    store = ExpiringStore("test", ttl=0, clock=clock)
+    store["a"] = 1
+    clock.now += 10**9
+    assert store["a"] == 1
+    assert store.get_metrics(memory=False)["heap_items"] == 0
+
+
+def test_purge_drops_only_due_entries(clock):
+    store = ExpiringStore("test", ttl=10, clock=clock)
+    store["old"] = 1
+    clock.now += 5
+    store["new"] = 2
+    clock.now += 6
+    assert store.purge() == 1
+    assert list(store) == ["new"]
+
+
+def test_missing_key_raises_key_error(clock):
+    store = ExpiringStore("test", ttl=10, clock=clock)
+    with pytest.raises(KeyError):
+        store["missing"]
+    with pytest.raises(KeyError):
+        del store["missing"]
+
+
+def test_max_entries_evicts_least_recently_used(clock):
+    store = ExpiringStore("test", ttl=0, max_entries=2, clock=clock)
+    store["a"] = 1
+    store["b"] = 2
+    store.get("a")  # "b" is now the least recently used
+    store["c"] = 3
+    assert "b" not in store
+    assert store["a"] == 1 and store["c"] == 3
+    assert store.evicted == 1
+
+
+def test_on_change_reports_writes_deletions_and_evictions(clock):
+    store = ExpiringStore("test", ttl=10, max_entries=1, clock=clock)
+    changes = []
+    store.on_change = lambda key, value, expires_at: changes.append((key, value, expires_at))
+    store["a"] = 1
+    store["b"] = 2  # Evicts "a"
+    store.pop("b")
+    assert changes == [("a", 1, clock.now + 10), ("b", 2, clock.now + 10), ("a", None, None), ("b", None, None)]
+
+
+def test_expiry_is_not_reported_as_a_change(clock):
+    store = ExpiringStore("test", ttl=10, clock=clock)
+    store["a"] = 1
+    changes = []
+    store.on_change = lambda *change: changes.append(change)
+    clock.now += 11
+    store.purge()
+    assert changes == []
+
+
+def test_overwrites_do_not_grow_the_heap_without_bound(clock):
+    store = ExpiringStore("test", ttl=10, clock=clock)
+    for i in range(10_000):
+        store["a"] = i
+    assert store["a"] == 9_999
+    assert store.get_metrics(memory=False)["heap_items"] <= 2 * len(store) + 64 + 1
+
+
+def test_items_skip_expired_entries(clock):
+    store = ExpiringStore("test", ttl=10, clock=clock)
+    store.set("a", 1, ttl=1)
+    store.set("b", 2)
+    clock.now += 2
+    assert [(key, value) for key, value, _ in store.items()] == [("b", 2)]
+
+
+def test_metrics_include_memory_only_on_request(clock):
+    store = ExpiringStore("test", ttl=10, clock=clock)
+    store["a"] = 1
+    assert "approx_memory_bytes" not in store.get_metrics(memory=False)
+    assert store.get_metrics()["approx_memory_bytes"] > 0
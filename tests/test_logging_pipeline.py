@@ -0,0 +1,60 @@
+"""
+Log filters: secret redaction, per-logger sampling and per-call-site rate limits
+"""
+import logging
+
+from logging_pipeline import REDACTED, RedactingFilter, SamplingFilter
+
+
+def _record(msg, *args, name="bot", level=logging.INFO, lineno=1):
+    return logging.LogRecord(name, level, "bot.py", lineno, msg, args or None, None)
+
+
+def test_secrets_are_redacted_after_formatting():
+    record = _record("token %s in url", "123:SECRET")
+    assert RedactingFilter(["123:SECRET"]).filter(record)
+    assert record.getMessage() == f"token {REDACTED} in url"
+
+
+def test_authorization_header_is_redacted():
+    record = _record("headers: {'Authorization': 'Bearer abc.def'}")
+    RedactingFilter().filter(record)
+    assert "abc.def" not in record.getMessage()
+    assert "Bearer" in record.getMessage()
+
+
+def test_clean_message_is_left_alone():
+    record = _record("user %s", 42)
+    RedactingFilter(["SECRET", ""]).filter(record)
+    assert record.args == (42,) and record.getMessage() == "user 42"
+
+
+def test_sampling_drops_info_of_configured_logger_only():
+    sampler = SamplingFilter({"httpx": 0.0})
+    assert not sampler.filter(_record("request", name="httpx"))
+    assert not sampler.filter(_record("request", name="httpx.client"))
+    assert sampler.filter(_record("request", name="httpxtra"))
+    assert sampler.filter(_record("failed", name="httpx", level=logging.WARNING))
+    assert sampler.sampled_out == 2
+
+
+def test_most_specific_logger_rate_wins():
+    sampler = SamplingFilter({"bot": 0.0, "bot.stats": 1.0})
+    assert sampler.filter(_record("saved", name="bot.stats"))
+    assert not sampler.filter(_record("hello", name="bot.handlers"))
+
+
+def test_rate_limit_is_per_call_site():
+    now = [0.0]
+    sampler = SamplingFilter(rate_limit=2.0, clock=lambda: now[0])
+    kept = [sampler.filter(_record("hot", lineno=10)) for _ in range(5)]
+    assert kept == [True, True, False, False, False]
+    assert sampler.filter(_record("other", lineno=11))
+    now[0] += 1.0
+    assert sampler.filter(_record("hot", lineno=10))
+    assert sampler.rate_limited == 3
+
+
+def test_warnings_are_never_rate_limited():
+    sampler = SamplingFilter(rate_limit=1.0, clock=lambda: 0.0)
+    assert all(sampler.filter(_record("bad", level=logging.ERROR)) for _ in range(10))
@@ -0,0 +1,80 @@
+"""
+EditFingerprintCache: redundant edits are skipped, changed ones sent
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest
+
+from message_cache import EditFingerprintCache
+
+
+def _query(chat_id=1, message_id=10, inline_message_id=None):
+    message = SimpleNamespace(chat=SimpleNamespace(id=chat_id), message_id=message_id) if message_id else None
+    return SimpleNamespace(message=message, inline_message_id=inline_message_id, edit_message_text=AsyncMock())
+
+
+def _markup(data="menu"):
+    return InlineKeyboardMarkup([[InlineKeyboardButton("Menu", callback_data=data)]])
+
+
+def test_identical_edit_is_skipped():
+    cache = EditFingerprintCache()
+    query = _query()
+    assert asyncio.run(cache.edit_text(query, "Hello", reply_markup=_markup()))
+    assert not asyncio.run(cache.edit_text(query, "Hello", reply_markup=_markup()))
+    assert query.edit_message_text.await_count == 1
+    assert cache.get_metrics()["api_calls_saved"] == 1
+
+
+def test_changed_text_or_markup_is_sent():
+    cache = EditFingerprintCache()
+    query = _query()
+    asyncio.run(cache.edit_text(query, "Hello", reply_markup=_markup()))
+    assert asyncio.run(cache.edit_text(query, "Hello", reply_markup=_markup("back")))
+    assert asyncio.run(cache.edit_text(query, "Bye", reply_markup=_markup("back")))
+    assert asyncio.run(cache.edit_text(query, "Bye", reply_markup=_markup("back"), parse_mode="Markdown"))
+    assert query.edit_message_text.await_count == 4
+
+
+def test_messages_are_tracked_separately():
+    cache = EditFingerprintCache()
+    first, second = _query(message_id=10), _query(message_id=11)
+    asyncio.run(cache.edit_text(first, "Hello"))
+    assert asyncio.run(cache.edit_text(second, "Hello"))
+
+
+def test_inline_messages_are_keyed_by_inline_id():
+    assert EditFingerprintCache.message_key(_query(message_id=None, inline_message_id="abc")) == ("inline", "abc")
+    assert EditFingerprintCache.message_key(_query(message_id=None)) is None
+
+
+def test_not_modified_error_counts_as_up_to_date():
+    cache = EditFingerprintCache()
+    query = _query()
+    query.edit_message_text.side_effect = BadRequest("Message is not modified")
+    assert asyncio.run(cache.edit_text(query, "Hello"))
+    query.edit_message_text.side_effect = None
+    assert not asyncio.run(cache.edit_text(query, "Hello"))
+    assert cache.get_metrics()["not_modified"] == 1
+
+
+def test_failed_edit_is_not_remembered():
+    cache = EditFingerprintCache()
+    query = _query()
+    query.edit_message_text.side_effect = BadRequest("Message to edit not found")
+    try:
+        asyncio.run(cache.edit_text(query, "Hello"))
+    except BadRequest:
+        pass
+    assert cache.get(EditFingerprintCache.message_key(query)) is None
+
+
+def test_cache_is_bounded():
+    cache = EditFingerprintCache(max_entries=2)
+    for message_id in (1, 2, 3):
+        asyncio.run(cache.edit_text(_query(message_id=message_id), "Hello"))
+    assert cache.get_metrics()["entries"] == 2
+    assert cache.get((1, 1)) is None
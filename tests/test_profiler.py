@@ -0,0 +1,89 @@
+"""
+Profiler: one session at a time, including two /profile commands that arrive together
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from base import UserInfo
+from config import Config
+from handlers.base_handlers import ProfileCommandHandler
+from profiler import Profiler, profiler
+
+
+def test_only_one_session_can_be_claimed():
+    session = Profiler()
+    assert session.try_begin("cprofile")
+    assert not session.try_begin("sample")
+    assert session.running == "cprofile"
+    session.end()
+    assert session.try_begin("sample")
+
+
+def test_profile_refuses_while_a_session_is_claimed():
+    session = Profiler()
+    session.try_begin("sample")
+    with pytest.raises(RuntimeError, match="sample session is already running"):
+        asyncio.run(session.profile(1.0, "cprofile"))
+    assert session.running == "sample"
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        Profiler().try_begin("perf")
+
+
+class _Message:
+    def __init__(self):
+        self.replies = []
+
+    async def reply_text(self, text, **kwargs):
+        await asyncio.sleep(0)  # A network round trip: the other command runs meanwhile
+        self.replies.append(text)
+
+
+def test_concurrent_profile_commands_start_one_session(monkeypatch):
+    monkeypatch.setattr(Config, "ADMIN_USER_IDS", [1])
+    sessions = []
+
+    def create_task(coroutine):
+        sessions.append(coroutine)
+        coroutine.close()  # Not run: the session stays claimed, as while it profiles
+
+    handler = ProfileCommandHandler()
+    message = _Message()
+    update = SimpleNamespace(message=message)
+    context = SimpleNamespace(args=["5"], application=SimpleNamespace(create_task=create_task))
+
+    async def scenario():
+        await asyncio.gather(*(handler.execute_command(update, context, UserInfo(user_id=1)) for _ in range(2)))
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        profiler.end()
+    assert len(sessions) == 1
+    assert sorted(message.replies) == ["⏳ A sample profiling session is already running", "📈 Profiling (sample) for 5s..."]
+
+
+def test_session_is_released_when_it_ends(monkeypatch):
+    monkeypatch.setattr(Config, "ADMIN_USER_IDS", [1])
+    documents = []
+
+    class _DocumentMessage(_Message):
+        async def reply_document(self, document, caption, **kwargs):
+            documents.append(caption)
+
+    async def scenario():
+        tasks = []
+        update = SimpleNamespace(message=_DocumentMessage())
+        context = SimpleNamespace(args=["1"], application=SimpleNamespace(
+            create_task=lambda coroutine: tasks.append(asyncio.create_task(coroutine))))
+        await ProfileCommandHandler().execute_command(update, context, UserInfo(user_id=1))
+        assert profiler.running == "sample"
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    assert profiler.running is None
+    assert len(documents) == 1 and documents[0].startswith("📈 sample: ")
@@ -0,0 +1,99 @@
+"""
+PriorityRateLimiter: token buckets and priority ordering
+"""
+import asyncio
+
+from rate_limiter import Priority, PriorityRateLimiter, TokenBucket
+
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(rate=2.0, capacity=2.0, now=0.0)
+    bucket.take(0.0)
+    bucket.take(0.0)
+    assert not bucket.available(0.0)
+    assert bucket.wait_time(0.0) == 0.5
+    assert bucket.available(0.5)
+
+
+def test_token_bucket_block_overrides_tokens():
+    bucket = TokenBucket(rate=10.0, capacity=5.0, now=0.0)
+    bucket.block(0.0, 3.0)
+    assert not bucket.available(2.9)
+    assert bucket.wait_time(1.0) == 2.0
+    assert bucket.available(3.2)
+
+
+def test_window_bucket_never_exceeds_limit():
+    bucket = TokenBucket.for_window(20, 60.0, now=0.0)
+    sent = 0
+    now = 0.0
+    while now < 60.0:
+        if bucket.available(now):
+            bucket.take(now)
+            sent += 1
+        now += 0.01
+    assert sent <= 20
+
+
+def _send_all(limiter, requests):
+    """Send ``(name, chat_id, priority)`` requests at once; returns names in the order they went out"""
+    sent = []
+
+    async def run():
+        await limiter.initialize()
+
+        def callback(name):
+            async def send():
+                sent.append(name)
+                return True
+            return send
+
+        await asyncio.gather(*(
+            limiter.process_request(callback(name), (), {}, "sendMessage", {"chat_id": chat_id}, priority)
+            for name, chat_id, priority in requests
+        ))
+        await limiter.shutdown()
+
+    asyncio.run(run())
+    return sent
+
+
+def test_interactive_requests_overtake_queued_bulk():
+    limiter = PriorityRateLimiter(global_rate=100.0, chat_rate=100.0, chat_burst=100.0)
+    requests = [(f"bulk{i}", 1000 + i, Priority.BULK) for i in range(4)]
+    requests += [(f"reply{i}", 2000 + i, None) for i in range(2)]
+    sent = _send_all(limiter, requests)
+    # The first bulk send takes the only token; everything else queued behind it
+    assert sent[0] == "bulk0"
+    assert sent[1:3] == ["reply0", "reply1"]
+    assert sent[3:] == ["bulk1", "bulk2", "bulk3"]
+    metrics = limiter.get_metrics()
+    assert metrics["dequeued"]["INTERACTIVE"] == 2 and metrics["dequeued"]["BULK"] == 3
+
+
+def test_same_priority_is_first_in_first_out():
+    limiter = PriorityRateLimiter(global_rate=100.0, chat_rate=100.0, chat_burst=100.0)
+    sent = _send_all(limiter, [(f"m{i}", 1000 + i, None) for i in range(5)])
+    assert sent == [f"m{i}" for i in range(5)]
+
+
+def test_throttled_chat_does_not_block_other_chats():
+    limiter = PriorityRateLimiter(global_rate=1000.0, chat_rate=5.0, chat_burst=1.0)
+    sent = _send_all(limiter, [("a1", 1, None), ("a2", 1, None), ("b1", 2, None)])
+    assert sent.index("b1") < sent.index("a2")
+
+
+def test_unlimited_endpoints_skip_the_queue():
+    limiter = PriorityRateLimiter(global_rate=1.0)
+
+    async def run():
+        await limiter.initialize()
+
+        async def answer():
+            return True
+        for _ in range(5):
+            await limiter.process_request(answer, (), {}, "answerCallbackQuery", {}, None)
+
+    asyncio.run(run())
+    metrics = limiter.get_metrics()
+    assert metrics["unlimited"] == 5 and metrics["queued"] == 0
@@ -0,0 +1,231 @@
+"""
+Multi-process mode: shard routing, the shared stats and worker supervision
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from base import UserInfo
+from conftest import ROOT
+from sharding import (SharedStats, ShardSupervisor, StatsClient, StatsServer, WorkerStats, _start_stats_process,
+                      shard_key)
+from stats import StatsManager
+
+
+def test_message_is_keyed_by_sender():
+    update = {"update_id": 1, "message": {"from": {"id": 42}, "chat": {"id": -100}}}
+    assert shard_key(update) == 42
+
+
+def test_callback_query_is_keyed_by_sender():
+    update = {"update_id": 2, "callback_query": {"from": {"id": 42}, "message": {"chat": {"id": 42}}}}
+    assert shard_key(update) == 42
+
+
+def test_chat_is_used_without_a_sender():
+    assert shard_key({"update_id": 3, "channel_post": {"chat": {"id": -100}}}) == -100
+
+
+def test_chat_member_update_is_keyed_by_user():
+    update = {"update_id": 4, "my_chat_member": {"from": {"id": 7}, "chat": {"id": 7}}}
+    assert shard_key(update) == 7
+
+
+def test_update_without_user_or_chat():
+    assert shard_key({"update_id": 5, "poll": {"id": "p"}}) is None
+
+
+def test_same_user_always_maps_to_same_shard():
+    supervisor = ShardSupervisor(4)
+    shards = {supervisor.shard_for({"update_id": update_id, "message": {"from": {"id": 42}}})
+              for update_id in range(100)}
+    assert shards == {42 % 4}
+
+
+def test_updates_without_a_key_are_spread_by_update_id():
+    supervisor = ShardSupervisor(4)
+    shards = {supervisor.shard_for({"update_id": update_id, "poll": {}}) for update_id in range(8)}
+    assert shards == {0, 1, 2, 3}
+
+
+ENTRY_SCRIPT = '''
+import main  # Like ``python main.py``: every spawned worker re-imports this module, and the handlers with it
+import asyncio
+import os
+import time
+
+from sharding import ShardSupervisor
+
+
+async def run():
+    supervisor = ShardSupervisor(1, factory_path="tests.sharding_probe:report_stats_binding", stop_timeout=5)
+    await supervisor.start()
+    deadline = time.monotonic() + 60
+    while not os.path.exists(os.environ["PROBE_OUTPUT"]) and time.monotonic() < deadline:
+        await asyncio.sleep(0.1)
+    await supervisor.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
+'''
+
+
+def test_worker_handlers_use_the_shared_stats(tmp_path):
+    script = tmp_path / "entry.py"
+    script.write_text(ENTRY_SCRIPT, encoding="utf-8")
+    output = tmp_path / "probe.json"
+    env = dict(os.environ, PYTHONPATH=ROOT, PROBE_OUTPUT=str(output), STATS_DATA_DIR=str(tmp_path / "data"),
+               LOG_LEVEL="CRITICAL", METRICS_ENABLED="false", HEALTH_ENABLED="false")
+    subprocess.run([sys.executable, str(script)], cwd=ROOT, env=env, timeout=120, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    result = json.loads(output.read_text(encoding="utf-8"))
+    assert result.pop("main_imported_first")
+    assert result == {
+        "handlers.base_handlers": "WorkerStats",
+        "handlers.callback_handlers": "WorkerStats",
+        "handlers.message_handlers": "WorkerStats",
+        "utils": "WorkerStats",
+    }
+
+
+def _message(update_id: int, user_id: int) -> dict:
+    user = {"id": user_id, "is_bot": False, "first_name": "Probe"}
+    return {"update_id": update_id, "message": {"message_id": update_id, "date": 0, "text": "/start",
+                                                "from": user, "chat": {"id": user_id, "type": "private"}}}
+
+
+def test_restarted_worker_drains_its_queue_and_is_replaced(tmp_path, monkeypatch):
+    monkeypatch.setenv("STATS_DATA_DIR", str(tmp_path))  # Inherited by the spawned processes
+
+    async def scenario():
+        supervisor = ShardSupervisor(2, factory_path="tests.sharding_probe:tracking_application", stop_timeout=30)
+        await supervisor.start()
+        try:
+            first_pids = [process.pid for process in supervisor._processes]
+            supervisor.dispatch(_message(1, 2))  # Queued before the restart: handled by the old process
+            await supervisor.restart_worker(0)
+            pids = [process.pid for process in supervisor._processes]
+            assert pids[0] != first_pids[0] and pids[1] == first_pids[1]
+            assert supervisor.restarts == [1, 0]
+
+            supervisor.dispatch(_message(2, 2))
+            await supervisor.rolling_restart()
+            assert supervisor.restarts == [2, 1]
+            supervisor.dispatch(_message(3, 2))
+        finally:
+            await supervisor.stop()
+        return first_pids[0], pids[0], supervisor._processes[0].pid
+
+    worker_pids = asyncio.run(scenario())
+
+    users = json.loads((tmp_path / "users.json").read_text(encoding="utf-8"))
+    assert users["2"]["message_count"] == 3
+    assert users["2"]["commands_used"] == {f"pid-{pid}": 1 for pid in worker_pids}
+
+
+def test_shared_stats_serializes_writers_and_coalesces_saves(tmp_path):
+    manager = StatsManager(str(tmp_path))
+    manager.load()
+    saves = []
+    save_data = manager._save_data
+    manager._save_data = lambda: saves.append(save_data())
+    shared = SharedStats(manager, save_interval=1.0)
+
+    def client(user_id: int):
+        for _ in range(100):
+            shared.track_user(UserInfo(user_id=user_id, username=f"user{user_id}"))
+            shared.track_command(user_id, "start")
+
+    threads = [threading.Thread(target=client, args=(user_id,)) for user_id in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert saves == []  # Nothing was written on the request path
+
+    deadline = time.monotonic() + 5
+    while not saves and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert len(saves) == 1  # 1600 changes, one save
+    assert shared.get_bot_stats().total_messages == 800
+    assert shared.get_bot_stats().commands_breakdown == {"start": 800}
+
+    users = json.loads((tmp_path / "users.json").read_text(encoding="utf-8"))
+    assert {user["message_count"] for user in users.values()} == {100}
+
+
+class _RecordingProxy:
+    def __init__(self):
+        self.calls = []
+
+    def track_user(self, user_info):
+        self.calls.append(("track_user", user_info.user_id))
+
+    def track_command(self, user_id, command):
+        self.calls.append(("track_command", user_id, command))
+
+    def set_user_language(self, user_id, language):
+        raise ConnectionError("stats process is gone")
+
+    def get_user_language(self, user_id):
+        self.calls.append(("get_user_language", user_id))
+        return "uk"
+
+    def get_stats_summary(self, lang):
+        return f"summary:{lang}"
+
+
+def test_worker_stats_forwards_writes_in_order():
+    proxy = _RecordingProxy()
+    worker = WorkerStats(proxy)
+    worker.track_user(UserInfo(user_id=1))
+    worker.track_command(1, "start")
+    worker.set_user_language(1, "en")  # Fails in the stats process: logged, not raised
+    worker.track_command(1, "joke")
+    worker.close()
+    assert proxy.calls == [("track_user", 1), ("track_command", 1, "start"), ("track_command", 1, "joke")]
+
+
+def test_worker_stats_caches_languages():
+    proxy = _RecordingProxy()
+    worker = WorkerStats(proxy)
+    assert worker.get_user_language(1) == "uk"
+    assert worker.get_user_language(1) == "uk"
+    worker.set_user_language(2, "en")
+    assert worker.get_user_language(2) == "en"
+    worker.close()
+    assert proxy.calls == [("get_user_language", 1)]
+    assert worker.get_stats_summary("en") == "summary:en"  # Everything else goes to the proxy
+
+
+def test_stats_round_trip_through_the_stats_process(tmp_path, monkeypatch):
+    monkeypatch.setenv("STATS_DATA_DIR", str(tmp_path))
+    authkey = os.urandom(32)
+    server = StatsServer(address=("127.0.0.1", 0), authkey=authkey, ctx=multiprocessing.get_context("spawn"))
+    server.start(_start_stats_process)
+    try:
+        client = StatsClient(address=server.address, authkey=authkey)
+        client.connect()
+        worker = WorkerStats(client.stats_manager())
+        worker.track_user(UserInfo(user_id=42, username="alice"))
+        worker.track_command(42, "start")
+        worker.set_user_language(42, "en")
+        worker.close()
+
+        owner = server.stats_manager()
+        user = owner.get_user_stats(42)
+        assert (user.username, user.language, user.commands_used) == ("alice", "en", {"start": 1})
+        assert WorkerStats(client.stats_manager()).get_user_language(42) == "en"
+
+        owner.flush()
+        users = json.loads((tmp_path / "users.json").read_text(encoding="utf-8"))
+        assert users["42"]["commands_used"] == {"start": 1}
+    finally:
+        server.shutdown()
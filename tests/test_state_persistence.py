@@ -0,0 +1,213 @@
+"""
+State persistence: journal/snapshot replay, SQLite round trip and StatePersister batching
+"""
+import asyncio
+import json
+import time
+
+import pytest
+
+from expiring_store import ExpiringStore
+from state_persistence import FileStateBackend, SQLiteStateBackend, StatePersister, build_state_backend
+
+
+def _later(seconds: float = 3600) -> float:
+    return time.time() + seconds
+
+
+def _as_dict(entries):
+    return {(store, key): value for store, key, value, _ in entries}
+
+
+@pytest.fixture(params=["file", "sqlite"])
+def backend_factory(request, tmp_path):
+    """Opens the same path again, like a restarted bot"""
+    path = str(tmp_path / "state")
+    opened = []
+
+    def open_backend():
+        backend = build_state_backend(request.param, path)
+        opened.append(backend)
+        return backend
+    yield open_backend
+    for backend in opened:
+        backend.close()
+
+
+def test_round_trip(backend_factory):
+    backend = backend_factory()
+    backend.load(time.time())
+    backend.write([("states", "1", {"state": "waiting"}, _later()), ("inputs", "2", "cats", _later())])
+    backend.close()
+
+    entries = backend_factory().load(time.time())
+    assert _as_dict(entries) == {("states", "1"): {"state": "waiting"}, ("inputs", "2"): "cats"}
+
+
+def test_later_changes_and_deletions_win(backend_factory):
+    backend = backend_factory()
+    backend.load(time.time())
+    backend.write([("states", "1", "first", _later()), ("states", "2", "kept", _later())])
+    backend.write([("states", "1", "second", _later())])
+    backend.write([("states", "2", None, None)])
+    backend.close()
+
+    assert _as_dict(backend_factory().load(time.time())) == {("states", "1"): "second"}
+
+
+def test_expired_entries_are_not_loaded(backend_factory):
+    backend = backend_factory()
+    backend.load(time.time())
+    backend.write([("states", "1", "stale", time.time() + 0.01), ("states", "2", "fresh", _later())])
+    backend.close()
+
+    assert _as_dict(backend_factory().load(time.time() + 1)) == {("states", "2"): "fresh"}
+
+
+def test_journal_is_replayed_without_a_clean_shutdown(tmp_path):
+    path = str(tmp_path / "state.json")
+    backend = FileStateBackend(path)
+    backend.load(time.time())
+    backend.write([("states", "1", "a", _later())])
+    backend.write([("states", "1", "b", _later()), ("states", "2", "c", _later())])
+    # No close(): the changes exist only in the journal
+
+    with open(path + ".journal", encoding="utf-8") as f:
+        assert len(f.readlines()) == 3
+    assert _as_dict(FileStateBackend(path).load(time.time())) == {("states", "1"): "b", ("states", "2"): "c"}
+
+
+def test_torn_journal_line_is_ignored(tmp_path):
+    path = str(tmp_path / "state.json")
+    backend = FileStateBackend(path)
+    backend.load(time.time())
+    backend.write([("states", "1", "a", _later())])
+    with open(path + ".journal", "a", encoding="utf-8") as f:
+        f.write('["states", "2", "tor')
+
+    assert _as_dict(FileStateBackend(path).load(time.time())) == {("states", "1"): "a"}
+
+
+def test_load_folds_the_journal_into_a_snapshot(tmp_path):
+    path = str(tmp_path / "state.json")
+    backend = FileStateBackend(path)
+    backend.load(time.time())
+    backend.write([("states", "1", "a", _later())])
+
+    FileStateBackend(path).load(time.time())
+    with open(path + ".journal", encoding="utf-8") as f:
+        assert f.read() == ""
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["states"]["1"][0] == "a"
+
+
+def test_journal_is_compacted_once_it_grows(tmp_path):
+    path = str(tmp_path / "state.json")
+    backend = FileStateBackend(path, compact_after=3)
+    backend.load(time.time())
+    snapshots = backend.snapshots
+    backend.write([("states", str(i), i, _later()) for i in range(3)])
+    assert backend.snapshots == snapshots + 1
+    with open(path + ".journal", encoding="utf-8") as f:
+        assert f.read() == ""
+    assert len(FileStateBackend(path).load(time.time())) == 3
+
+
+def test_sqlite_keeps_one_row_per_key(tmp_path):
+    backend = SQLiteStateBackend(str(tmp_path / "state.sqlite3"))
+    backend.load(time.time())
+    for value in range(5):
+        backend.write([("states", "1", value, _later())])
+    rows = backend._db.execute("SELECT COUNT(*) FROM state").fetchone()[0]
+    backend.close()
+    assert rows == 1
+
+
+def _stores():
+    return {
+        "user_states": ExpiringStore("user_states", ttl=3600),
+        "last_joke_input": ExpiringStore("last_joke_input", ttl=3600),
+    }
+
+
+def _persister(stores, backend):
+    return StatePersister({name: (store, lambda value: value, lambda value: value) for name, store in stores.items()},
+                          backend)
+
+
+def test_persister_restores_stores_after_restart(tmp_path):
+    path = str(tmp_path / "state.json")
+
+    async def first_run():
+        stores = _stores()
+        persister = _persister(stores, FileStateBackend(path))
+        await persister.start()
+        stores["user_states"][42] = "waiting_for_joke_input"
+        stores["last_joke_input"][42] = "cats"
+        stores["last_joke_input"][7] = "dogs"
+        del stores["last_joke_input"][7]
+        await persister.stop()
+
+    async def second_run():
+        stores = _stores()
+        persister = _persister(stores, FileStateBackend(path))
+        await persister.start()
+        await persister.stop()
+        return stores, persister.loaded
+
+    asyncio.run(first_run())
+    stores, loaded = asyncio.run(second_run())
+    assert loaded == 2
+    # Keys are persisted as strings and restored as ints
+    assert stores["user_states"][42] == "waiting_for_joke_input"
+    assert stores["last_joke_input"][42] == "cats"
+    assert 7 not in stores["last_joke_input"]
+
+
+def test_persister_coalesces_changes_to_one_key(tmp_path):
+    class RecordingBackend(FileStateBackend):
+        def __init__(self, path):
+            super().__init__(path)
+            self.batches = []
+
+        def write(self, changes):
+            self.batches.append(list(changes))
+            super().write(changes)
+
+    async def run():
+        stores = _stores()
+        backend = RecordingBackend(str(tmp_path / "state.json"))
+        persister = _persister(stores, backend)
+        persister.load()
+        for value in range(10):
+            stores["user_states"][1] = value
+        assert persister.pending == 1
+        assert await persister.flush() == 1
+        return backend.batches
+
+    batches = asyncio.run(run())
+    assert [[change[:3] for change in batch] for batch in batches] == [[("user_states", "1", 9)]]
+
+
+def test_failed_write_keeps_the_batch_for_the_next_flush(tmp_path):
+    class FlakyBackend(FileStateBackend):
+        fail = True
+
+        def write(self, changes):
+            if self.fail:
+                raise OSError("disk full")
+            super().write(changes)
+
+    async def run():
+        stores = _stores()
+        backend = FlakyBackend(str(tmp_path / "state.json"))
+        persister = _persister(stores, backend)
+        persister.load()
+        stores["user_states"][1] = "a"
+        assert await persister.flush() == 0
+        assert persister.failures == 1 and persister.pending == 1
+        backend.fail = False
+        assert await persister.flush() == 1
+        return persister.pending
+
+    assert asyncio.run(run()) == 0
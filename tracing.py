@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Lightweight per-update tracing for Telegram Bot.
+
+Every update gets a trace with a correlation ID and a root span around its dispatch.
+Code that may be slow opens child spans with ``with span("name"):`` - stats tracking,
+rendering, jokes API requests and Bot API calls do. The current span lives in a
+context variable, so it follows the update through awaits and into tasks the handler
+starts (joke delivery, wrapped with ``background``); outside an update ``span`` costs a
+single lookup. A trace is complete once all of its spans have ended; complete traces
+slower than ``TRACE_SLOW_THRESHOLD`` are kept in a ring buffer that admins dump with
+``/traces``.
+"""
+import contextvars
+import itertools
+import logging
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Awaitable, Deque, Dict, Iterator, List, Optional
+
+from telegram import Update
+from telegram.ext import Application
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+CORRELATION_HEADER = "X-Correlation-ID"
+
+class Span:
+    """One timed operation within a trace"""
+    __slots__ = ("trace", "name", "parent", "started", "ended", "attrs")
+
+    def __init__(self, trace: "Trace", name: str, parent: Optional["Span"], attrs: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.parent = parent
+        self.started = time.perf_counter()
+        self.ended: Optional[float] = None
+        self.attrs = attrs
+
+    @property
+    def duration(self) -> float:
+        return (self.ended if self.ended is not None else time.perf_counter()) - self.started
+
+    def set(self, **attrs: Any) -> None:
+        """Attach attributes (status code, outcome, ...) to the span"""
+        self.attrs.update(attrs)
+
+class Trace:
+    """All spans of one update"""
+
+    def __init__(self, correlation_id: str, attrs: Dict[str, Any]):
+        self.correlation_id = correlation_id
+        self.attrs = attrs
+        self.started_at = time.time()
+        self.spans: List[Span] = []
+        self.open = 0  # Spans and background tasks still running
+        self.finished = False
+
+    @property
+    def duration(self) -> float:
+        return max(span.ended for span in self.spans) - self.spans[0].started
+
+    def format(self) -> str:
+        """Indented span tree, durations in milliseconds"""
+        header = " ".join(f"{key}={value}" for key, value in self.attrs.items())
+        lines = [f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started_at))} "
+                 f"{self.correlation_id} {self.duration * 1000:.1f} ms {header}"]
+        origin = self.spans[0].started
+        depth = {None: -1}
+        for span in self.spans:
+            depth[span] = depth[span.parent] + 1
+            attrs = "".join(f" {key}={value}" for key, value in span.attrs.items())
+            lines.append(f"{'  ' * (depth[span] + 1)}+{(span.started - origin) * 1000:7.1f} "
+                         f"{span.duration * 1000:8.1f} ms  {span.name}{attrs}")
+        return "\n".join(lines)
+
+class Tracer:
+    """Creates traces, keeps the slow ones"""
+
+    def __init__(self, enabled: bool = True, slow_threshold: float = 2.0, buffer_size: int = 50):
+        self.enabled = enabled
+        self.slow_threshold = slow_threshold
+        self.slow_traces: Deque[Trace] = deque(maxlen=buffer_size)
+        self.completed = 0
+        self.slow = 0
+        self._ids = itertools.count(1)
+        self._prefix = uuid.uuid4().hex[:8]
+
+    def new_correlation_id(self) -> str:
+        # Unique per process and cheap: random process prefix plus a counter
+        return f"{self._prefix}-{next(self._ids):x}"
+
+    def finish(self, trace: Trace) -> None:
+        self.completed += 1
+        if trace.duration >= self.slow_threshold:
+            self.slow += 1
+            self.slow_traces.append(trace)
+
+    def dump(self, limit: Optional[int] = None) -> str:
+        """Slow traces, newest first"""
+        traces = list(self.slow_traces)[::-1][:limit]
+        return "\n\n".join(trace.format() for trace in traces)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "completed": self.completed,
+            "slow": self.slow,
+            "buffered": len(self.slow_traces),
+            "slow_threshold_seconds": self.slow_threshold,
+        }
+
+# Global tracer instance
+tracer = Tracer(Config.TRACE_ENABLED, Config.TRACE_SLOW_THRESHOLD, Config.TRACE_BUFFER_SIZE)
+
+_current: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("current_span", default=None)
+
+def _start(trace: Trace, name: str, parent: Optional[Span], attrs: Dict[str, Any]) -> Span:
+    new_span = Span(trace, name, parent, attrs)
+    trace.spans.append(new_span)
+    trace.open += 1
+    return new_span
+
+def _release(trace: Trace) -> None:
+    trace.open -= 1
+    if trace.open == 0:
+        trace.finished = True
+        tracer.finish(trace)
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Optional[Span]]:
+    """Time the block as a child of the current span; does nothing outside a trace"""
+    parent = _current.get()
+    if parent is None or parent.trace.finished:
+        # Outside an update, or in a task that outlived its (already reported) trace
+        yield None
+        return
+    child = _start(parent.trace, name, parent, attrs)
+    token = _current.set(child)
+    try:
+        yield child
+    finally:
+        child.ended = time.perf_counter()
+        _current.reset(token)
+        _release(parent.trace)
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+def correlation_id() -> Optional[str]:
+    """Correlation ID of the update being handled, if any"""
+    current = _current.get()
+    return current.trace.correlation_id if current is not None else None
+
+def background(name: str, coroutine: Awaitable[Any]) -> Awaitable[Any]:
+    """Wrap a coroutine the current update starts as a task, so the trace waits for it.
+
+    Call it before creating the task: the trace is held open from this moment, even if
+    the handler returns before the task gets to run.
+    """
+    parent = _current.get()
+    if parent is None or parent.trace.finished:
+        return coroutine
+    trace = parent.trace
+    trace.open += 1
+
+    async def run():
+        try:
+            with span(name):
+                return await coroutine
+        finally:
+            _release(trace)
+    return run()
+
+def describe_update(update: object) -> Dict[str, Any]:
+    """Attributes identifying an update: ID, user, kind and command or callback data"""
+    if not isinstance(update, Update):
+        return {"kind": type(update).__name__}
+    attrs: Dict[str, Any] = {"update_id": update.update_id}
+    if update.effective_user:
+        attrs["user_id"] = update.effective_user.id
+    if update.callback_query:
+        attrs["kind"] = "callback"
+        attrs["data"] = update.callback_query.data
+    elif update.message and update.message.text and update.message.text.startswith("/"):
+        attrs["kind"] = "command"
+        attrs["command"] = update.message.text.split(maxsplit=1)[0]
+    else:
+        attrs["kind"] = "message"
+    return attrs
+
+@contextmanager
+def trace_update(update: object) -> Iterator[Optional[Span]]:
+    """Root span of one update"""
+    if not tracer.enabled:
+        yield None
+        return
+    trace = Trace(tracer.new_correlation_id(), describe_update(update))
+    root = _start(trace, "dispatch", None, {})
+    token = _current.set(root)
+    try:
+        yield root
+    finally:
+        root.ended = time.perf_counter()
+        _current.reset(token)
+        _release(trace)
+
+class TracingApplication(Application):
+    """Application that opens a trace around the dispatch of every update"""
+
+    async def process_update(self, update: object) -> None:
+        # Bound to a local so the stall detector finds the trace in a blocked stack
+        with trace_update(update) as root:
+            await super().process_update(update)
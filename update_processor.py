@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Concurrent update processing with per-user ordering for Telegram Bot
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Dict, Tuple
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+OrderingKey = Tuple[str, int]
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """Processes updates of different users concurrently, one at a time per user and chat.
+
+    Updates of the same user (or the same chat) are handled strictly in arrival order,
+    so ``state_manager`` transitions never interleave. At most ``max_concurrent_updates``
+    handlers run at once; up to ``max_pending_updates`` more may wait for their turn.
+    """
+
+    def __init__(self, max_concurrent_updates: int, max_pending_updates: int = 4096):
+        # PTB's own semaphore bounds running + waiting updates; the running cap is applied
+        # after the per-user wait so one busy user cannot occupy every slot.
+        super().__init__(max(max_concurrent_updates, max_pending_updates))
+        if max_concurrent_updates < 1:
+            raise ValueError("max_concurrent_updates must be a positive integer")
+        self.concurrency_limit = max_concurrent_updates
+        self._slots = asyncio.Semaphore(max_concurrent_updates)
+        # Completion future of the most recently arrived update per user/chat
+        self._tails: Dict[OrderingKey, asyncio.Future] = {}
+        self.processed = 0
+        self.running = 0
+
+    @staticmethod
+    def ordering_keys(update: object) -> Tuple[OrderingKey, ...]:
+        """Users and chats whose updates must not overlap"""
+        if not isinstance(update, Update):
+            return ()
+        keys = set()
+        if update.effective_user:
+            keys.add(("user", update.effective_user.id))
+        if update.effective_chat and update.effective_chat.id != getattr(update.effective_user, "id", None):
+            keys.add(("chat", update.effective_chat.id))
+        return tuple(keys)
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        """Wait for earlier updates of the same user/chat, then for a processing slot"""
+        keys = self.ordering_keys(update)
+        done = asyncio.get_running_loop().create_future()
+        # Taking our place in each queue happens before the first await, i.e. in arrival order
+        previous = {self._tails[key] for key in keys if key in self._tails}
+        for key in keys:
+            self._tails[key] = done
+        try:
+            if previous:
+                # asyncio.wait never cancels the futures it waits for
+                await asyncio.wait(previous)
+            async with self._slots:
+                self.running += 1
+                try:
+                    await coroutine
+                finally:
+                    self.running -= 1
+                    self.processed += 1
+        finally:
+            done.set_result(None)
+            for key in keys:
+                if self._tails.get(key) is done:
+                    del self._tails[key]
+
+    async def initialize(self) -> None:
+        """Nothing to allocate"""
+
+    async def shutdown(self) -> None:
+        """Nothing to free"""
+
+    def get_metrics(self) -> Dict[str, int]:
+        """Snapshot of processing counters"""
+        return {
+            "concurrency_limit": self.concurrency_limit,
+            "running": self.running,
+            "active_keys": len(self._tails),
+            "processed": self.processed,
+        }
@@ -2,18 +2,25 @@
 """
 User states management for Telegram Bot
 """
-from typing import Dict, Optional
+import asyncio
+from typing import Any, Callable, Dict, Optional, Tuple
 from enum import Enum
 
+import metrics
+from config import Config
+from expiring_store import ExpiringStore
+
 class UserState(Enum):
     """User states"""
     NORMAL = "normal"
     WAITING_FOR_JOKE_INPUT = "waiting_for_joke_input"
 
 class UserStateManager:
-    def __init__(self):
-        self.user_states = {}  # Now stores {user_id: (state, context_data)}
-        self.last_joke_input = {}
+    def __init__(self, state_ttl: float = 0, joke_input_ttl: float = 0, max_entries: int = 0):
+        # {user_id: (state, context_data)}; an abandoned prompt expires after state_ttl
+        self.user_states = ExpiringStore("user_states", state_ttl, max_entries)
+        self.last_joke_input = ExpiringStore("last_joke_input", joke_input_ttl, max_entries)
+        self.joke_tasks: Dict[int, asyncio.Task] = {}  # In-flight joke generation per user
 
     def set_last_joke_input(self, user_id: int, joke_input: str):
         self.last_joke_input[user_id] = joke_input
@@ -22,7 +29,10 @@ def get_last_joke_input(self, user_id: int):
         return self.last_joke_input.get(user_id)
 
     def set_user_state(self, user_id: int, state: UserState, context_data=None):
-        self.user_states[user_id] = (state, context_data)
+        if state == UserState.WAITING_FOR_JOKE_INPUT:
+            # A new joke prompt supersedes any joke still being generated
+            self.cancel_joke_task(user_id)
+        self.user_states.set(user_id, (state, context_data))
 
     def get_user_state(self, user_id: int):
         return self.user_states.get(user_id, (None, None))
@@ -38,8 +48,57 @@ def get_joke_prompt_message_id(self, user_id: int):
         return None
 
     def clear_user_state(self, user_id: int):
-        if user_id in self.user_states:
-            del self.user_states[user_id]
+        self.user_states.pop(user_id)
+        self.cancel_joke_task(user_id)
+
+    def track_joke_task(self, user_id: int, task: asyncio.Task):
+        """Register an in-flight joke task, cancelling the one it supersedes"""
+        previous = self.joke_tasks.get(user_id)
+        if previous is not None and previous is not task and not previous.done():
+            previous.cancel()
+        self.joke_tasks[user_id] = task
+
+    def release_joke_task(self, user_id: int, task: asyncio.Task):
+        """Forget a finished joke task unless a newer one already replaced it"""
+        if self.joke_tasks.get(user_id) is task:
+            del self.joke_tasks[user_id]
+
+    def cancel_joke_task(self, user_id: int) -> bool:
+        """Cancel the user's in-flight joke task, if any"""
+        task = self.joke_tasks.pop(user_id, None)
+        if task is not None and not task.done():
+            task.cancel()
+            return True
+        return False
+
+    def persisted_stores(self) -> Dict[str, Tuple[ExpiringStore, Callable, Callable]]:
+        """Stores that survive a restart, with JSON encode/decode of their values"""
+        return {
+            "user_states": (self.user_states,
+                            lambda value: [value[0].value, value[1]],
+                            lambda data: (UserState(data[0]), data[1])),
+            "last_joke_input": (self.last_joke_input, str, str),
+        }
+
+    def get_metrics(self, memory: bool = True) -> Dict[str, Any]:
+        """Entries, expirations, evictions and (unless ``memory=False``, O(n)) memory of each store"""
+        return {
+            "user_states": self.user_states.get_metrics(memory),
+            "last_joke_input": self.last_joke_input.get_metrics(memory),
+            "joke_tasks": len(self.joke_tasks),
+        }
 
 # Global state manager instance
-state_manager = UserStateManager()
+state_manager = UserStateManager(Config.USER_STATE_TTL, Config.LAST_JOKE_INPUT_TTL, Config.USER_STATE_MAX_ENTRIES)
+
+metrics.registry.gauge_callback(
+    "bot_user_state_entries", "Live entries per conversation state store",
+    lambda: {(store.name,): len(store) for store in (state_manager.user_states, state_manager.last_joke_input)},
+    ("store",))
+metrics.registry.gauge_callback(
+    "bot_user_state_memory_bytes", "Approximate memory of each conversation state store (walks every entry)",
+    lambda: {(store.name,): store.approx_memory_bytes()
+             for store in (state_manager.user_states, state_manager.last_joke_input)},
+    ("store",))
+metrics.registry.gauge_callback(
+    "bot_joke_tasks_in_flight", "Joke generations currently running", lambda: len(state_manager.joke_tasks))
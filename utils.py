@@ -2,15 +2,22 @@
 Utility functions for Telegram Bot
 """
 import logging
-import requests
 import asyncio
+import time
+import httpx
 from datetime import datetime
 from typing import Optional, Dict, Any, Union
 from config import Config
-from stats import stats_manager
+import stats
 from base import UserInfo
 from constants import APIConstants, BotConstants
 from localization import translate
+from user_states import state_manager
+import logging_pipeline
+from metrics import joke_api_latency
+import health
+from serialization import serializer
+import tracing
 
 logger = logging.getLogger(__name__)
 
@@ -30,11 +37,25 @@ def setup_logging(log_level: str = "INFO", log_format: str = None, docker_mode:
             # If can't write to file, just use stdout
             pass
 
-    logging.basicConfig(
-        format=log_format,
-        level=getattr(logging, log_level.upper()),
-        handlers=handlers,
-        force=True  # Force reconfiguration
+    if not Config.LOG_ASYNC:
+        logging.basicConfig(
+            format=log_format,
+            level=getattr(logging, log_level.upper()),
+            handlers=handlers,
+            force=True  # Force reconfiguration
+        )
+        return
+
+    # Handlers run on a listener thread; the event loop only enqueues records
+    formatter = logging.Formatter(log_format)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    logging_pipeline.install(
+        handlers,
+        getattr(logging, log_level.upper()),
+        secrets=(Config.BOT_TOKEN, Config.JOKES_API_KEY, Config.WEBHOOK_SECRET_TOKEN),
+        sample_rates=logging_pipeline.parse_sample_rates(Config.LOG_SAMPLE_RATES),
+        rate_limit=Config.LOG_RATE_LIMIT,
     )
 
 def get_current_time() -> str:
@@ -82,10 +103,31 @@ def get_user_mention(user) -> str:
     return f"[{user.first_name}](tg://user?id={user.id})"
 
 # Jokes API functions
-async def fetch_joke(user_input: str, lang: str) -> Optional[Dict[str, Any]]:
-    """Fetch a joke from your custom API using POST request with user input and language"""
+_jokes_client: Optional[httpx.AsyncClient] = None
+
+def get_jokes_client() -> httpx.AsyncClient:
+    """Get the shared async HTTP client for the jokes API"""
+    global _jokes_client
+    if _jokes_client is None or _jokes_client.is_closed:
+        _jokes_client = httpx.AsyncClient(headers=Config.JOKES_API_HEADERS)
+    return _jokes_client
+
+async def close_jokes_client() -> None:
+    """Close the shared jokes API client and its connections"""
+    global _jokes_client
+    if _jokes_client is not None:
+        await _jokes_client.aclose()
+        _jokes_client = None
+
+async def fetch_joke(user_input: str, lang: str, deadline: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Fetch a joke from your custom API using POST request with user input and language
+
+    ``deadline`` is a ``time.monotonic()`` timestamp; the request timeout is capped
+    by the time remaining until it. Cancelling the calling task aborts the request.
+    """
+    # HTTP status or error kind for /metrics; None until a request is sent
+    outcome = None
     try:
-        logger.info(f"Fetching joke with user input: {user_input} and language: {lang}")
         lang_map = {"uk": "Ukrainian", "en": "English", "pl": "Polish"}
         api_lang = lang_map.get(lang, "Ukrainian")
 
@@ -102,24 +144,35 @@ async def fetch_joke(user_input: str, lang: str) -> Optional[Dict[str, Any]]:
             logger.error("Set JOKES_API_URL environment variable")
             return None
 
-        logger.info(f"Making request to: {api_url}")
-        logger.info(f"Request data: {request_data}")
-        logger.info(f"Headers: {Config.JOKES_API_HEADERS}")
+        timeout = float(Config.JOKES_API_TIMEOUT)
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                logger.warning("Jokes API deadline expired before the request was sent")
+                return None
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Jokes API request to %s: %s, headers %s",
+                         api_url, request_data, logging_pipeline.redact_headers(Config.JOKES_API_HEADERS))
+        else:
+            logger.info("Fetching joke (language: %s, input: %d chars)", api_lang, len(user_input))
 
-        # Use asyncio to run the blocking request in a thread pool
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None,
-            lambda: requests.post(
+        outcome = "cancelled"
+        started = time.perf_counter()
+        correlation_id = tracing.correlation_id()
+        with tracing.span("jokes_api") as api_span:
+            response = await get_jokes_client().post(
                 api_url,
                 json=request_data,
-                timeout=Config.JOKES_API_TIMEOUT,
-                headers=Config.JOKES_API_HEADERS
+                headers={tracing.CORRELATION_HEADER: correlation_id} if correlation_id else None,
+                timeout=timeout
             )
-        )
+            outcome = str(response.status_code)
+            if api_span is not None:
+                api_span.set(status=response.status_code)
 
         if response.status_code == 200:
-            joke_data = response.json()
+            joke_data = serializer.loads(response.content)
             logger.info("Successfully fetched joke from custom API")
             return joke_data
         elif response.status_code == 401:
@@ -143,18 +196,29 @@ async def fetch_joke(user_input: str, lang: str) -> Optional[Dict[str, Any]]:
             logger.warning(f"Jokes API returned status {response.status_code}")
             return None
 
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
+        outcome = "timeout"
         logger.error("Jokes API request timed out")
         return None
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
+        outcome = "connect_error"
         logger.error("Jokes API connection failed - check network and URL")
         return None
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
+        outcome = "http_error"
         logger.error(f"Jokes API request failed: {e}")
         return None
     except Exception as e:
+        if outcome is not None:
+            outcome = "error"  # e.g. a 200 response that is not JSON
         logger.error(f"Unexpected error fetching joke: {e}")
         return None
+    finally:
+        if outcome is not None:
+            latency = time.perf_counter() - started
+            joke_api_latency.labels(outcome).observe(latency)
+            if outcome != "cancelled":
+                health.jokes_api.record(outcome, latency, outcome == "200")
 
 def format_joke(joke_data: Dict[str, Any], lang: str) -> str:
     """Format joke data from your custom API into a readable string"""
@@ -176,10 +240,18 @@ def format_joke(joke_data: Dict[str, Any], lang: str) -> str:
         return "😅 Sorry, I couldn't fetch a joke right now. Try again later!"
 
 
-async def get_random_joke(user_input: str, lang: str) -> str:
+async def get_random_joke(user_input: str, lang: str, deadline: Optional[float] = None) -> str:
     """Get a formatted joke based on user input"""
-    joke_data = await fetch_joke(user_input, lang)
-    return format_joke(joke_data, lang)
+    joke_data = await fetch_joke(user_input, lang, deadline=deadline)
+    with tracing.span("render.joke"):
+        return format_joke(joke_data, lang)
+
+def start_joke_task(application, user_id: int, coroutine) -> asyncio.Task:
+    """Run joke generation in the background, superseding the user's previous one"""
+    task = application.create_task(tracing.background("joke_delivery", coroutine))
+    state_manager.track_joke_task(user_id, task)
+    task.add_done_callback(lambda finished: state_manager.release_joke_task(user_id, finished))
+    return task
 
 def track_user_interaction(user_id: int, username: str = None, first_name: str = None, last_name: str = None):
     """Track user interaction for statistics (legacy method)"""
@@ -190,24 +262,27 @@ def track_user_interaction(user_id: int, username: str = None, first_name: str =
             first_name=first_name,
             last_name=last_name
         )
-        stats_manager.track_user(user_info)
-        logger.info(f"User interaction tracked: {user_id} (@{username or 'unknown'})")
+        with tracing.span("stats.track_user"):
+            stats.stats_manager.track_user(user_info)
+        logger.info("User interaction tracked: %s (@%s)", user_id, username or 'unknown')
     except Exception as e:
         logger.error(f"Error tracking user interaction: {e}")
 
 def track_user_interaction_new(user_info: UserInfo):
     """Track user interaction for statistics (new method)"""
     try:
-        stats_manager.track_user(user_info)
-        logger.info(f"User interaction tracked: {user_info.user_id} (@{user_info.username or 'unknown'})")
+        with tracing.span("stats.track_user"):
+            stats.stats_manager.track_user(user_info)
+        logger.info("User interaction tracked: %s (@%s)", user_info.user_id, user_info.username or 'unknown')
     except Exception as e:
         logger.error(f"Error tracking user interaction: {e}")
 
 def track_command_usage(user_id: int, command: str):
     """Track command usage for statistics"""
     try:
-        stats_manager.track_command(user_id, command)
-        logger.info(f"Command usage tracked: {command} by user {user_id}")
+        with tracing.span("stats.track_command", command=command):
+            stats.stats_manager.track_command(user_id, command)
+        logger.info("Command usage tracked: %s by user %s", command, user_id)
     except Exception as e:
         logger.error(f"Error tracking command usage: {e}")
 
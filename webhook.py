@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Webhook ingress for Telegram Bot
+"""
+import asyncio
+import contextlib
+import hmac
+import logging
+import signal
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from telegram import Bot, Update
+from telegram.ext import Application
+
+from config import Config
+from constants import ServerConstants
+from http_server import HTTPServer, Request, Response
+import health
+import metrics
+
+logger = logging.getLogger(__name__)
+
+UpdateSink = Callable[[Dict[str, Any]], Awaitable[None]]
+
+class WebhookIngress:
+    """Accepts Telegram webhook calls and hands updates off without waiting for handlers"""
+
+    def __init__(self, sink: UpdateSink, secret_token: Optional[str] = None):
+        self.sink = sink
+        self.secret_token = secret_token
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @classmethod
+    def for_application(cls, application: Application, secret_token: Optional[str] = None) -> "WebhookIngress":
+        """Ingress that feeds the application's update queue"""
+        async def enqueue(data: Dict[str, Any]) -> None:
+            application.update_queue.put_nowait(Update.de_json(data, application.bot))
+        return cls(enqueue, secret_token)
+
+    async def handle(self, request: Request) -> Response:
+        """Validate the secret token, enqueue the update and acknowledge immediately"""
+        if self.secret_token:
+            received = request.headers.get(ServerConstants.SECRET_TOKEN_HEADER.lower(), "")
+            if not hmac.compare_digest(received.encode(), self.secret_token.encode()):
+                self.logger.warning("Rejected webhook call with invalid secret token")
+                return Response.text("Forbidden", 403)
+        try:
+            data = request.json()
+        except ValueError:
+            return Response.text("Invalid JSON", 400)
+        if not isinstance(data, dict) or "update_id" not in data:
+            return Response.text("Not an update", 400)
+
+        await self.sink(data)
+        health.webhook_updates.mark()
+        return Response(200)
+
+async def register_webhook(bot: Bot) -> None:
+    """Point Telegram at our public webhook URL"""
+    await bot.set_webhook(
+        url=Config.get_webhook_url(),
+        secret_token=Config.WEBHOOK_SECRET_TOKEN,
+        max_connections=Config.WEBHOOK_MAX_CONNECTIONS,
+        allowed_updates=Update.ALL_TYPES
+    )
+    logger.info(f"Webhook registered at {Config.get_webhook_url()} (max connections: {Config.WEBHOOK_MAX_CONNECTIONS})")
+
+async def serve_webhook(application: Application, server: HTTPServer) -> None:
+    """Run the application behind the webhook route until SIGINT/SIGTERM"""
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        with contextlib.suppress(NotImplementedError):
+            loop.add_signal_handler(sig, stop_event.set)
+
+    if not Config.WEBHOOK_SECRET_TOKEN:
+        logger.warning("WEBHOOK_SECRET_TOKEN is not set - webhook calls are not authenticated")
+    ingress = WebhookIngress.for_application(application, Config.WEBHOOK_SECRET_TOKEN)
+    server.add_route("POST", Config.WEBHOOK_PATH, ingress.handle)
+    metrics.add_routes(server)
+
+    async with application:
+        if application.post_init:
+            await application.post_init(application)
+        await application.start()
+        await server.start()
+        await register_webhook(application.bot)
+        try:
+            await stop_event.wait()
+        finally:
+            await server.stop()
+            await application.stop()
+            if application.post_stop:
+                await application.post_stop(application)
+    if application.post_shutdown:
+        await application.post_shutdown(application)
+
+def run_webhook(application: Application) -> None:
+    """Blocking entry point for webhook mode"""
+    server = HTTPServer(Config.HTTP_LISTEN, Config.HTTP_PORT)
+    asyncio.run(serve_webhook(application, server))